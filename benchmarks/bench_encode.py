@@ -0,0 +1,110 @@
+# benchmarks/bench_encode.py
+"""
+이미지 인코더 설정별 인코딩 시간 / 크기 (src/utils/encoder.py 프로필을 고른 근거).
+
+  python -m benchmarks.bench_encode
+  python -m benchmarks.bench_encode --size 2048 --repeat 7 --out /tmp/enc.json
+
+대표 프레임 (benchmarks/synth.py, seed 고정):
+  solar     태양 전면 영상 (size × size)
+  spectral  슬릿 분광 영상 (size/2 × size)
+각 프레임을 프리뷰와 같은 경로(_stretch_u8, 컬러맵은 viridis 팔레트)로 8비트로 만든 뒤
+후보 설정마다 median 인코딩 시간과 바이트 수를 잰다. "pil_default"는 예전 _to_png(Pillow 기본값).
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import time
+import zlib
+from io import BytesIO
+from typing import Dict
+
+from benchmarks import synth
+
+CANDIDATES: Dict[str, tuple] = {
+    "pil_default":      ("png", {}),
+    "png_l1":           ("png", {"compress_level": 1}),
+    "png_l1_rle":       ("png", {"compress_level": 1, "compress_type": zlib.Z_RLE}),
+    "png_l1_huffman":   ("png", {"compress_level": 1, "compress_type": zlib.Z_HUFFMAN_ONLY}),
+    "png_l3":           ("png", {"compress_level": 3}),
+    "png_l9":           ("png", {"compress_level": 9}),
+    "png_l9_rle":       ("png", {"compress_level": 9, "compress_type": zlib.Z_RLE}),
+    "webp_ll_m0":       ("webp", {"lossless": True, "quality": 0, "method": 0}),
+    "webp_ll_m4":       ("webp", {"lossless": True, "quality": 50, "method": 4}),
+    "webp_ll_m4_q100":  ("webp", {"lossless": True, "quality": 100, "method": 4}),
+    "webp_q90":         ("webp", {"lossless": False, "quality": 90, "method": 4}),
+    "webp_q90_m0":      ("webp", {"lossless": False, "quality": 90, "method": 0}),
+    "webp_q80":         ("webp", {"lossless": False, "quality": 80, "method": 4}),
+    "webp_q80_m0":      ("webp", {"lossless": False, "quality": 80, "method": 0}),
+}
+# webp 무손실 method 5~6은 1024² 한 장에 수십 초라 후보에서 뺐다 (크기 이득은 m4 대비 ~5%)
+
+
+def _frames(size: int) -> dict:
+    from PIL import Image
+    from src.services import fits_service as fs
+    from src.utils import colormap
+
+    out = {}
+    for name, arr in (("solar", synth.solar_frame(size)), ("spectral", synth.spectral_frame(size // 2, size))):
+        u8 = fs._stretch_u8(arr, 1.0)
+        out[f"{name}_gray"] = Image.fromarray(u8, mode="L")
+        pal = Image.fromarray(u8, mode="L")
+        pal.putpalette(colormap.palette("viridis"))
+        out[f"{name}_viridis"] = pal
+    return out
+
+
+def _run(im, fmt: str, opts: dict, repeat: int) -> dict:
+    times, size = [], 0
+    for _ in range(repeat):
+        buf = BytesIO()
+        t0 = time.perf_counter()
+        im.save(buf, format=fmt.upper(), **opts)
+        times.append(time.perf_counter() - t0)
+        size = buf.tell()
+    raw = im.width * im.height
+    return {"median_ms": round(statistics.median(times) * 1000, 2), "bytes": size,
+            "ratio": round(size / raw, 3)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Encode time vs size for PNG/WebP settings")
+    ap.add_argument("--size", type=int, default=1024)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="", help="comma separated candidate names")
+    ap.add_argument("--out", default="")
+    args = ap.parse_args()
+
+    import src  # noqa: F401  (.env 로드)
+    from src.utils import encoder
+
+    names = [n for n in args.only.split(",") if n] or list(CANDIDATES)
+    frames = _frames(args.size)
+    results: Dict[str, dict] = {}
+    for frame, im in frames.items():
+        for name in names:
+            fmt, opts = CANDIDATES[name]
+            if fmt == "webp" and "webp" not in encoder.enabled_formats():
+                continue
+            results[f"{frame}/{name}"] = _run(im, fmt, opts, args.repeat)
+    # 현재 프로필 설정도 같은 표에 (어느 후보와 같은지 바로 보이도록)
+    for frame, im in frames.items():
+        for profile, per_fmt in encoder.PROFILES.items():
+            for fmt in encoder.enabled_formats():
+                opts = per_fmt.get(f"{fmt}:{im.mode}", per_fmt[fmt])
+                results[f"{frame}/profile:{profile}:{fmt}"] = _run(im, fmt, opts, args.repeat)
+
+    doc = {"meta": {"size": args.size, "repeat": args.repeat}, "results": results}
+    text = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    w = max(len(k) for k in results)
+    for k, v in results.items():
+        print(f"{k:<{w}}  {v['median_ms']:>8.2f} ms  {v['bytes']:>9d} B  x{v['ratio']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_mock_search.py
+"""
+/dev/search 지연시간: 행 단위 루프(기존) vs 컬럼 배열 + searchsorted(현재).
+
+  python -m benchmarks.bench_mock_search --stems 1000000
+
+합성 stem(nxst_YYYYMMDD_HHMMSS.ffffff_l1)을 _INDEX에 직접 채우고 파일 스캔은 건너뛴다.
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from flask import Flask, url_for
+
+from src.mock import local_mock
+
+QUERIES = [
+    ("all, -observed_at", {}),
+    ("one day", {"date_from": "2024-11-06 00:00"}),
+    ("one hour + q", {"date_from": "2024-11-06 10:00", "date_to": "2024-11-06 11:00", "q": "_l1"}),
+    ("q only, target sort", {"q": "2024110", "sort": "target"}),
+]
+
+
+def _fill_index(n: int) -> None:
+    local_mock._INDEX.clear()
+    t0 = datetime(2024, 1, 1)
+    step = timedelta(days=365) / n
+    for i in range(n):
+        dt = t0 + step * i
+        stem = f"nxst_{dt:%Y%m%d_%H%M%S.%f}_l1"
+        local_mock._INDEX[stem] = {
+            "file_id_hex": uuid.uuid5(uuid.NAMESPACE_URL, f"mock:{stem}").hex,
+            "fits_path": None,
+            "pngs": [f"/data/{stem}.png"],
+            "meta": {"stem": stem, "datetime": dt.isoformat(), "instrument": None, "exptime": None, "frames": 1},
+        }
+    local_mock._build_secondary()
+    local_mock._build_columns()
+
+
+def _legacy_search(args: dict) -> dict:
+    """기존 /dev/search 본문 (행마다 fromisoformat + dict 생성 + 전체 정렬)"""
+    q = (args.get("q") or "").lower()
+    sort = args.get("sort") or "-observed_at"
+    df = local_mock.parse_client_dt(args.get("date_from"))
+    dt = local_mock.parse_client_dt(args.get("date_to"))
+    if df and not dt:
+        dt = df.replace(hour=23, minute=59, second=59, microsecond=0)
+    rows = []
+    for stem, row in local_mock._INDEX.items():
+        if q and q not in stem.lower():
+            continue
+        iso = row["meta"].get("datetime", "")
+        if iso and (df or dt):
+            obs = datetime.fromisoformat(iso)
+            if df and obs < df:
+                continue
+            if dt and obs > dt:
+                continue
+        rows.append({
+            "file_id": row["file_id_hex"],
+            "filename": (Path(row["fits_path"]).name if row.get("fits_path") else stem + ".fts"),
+            "target": stem.split("_")[0],
+            "date_obs": iso or None,
+            "exptime": row["meta"].get("exptime"),
+            "frames": row["meta"].get("frames"),
+            "shape": None,
+            "flags": (["no_fits"] if not row.get("fits_path") else []),
+            "instrument": row["meta"].get("instrument"),
+            "thumb_url": url_for("mock.png_file", file_id=row["file_id_hex"], idx=0) if row.get("pngs") else None,
+        })
+    key = sort.lstrip("-")
+    rev = sort.startswith("-")
+    if key in ("observed_at", "date_obs"):
+        rows.sort(key=lambda r: (r["date_obs"] or ""), reverse=rev)
+    elif key in ("object", "target"):
+        rows.sort(key=lambda r: (r["target"] or ""), reverse=rev)
+    return {"total": len(rows), "items": rows}
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark /dev/search on a synthetic catalogue")
+    ap.add_argument("--stems", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    app = Flask(__name__)
+    app.register_blueprint(local_mock.mock_bp)
+    local_mock._scan = lambda *a, **k: None  # 합성 인덱스 유지
+
+    t0 = time.perf_counter()
+    _fill_index(args.stems)
+    build_s = time.perf_counter() - t0
+
+    results = {"stems": args.stems, "index_build_s": round(build_s, 3), "queries": {}}
+    for name, params in QUERIES:
+        qs = "&".join(f"{k}={v}" for k, v in params.items())
+        with app.test_request_context(f"/dev/search?{qs}"):
+            legacy = _best_of(lambda: _legacy_search(params), args.repeat)
+            current = _best_of(local_mock.search, args.repeat)
+        results["queries"][name] = {
+            "legacy_ms": round(legacy * 1000, 2),
+            "columnar_ms": round(current * 1000, 2),
+            "speedup": round(legacy / current, 1) if current else None,
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
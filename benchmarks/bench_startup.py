@@ -0,0 +1,90 @@
+# benchmarks/bench_startup.py
+"""
+웹 앱 기동(import) 시간: `python -X importtime -c "import src.app"` 를 새 프로세스로 반복 측정.
+
+  python -m benchmarks.bench_startup --runs 5 --budget-ms 900
+
+- src.app의 누적 import 시간(중앙값)이 예산을 넘거나
+- create_app() 직후 무거운 과학 모듈(numpy/astropy/PIL/cv2/matplotlib)이 이미 로드돼 있으면
+종료 코드 1 → CI나 pre-commit에서 예산 검사로 그대로 쓸 수 있다.
+예산 기본값은 STARTUP_BUDGET_MS (없으면 1000ms).
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("numpy", "astropy", "PIL", "cv2", "matplotlib")
+
+_CHECK_LOADED = """
+import json, os, sys
+import src
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite://"   # .env 로드 후에 덮어써야 DB 드라이버 없이 생성됨
+src.create_app()
+print(json.dumps(sorted(m for m in %r if m in sys.modules)))
+""" % (HEAVY,)
+
+
+def _importtime(module: str) -> dict:
+    """한 번 측정: {모듈: (self_us, cumulative_us)}"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    rows = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows[name.strip()] = (int(self_us), int(cum_us))
+    return rows
+
+
+def _heavy_after_create_app() -> list:
+    proc = subprocess.run([sys.executable, "-c", _CHECK_LOADED], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "create_app failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure web app import time against a budget")
+    ap.add_argument("--module", default="src.app")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10, help="report the N slowest imports (cumulative)")
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1000")))
+    args = ap.parse_args()
+
+    runs = [_importtime(args.module) for _ in range(args.runs)]
+    totals = [r[args.module][1] / 1000 for r in runs]
+    median_ms = statistics.median(totals)
+
+    # 가장 느린 회차가 아니라 중앙값에 가까운 회차로 상위 모듈 보고
+    rep = min(runs, key=lambda r: abs(r[args.module][1] / 1000 - median_ms))
+    top_level = {k: v for k, v in rep.items() if "." not in k or k == args.module}
+    slowest = sorted(top_level.items(), key=lambda kv: kv[1][1], reverse=True)[: args.top]
+
+    heavy = _heavy_after_create_app()
+    ok = median_ms <= args.budget_ms and not heavy
+    print(json.dumps({
+        "module": args.module,
+        "runs": args.runs,
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(min(totals), 1),
+        "budget_ms": args.budget_ms,
+        "heavy_loaded_after_create_app": heavy,
+        "slowest_top_level": {k: round(cum / 1000, 1) for k, (_, cum) in slowest},
+        "ok": ok,
+    }, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/compare.py
+"""
+run_suite 결과 JSON 두 개 비교.
+
+  python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json --threshold 0.15
+
+median 기준 (new / old) 비율을 출력하고, threshold(기본 10%)보다 느려진 항목이 있으면 종료 코드 1.
+--floor-ms 보다 짧은 항목은 잡음이 커서 회귀 판정에서 제외 (기본 0.5ms).
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare two benchmark JSON files")
+    ap.add_argument("old")
+    ap.add_argument("new")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown ratio (0.10 = +10%%)")
+    ap.add_argument("--floor-ms", type=float, default=0.5)
+    args = ap.parse_args()
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    a, b = old["results"], new["results"]
+
+    print(f"old: {old['meta'].get('commit')}  new: {new['meta'].get('commit')}")
+    keys = sorted(set(a) & set(b))
+    width = max((len(k) for k in keys), default=0)
+    regressions = []
+    for k in keys:
+        o, n = a[k]["median_ms"], b[k]["median_ms"]
+        ratio = (n / o) if o else float("inf")
+        mark = ""
+        if ratio > 1 + args.threshold and max(o, n) >= args.floor_ms:
+            mark = "  REGRESSION"
+            regressions.append(k)
+        elif ratio < 1 - args.threshold:
+            mark = "  faster"
+        print(f"{k:<{width}}  {o:>10.3f} -> {n:>10.3f} ms  x{ratio:5.2f}{mark}")
+    for k in sorted(set(a) ^ set(b)):
+        print(f"{k:<{width}}  (only in {'old' if k in a else 'new'})")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/localdb.py
+"""
+MySQL 없이 /api/search 를 재기 위한 SQLite 대역(stand-in).
+
+models.py는 MySQL 전용 선언을 쓰므로 SQLite DDL로 바꾸는 shim을 건다 (이 프로세스 안에서만):
+  - BINARY(16)                 → BLOB
+  - DATETIME(fsp=6)            → DATETIME
+  - BigInteger PK              → INTEGER (SQLite는 INTEGER PRIMARY KEY만 자동 증가)
+  - Computed("DATE(...)")      → date(...),  Computed("HOUR(...)") → CAST(strftime('%H', ...) AS INTEGER)
+  - server_default CURRENT_TIMESTAMP(6) → CURRENT_TIMESTAMP
+
+  app = make_app("/tmp/bench.sqlite")     # 빈 DB + 테이블 생성
+  seed(app, files=5000)                   # 결정적(seed 고정) 데이터 채우기
+"""
+from __future__ import annotations
+import os
+import random
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, text
+from sqlalchemy.dialects.mysql import BINARY, DATETIME as MySQL_DATETIME
+from sqlalchemy.ext.compiler import compiles
+
+_SHIMMED = False
+
+
+def install_sqlite_shims() -> None:
+    global _SHIMMED
+    if _SHIMMED:
+        return
+
+    @compiles(BINARY, "sqlite")
+    def _binary(type_, compiler, **kw):
+        return "BLOB"
+
+    @compiles(MySQL_DATETIME, "sqlite")
+    def _datetime(type_, compiler, **kw):
+        return "DATETIME"
+
+    @compiles(BigInteger, "sqlite")
+    def _bigint(type_, compiler, **kw):
+        return "INTEGER"
+
+    from src.model import db
+    import src.model.models  # noqa: F401  (테이블을 metadata에 등록)
+    for table in db.metadata.tables.values():
+        for col in table.columns:
+            if col.computed is not None:
+                sql = str(col.computed.sqltext)
+                sql = re.sub(r"\bDATE\((\w+)\)", r"date(\1)", sql)
+                sql = re.sub(r"\bHOUR\((\w+)\)", r"CAST(strftime('%H', \1) AS INTEGER)", sql)
+                col.computed.sqltext = text(sql)
+            sd = col.server_default
+            if sd is not None and "CURRENT_TIMESTAMP(" in str(getattr(sd, "arg", "")):
+                sd.arg = text("CURRENT_TIMESTAMP")
+    _SHIMMED = True
+
+
+def make_app(db_path: str):
+    """SQLite 파일 DB에 연결된 Flask 앱 (테이블은 새로 만든다)"""
+    import src
+    install_sqlite_shims()
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    # src import 시 .env(override=True)가 로드되므로 그 뒤에 덮어쓴다
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.abspath(db_path)}"
+    app = src.create_app()
+    from src.model import db
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def seed(app, files: int = 5000, frames_per_file: int = 3, rng_seed: int = 0) -> dict:
+    """
+    instrument 4개, fits_file N개(+file_storage), 헤더 키(OBJECT/EXPTIME/NAXIS3), FRAME 미리보기.
+    같은 인자면 항상 같은 데이터.
+    """
+    from src.model import db
+    from src.model.models import (
+        FileStorage, FitsFile, FitsHeaderKeyvalue, Instrument, PreviewImage, gen_uuid7_bytes,
+    )
+    rng = random.Random(rng_seed)
+    t0 = datetime(2024, 1, 1)
+    objects = ["SUN", "M31", "M42", "JUPITER", "VEGA", "ORION", "SIRIUS", "M13"]
+    with app.app_context():
+        insts = [Instrument(instrument_id=i + 1, name=n) for i, n in enumerate(["NXST", "FISS", "BOAO", "SOHO"])]
+        db.session.add_all(insts)
+        rows = {"file_storage": 0, "fits_file": 0, "fits_header_keyvalue": 0, "preview_image": 0}
+        batch = []
+        for i in range(files):
+            obs = t0 + timedelta(seconds=rng.randint(0, 365 * 86400), microseconds=rng.randint(0, 999999))
+            stem = f"nxst_{obs:%Y%m%d_%H%M%S.%f}_l1"
+            fs = FileStorage(file_id=gen_uuid7_bytes(), file_path=f"/data/fits/{stem}.fts", media_type="image/fits")
+            ff = FitsFile(
+                fits_id=gen_uuid7_bytes(), storage_file_id=fs.file_id,
+                original_filename=f"{stem}.fts", canonical_name=stem,
+                observed_at=obs, instrument_id=rng.randint(1, len(insts)),
+            )
+            batch += [fs, ff]
+            batch += [
+                FitsHeaderKeyvalue(fits_id=ff.fits_id, header_key="OBJECT", value_text=rng.choice(objects)),
+                FitsHeaderKeyvalue(fits_id=ff.fits_id, header_key="EXPTIME", value_num=rng.choice([0.1, 0.5, 1, 5, 30])),
+                FitsHeaderKeyvalue(fits_id=ff.fits_id, header_key="NAXIS3", value_num=frames_per_file),
+            ]
+            for k in range(frames_per_file):
+                pfs = FileStorage(file_id=gen_uuid7_bytes(), file_path=f"/data/png/{stem}_{k}.png", media_type="image/png")
+                batch += [pfs, PreviewImage(
+                    preview_id=gen_uuid7_bytes(), fits_id=ff.fits_id, storage_file_id=pfs.file_id,
+                    image_kind="FRAME", frame_index=k, width_px=512, height_px=512,
+                )]
+            rows["file_storage"] += 1 + frames_per_file
+            rows["fits_file"] += 1
+            rows["fits_header_keyvalue"] += 3
+            rows["preview_image"] += frames_per_file
+            if len(batch) >= 5000:
+                db.session.add_all(batch)
+                db.session.commit()
+                batch = []
+        db.session.add_all(batch)
+        db.session.commit()
+    return rows
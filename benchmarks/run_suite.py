@@ -0,0 +1,184 @@
+# benchmarks/run_suite.py
+"""
+재현 가능한 벤치마크 모음 → JSON.
+
+  python -m benchmarks.run_suite                                  # 기본 크기
+  python -m benchmarks.run_suite --sizes 64x512x512,1024x1024 --dtypes float32,int16 --repeat 7
+  python -m benchmarks.run_suite --out benchmarks/results/$(git rev-parse --short HEAD).json
+  python -m benchmarks.compare old.json new.json                 # 회귀 비교
+
+측정 대상 (cold = 파이프라인/프레임 캐시 비운 뒤, warm = 같은 요청 반복):
+  fits_service: register_fits, load_preview, _to_png, get_slit_image, get_spectrum, guess_best_z
+  local_mock:   _scan(full / 변경 없음), /dev/search
+  /api/search:  SQLite 대역 DB(benchmarks/localdb.py)에 seed 데이터를 넣고 측정
+모든 합성 데이터는 seed 고정이라 같은 인자면 같은 입력이다.
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from benchmarks import localdb, synth
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _measure(fn: Callable[[], object], repeat: int, before: Optional[Callable[[], None]] = None) -> dict:
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "min_ms": round(min(times) * 1000, 3),
+        "runs": repeat,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _parse_sizes(s: str):
+    return [tuple(int(v) for v in part.split("x")) for part in s.split(",") if part]
+
+
+def bench_fits_service(results: Dict[str, dict], workdir: Path, sizes, dtypes, repeat: int) -> None:
+    from src.services import fits_service as fs
+    from src.services.pipeline import MEMO
+
+    for shape in sizes:
+        for dtype in dtypes:
+            tag = f"[{'x'.join(map(str, shape))} {dtype}]"
+            path = synth.make_fits(str(workdir / f"cube_{'x'.join(map(str, shape))}_{dtype}.fits"), shape, dtype)
+
+            results[f"register_fits{tag}"] = _measure(lambda: fs.register_fits(path), repeat)
+            fid, _, _ = fs.register_fits(path)
+            meta = fs.get_meta(fid)
+
+            results[f"load_preview.cold{tag}"] = _measure(lambda: fs.load_preview(fid), repeat, before=MEMO.clear)
+            results[f"load_preview.warm{tag}"] = _measure(lambda: fs.load_preview(fid), repeat)
+            plane = meta["cube"][shape[0] // 2] if len(shape) == 3 else meta["cube"]
+            results[f"_to_png{tag}"] = _measure(lambda: fs._to_png(plane), repeat)
+
+            if len(shape) != 3:
+                continue
+            x, y = shape[2] // 2, shape[1] // 2
+            results[f"get_slit_image.cold{tag}"] = _measure(lambda: fs.get_slit_image(fid, x), repeat, before=MEMO.clear)
+            results[f"get_slit_image.warm{tag}"] = _measure(lambda: fs.get_slit_image(fid, x), repeat)
+            results[f"get_spectrum{tag}"] = _measure(lambda: fs.get_spectrum(fid, x, y), repeat, before=MEMO.clear)
+            results[f"guess_best_z{tag}"] = _measure(lambda: fs.guess_best_z(fid), repeat)
+
+
+def bench_mock(results: Dict[str, dict], workdir: Path, stems: int, repeat: int) -> None:
+    from flask import Flask
+    from src.mock import local_mock
+
+    png_dir, fits_dir = synth.make_mock_tree(str(workdir / "mock"), stems=stems)
+    os.environ["LOCAL_PNG_DIR"] = str(png_dir)
+    os.environ["LOCAL_FITS_DIR"] = str(fits_dir)
+    os.environ["LOCAL_INDEX_CACHE"] = str(workdir / "mock_index.pkl")
+    tag = f"[{stems} stems]"
+
+    results[f"mock._scan.full{tag}"] = _measure(lambda: local_mock._scan(force=True, full=True), repeat)
+    results[f"mock._scan.unchanged{tag}"] = _measure(lambda: local_mock._scan(force=True), repeat)
+
+    app = Flask(__name__)
+    app.register_blueprint(local_mock.mock_bp)
+    client = app.test_client()
+    for name, qs in [("all", ""), ("one_day", "date_from=2024-11-06%2000:00"), ("q", "q=_l1&sort=target")]:
+        results[f"mock.search.{name}{tag}"] = _measure(lambda: client.get(f"/dev/search?{qs}"), repeat)
+
+
+def bench_api_search(results: Dict[str, dict], workdir: Path, files: int, repeat: int) -> None:
+    app = localdb.make_app(str(workdir / "bench.sqlite"))
+    localdb.seed(app, files=files)
+    client = app.test_client()
+    tag = f"[{files} files sqlite]"
+    for name, qs in [
+        ("all", ""),
+        ("q", "q=M31"),
+        ("date_range", "date_from=2024-03-01&date_to=2024-03-31"),
+        ("exptime_sort", "exp_min=1&sort=-exptime"),
+    ]:
+        r = client.get(f"/api/search?{qs}")
+        if r.status_code != 200:
+            raise RuntimeError(f"/api/search?{qs} -> {r.status_code}")
+        results[f"api_search.{name}{tag}"] = _measure(lambda: client.get(f"/api/search?{qs}"), repeat)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the benchmark suite and write JSON results")
+    ap.add_argument("--sizes", default="32x256x256,1024x1024", help="ZxYxX or YxX, comma separated")
+    ap.add_argument("--dtypes", default="float32,int16")
+    ap.add_argument("--stems", type=int, default=2000, help="local_mock catalogue size")
+    ap.add_argument("--files", type=int, default=2000, help="fits_file rows seeded for /api/search")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", default="", help="comma separated subset: fits,mock,api")
+    ap.add_argument("--out", default="", help="JSON path (default: benchmarks/results/<commit>.json)")
+    args = ap.parse_args()
+
+    # .env 값(실제 데이터 경로, 외부 곡률 모듈 등)이 측정에 섞이지 않도록 고정
+    import src  # noqa: F401  (.env 로드를 먼저 끝내 두고 덮어쓴다)
+    for key in ("CALIB_DIR", "CHALLAN_APP_DIR", "CHAILLAN_APP_DIR", "CUBE_SHARED", "PROFILE_TOKEN", "PROFILE_SAMPLE_RATE"):
+        os.environ.pop(key, None)
+
+    only = set(filter(None, args.only.split(","))) or {"fits", "mock", "api"}
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="astro_bench_") as tmp:
+        workdir = Path(tmp)
+        # 실패 시 곡률 보정 등은 print로 건너뛰므로 측정 중 stdout은 모아서 버린다
+        with contextlib.redirect_stdout(io.StringIO()):
+            if "fits" in only:
+                bench_fits_service(results, workdir, _parse_sizes(args.sizes), args.dtypes.split(","), args.repeat)
+            if "mock" in only:
+                bench_mock(results, workdir, args.stems, args.repeat)
+            if "api" in only:
+                bench_api_search(results, workdir, args.files, args.repeat)
+
+    import astropy
+    commit = _git_commit()
+    doc = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "astropy": astropy.__version__,
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    out = Path(args.out) if args.out else ROOT / "benchmarks" / "results" / f"{commit or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+
+    width = max(len(k) for k in results) if results else 0
+    for k, v in results.items():
+        print(f"{k:<{width}}  {v['median_ms']:>10.3f} ms  (min {v['min_ms']:.3f})")
+    print(f"-> {out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/synth.py
+"""
+재현 가능한 합성 데이터 (seed 고정).
+
+  make_fits("/tmp/c.fits", (64, 512, 512), "float32")   # (Z, Y, X) 큐브 또는 (Y, X) 2D
+  make_mock_tree("/tmp/mock", stems=2000)                # local_mock용 png/ + fits/ 폴더
+  solar_frame(1024) / spectral_frame(512, 1024)          # 인코더 벤치용 대표 프레임 (2D float32)
+
+큐브 내용: 배경 잡음 + 가우시안 별 몇 개 + z 방향 흡수선 → percentile/stretch가 실제 데이터처럼 동작.
+헤더: INSTRUME/EXPTIME/DATE-OBS/OBJECT + 파장축 WCS(CTYPE3=WAVE).
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+from astropy.io import fits
+from PIL import Image
+
+DTYPES = {"uint8": np.uint8, "int16": np.int16, "int32": np.int32, "float32": np.float32, "float64": np.float64}
+
+
+def synth_cube(shape: Tuple[int, ...], dtype: str = "float32", seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    yx = shape[-2:]
+    img = rng.normal(100.0, 5.0, size=yx).astype(np.float32)
+    yy, xx = np.mgrid[: yx[0], : yx[1]]
+    for _ in range(8):
+        cy, cx = rng.uniform(0, yx[0]), rng.uniform(0, yx[1])
+        img += rng.uniform(200, 2000) * np.exp(-((yy - cy) ** 2 + (xx - cx) ** 2) / (2 * rng.uniform(2, 8) ** 2))
+    if len(shape) == 2:
+        data = img
+    else:
+        z = np.arange(shape[0], dtype=np.float32)
+        profile = 1.0 - 0.6 * np.exp(-((z - shape[0] / 2) ** 2) / (2 * max(1.0, shape[0] / 20) ** 2))
+        data = profile[:, None, None] * img[None, :, :]
+        data += rng.normal(0.0, 2.0, size=shape).astype(np.float32)
+    dt = np.dtype(DTYPES[dtype])
+    if dt.kind in "iu":
+        info = np.iinfo(dt)
+        data = np.clip(data, info.min, info.max)
+    return data.astype(dt)
+
+
+def make_fits(path: str, shape: Tuple[int, ...], dtype: str = "float32", seed: int = 0,
+              observed_at: datetime = datetime(2024, 11, 6, 22, 53, 10)) -> str:
+    hdu = fits.PrimaryHDU(synth_cube(shape, dtype, seed))
+    h = hdu.header
+    h["INSTRUME"] = "NXST"
+    h["EXPTIME"] = 1.0
+    h["OBJECT"] = "SYNTH"
+    h["DATE-OBS"] = observed_at.isoformat()
+    if len(shape) == 3:
+        h["CTYPE3"], h["CUNIT3"] = "WAVE", "Angstrom"
+        h["CRVAL3"], h["CDELT3"], h["CRPIX3"] = 6562.8 - shape[0] / 2 * 0.05, 0.05, 1.0
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    hdu.writeto(path, overwrite=True)
+    return path
+
+
+def solar_frame(size: int = 1024, seed: int = 0) -> np.ndarray:
+    """태양 전면 영상 흉내: 주연 감광 원반 + 쌀알무늬(미세 잡음) + 흑점 몇 개, 원반 밖은 어두운 하늘"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[:size, :size].astype(np.float32)
+    r = np.hypot(yy - size / 2, xx - size / 2) / (0.45 * size)
+    mu = np.sqrt(np.clip(1.0 - r ** 2, 0.0, 1.0))
+    disk = np.where(r < 1.0, 1.0 - 0.6 * (1.0 - mu), 0.0).astype(np.float32) * 3000.0
+    gran = rng.normal(0.0, 1.0, size=(size // 4, size // 4)).astype(np.float32)
+    gran = np.kron(gran, np.ones((4, 4), dtype=np.float32))[:size, :size]
+    img = disk * (1.0 + 0.03 * gran)
+    for _ in range(5):
+        cy, cx = rng.uniform(0.3, 0.7, size=2) * size
+        img *= 1.0 - 0.7 * np.exp(-((yy - cy) ** 2 + (xx - cx) ** 2) / (2 * rng.uniform(4, 12) ** 2))
+    return img + rng.normal(20.0, 3.0, size=img.shape).astype(np.float32)
+
+
+def spectral_frame(h: int = 512, w: int = 1024, seed: int = 0) -> np.ndarray:
+    """슬릿 분광 영상 흉내 (y × 파장): 연속광 기울기 + 흡수선들 + 슬릿 방향 세기 변화 + 잡음"""
+    rng = np.random.default_rng(seed)
+    lam = np.arange(w, dtype=np.float32)
+    cont = 1.0 + 0.2 * lam / w
+    for _ in range(12):
+        c, width, depth = rng.uniform(0, w), rng.uniform(1.5, 8.0), rng.uniform(0.2, 0.8)
+        cont *= 1.0 - depth * np.exp(-((lam - c) ** 2) / (2 * width ** 2))
+    along = 1.0 + 0.3 * np.sin(np.linspace(0, 3 * np.pi, h, dtype=np.float32))
+    img = 2000.0 * along[:, None] * cont[None, :]
+    return img + rng.normal(0.0, 15.0, size=img.shape).astype(np.float32)
+
+
+def make_mock_tree(root: str, stems: int = 2000, png_wh: Tuple[int, int] = (64, 48),
+                   fits_every: int = 10, seed: int = 0) -> Tuple[Path, Path]:
+    """
+    local_mock 폴더 구조: <root>/png/<stem>.png, <root>/fits/<stem>.fts
+    PNG는 모든 stem, FITS는 fits_every개마다 하나 (작은 2D). 같은 PNG 바이트를 재사용해 빠르게 생성.
+    """
+    root_p = Path(root)
+    png_dir, fits_dir = root_p / "png", root_p / "fits"
+    png_dir.mkdir(parents=True, exist_ok=True)
+    fits_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    w, h = png_wh
+    buf = png_dir / "_template.png"
+    Image.fromarray(rng.integers(0, 255, size=(h, w), dtype=np.uint8), mode="L").save(buf)
+    png_bytes = buf.read_bytes()
+    buf.unlink()
+    fits_tpl = fits.PrimaryHDU(synth_cube((16, h, w), "float32", seed))
+
+    t0 = datetime(2024, 11, 1)
+    step = timedelta(days=30) / max(1, stems)
+    for i in range(stems):
+        stem = f"nxst_{t0 + step * i:%Y%m%d_%H%M%S.%f}_l1"
+        (png_dir / f"{stem}.png").write_bytes(png_bytes)
+        if i % fits_every == 0:
+            fits_tpl.writeto(fits_dir / f"{stem}.fts", overwrite=True)
+    return png_dir, fits_dir
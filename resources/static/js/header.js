@@ -77,7 +77,7 @@
           file_id: out.file_id,
           filename: out.filename,
           header: out.header,
-          preview_png: out.preview_png,
+          preview_url: out.preview_url,
           shape: out.shape
         });
 
@@ -103,7 +103,7 @@
         }
   
         // 초기 프리뷰
-        global.setFitsPreview?.(out.preview_png);
+        global.setFitsPreview?.(out.preview_url);
         setStatus("업로드 성공", "success");
       } catch (err) {
         setStatus(err.message || "업로드 실패", "danger");
@@ -22,6 +22,8 @@
     lastX: null,
     lastY: null,
     currentZ: 0,
+    cmap: "gray",
+    stretch: "linear",
   };
 
   // 현재 프리뷰 드로잉 상태(좌표 변환용)
@@ -67,6 +69,41 @@
     if (headerObj) setText(headerMetaEl, summarizeHeader(headerObj));
   }
 
+  // 이미지 URL은 서버(_preview_url/_slit_url)와 같은 순서로 만들어야 브라우저 캐시를 같이 쓴다
+  function correctionFlag() {
+    return window.HeaderControls?.clipOn ? "true" : "false";
+  }
+
+  // 스트레치/컬러맵은 기본값(linear/gray)이면 빼서 서버 _style_params와 맞춘다
+  function withStyle(params) {
+    if (G.stretch && G.stretch !== "linear") params.set("stretch", G.stretch);
+    if (G.cmap && G.cmap !== "gray") params.set("cmap", G.cmap);
+    return params;
+  }
+
+  function previewUrl(fileId, z) {
+    const params = withStyle(new URLSearchParams({ z: String(z), percent_clip: PERCENT_CLIP, apply_correction: correctionFlag() }));
+    return `${API_BASE}/image/preview/${encodeURIComponent(fileId)}.png?${params.toString()}`;
+  }
+
+  function slitUrl(fileId, x) {
+    const params = withStyle(new URLSearchParams({ x: String(x), percent_clip: PERCENT_CLIP, apply_correction: correctionFlag() }));
+    return `${API_BASE}/image/slit/${encodeURIComponent(fileId)}.png?${params.toString()}`;
+  }
+
+  // 파일명/헤더는 파일당 한 번만 (/fits/meta 는 ETag로 캐시됨)
+  async function ensureMeta(fileId) {
+    if (!fileId || G._metaFor === fileId) return;
+    G._metaFor = fileId;
+    try {
+      const meta = await fetchJSON(`${API_BASE}/meta/${encodeURIComponent(fileId)}`);
+      if (G.fileId === fileId) applyMeta(meta.filename, meta.header);
+    } catch (e) {
+      G._metaFor = null;
+      console.warn("meta 불러오기 실패", e);
+    }
+  }
+
   // ---------- 초기 크기 세팅 & 리사이즈 ----------
   [fitsCanvas, slitCanvas, spectrumCanvas].forEach(sizeToParent);
   window.addEventListener("resize", () => {
@@ -78,68 +115,168 @@
 
   // ---------- 전역 함수: 헤더/다른 스크립트에서 호출 ----------
   // 업로드 성공 직후 헤더 스크립트에서 호출해주면 메타/프리뷰까지 반영됨
-  window.onFitsUploaded = function onFitsUploaded({ file_id, filename, header, preview_png, shape }) {
+  window.onFitsUploaded = function onFitsUploaded({ file_id, filename, header, preview_url, preview_png, shape }) {
     G.fileId = file_id;
     G.currentZ = 0;
     G.lastX = null;
     G.lastY = null;
+    G.spectrumWindow = null;
 
     applyMeta(filename, header);       // ✅ 파일명/헤더 갱신
-    window.setFitsPreview(preview_png);
+    if (header) G._metaFor = file_id;  // 업로드 응답에 헤더가 있으면 /fits/meta 생략
+    window.setFitsPreview(preview_url || preview_png);
   };
 
-  // 프리뷰 데이터 URL을 받아 캔버스에 그림
-  window.setFitsPreview = function setFitsPreview(dataUrl) {
-    G._lastPreview = dataUrl;
-    drawFitsPreview(dataUrl);
+  // 프리뷰 이미지 URL(또는 data URL)을 받아 캔버스에 그림
+  window.setFitsPreview = function setFitsPreview(src) {
+    G._lastPreview = src;
+    drawFitsPreview(src);
   };
 
-  // 프리뷰 갱신(/fits/preview) → (가능하면) 파일명/헤더도 함께 갱신
+  // 프리뷰 갱신: 이미지 URL만 바꾼다 (이미 본 z는 브라우저 캐시에서, 헤더는 파일당 한 번)
   window.refreshPreview = async function refreshPreview() {
     if (!G.fileId) return;
-    const correctionOn = !!window.HeaderControls?.clipOn;
 
-    const params = new URLSearchParams({
-      file_id: G.fileId,
-      z: String(G.currentZ),
-      percent_clip: PERCENT_CLIP,
-      apply_correction: correctionOn ? "true" : "false",
-    });
+    window.setFitsPreview(previewUrl(G.fileId, G.currentZ));
+    ensureMeta(G.fileId);
+
+    if (Number.isInteger(G.lastX) && Number.isInteger(G.lastY)) {
+      await window.drawSlitAndSpectrum(G.lastX, G.lastY);
+    }
+  };
+
+  // 표시 스타일 변경: setRenderStyle({ cmap: "viridis", stretch: "asinh" }) → 프리뷰/슬릿 다시 그림
+  //   cmap: gray|viridis|inferno|magma|plasma|hot (뒤에 "_r"이면 반전), stretch: linear|sqrt|log|asinh
+  window.setRenderStyle = async function setRenderStyle({ cmap, stretch } = {}) {
+    if (cmap !== undefined) G.cmap = cmap;
+    if (stretch !== undefined) G.stretch = stretch;
+    await window.refreshPreview();
+  };
+
+  // float16 비트 → float32 (dtype=float16 응답 디코드용)
+  function halfToFloat(h) {
+    const s = h & 0x8000 ? -1 : 1, e = (h >> 10) & 0x1f, f = h & 0x3ff;
+    if (e === 0) return s * f * 2 ** -24;
+    if (e === 31) return f ? NaN : s * Infinity;
+    return s * (1 + f / 1024) * 2 ** (e - 15);
+  }
+
+  // 큐브 일부를 바이너리로: fetchCube(fileId, { z: "0:40:2", y: "100:164", x: "5" })
+  //   → { shape: [20, 64], data: Float32Array } (C 순서, 마지막 축이 가장 빠름)
+  window.fetchCube = async function fetchCube(fileId, { z, y, x, dtype = "float32", applyCorrection } = {}) {
+    const correction = applyCorrection === undefined ? correctionFlag() : (applyCorrection ? "true" : "false");
+    const params = new URLSearchParams({ dtype, apply_correction: correction });
+    for (const [k, v] of Object.entries({ z, y, x })) if (v !== undefined && v !== null) params.set(k, String(v));
+    const r = await fetch(`${API_BASE}/cube/${encodeURIComponent(fileId)}?${params.toString()}`);
+    if (!r.ok) {
+      const out = await r.json().catch(() => ({}));
+      throw new Error(out.error || `HTTP ${r.status}`);
+    }
+    const shape = (r.headers.get("X-Cube-Shape") || "").split(",").filter(Boolean).map(Number);
+    const buf = await r.arrayBuffer();
+    const data = dtype === "float16" ? Float32Array.from(new Uint16Array(buf), halfToFloat) : new Float32Array(buf);
+    return { shape, data };
+  };
 
-    const out = await fetchJSON(`${API_BASE}/preview?${params.toString()}`);
-    window.setFitsPreview(out.preview_png);
+  // ---------- raw 슬라이스: 한 번 받아서 브라우저에서 다시 스트레치/컬러링 ----------
+  // fetchRawSlice(fileId, z) → { shape: [h, w], data: Uint16Array, offset, scale, nodata, bins, hist }
+  //   값 ≈ offset + code * scale (서버 /fits/raw 참고). 같은 z/보정이면 브라우저 캐시에서.
+  window.fetchRawSlice = async function fetchRawSlice(fileId, z, { applyCorrection } = {}) {
+    const correction = applyCorrection === undefined ? correctionFlag() : (applyCorrection ? "true" : "false");
+    const params = new URLSearchParams({ file_id: fileId, apply_correction: correction });
+    if (z !== undefined && z !== null) params.set("z", String(z));
+    const meta = await fetchJSON(`${API_BASE}/raw?${params.toString()}`);
+    const r = await fetch(meta.data_url);
+    if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    return { ...meta, data: new Uint16Array(await r.arrayBuffer()) };
+  };
 
-    // ✅ 서버가 filename/header를 내려주면 메타 갱신
-    if (out.filename || out.header) {
-      applyMeta(out.filename, out.header);
+  const lutCache = {};
+  async function colormapLut(name) {
+    if (!lutCache[name]) {
+      lutCache[name] = fetchJSON(`${API_BASE}/colormap/${encodeURIComponent(name)}`).then((o) => Uint8Array.from(o.lut));
     }
+    return lutCache[name];
+  }
 
-    if (Number.isInteger(G.lastX) && Number.isInteger(G.lastY)) {
-      await window.drawSlitAndSpectrum(G.lastX, G.lastY);
+  // 서버 _stretch_u8/colormap.stretch와 같은 곡선 (t는 [0, 1])
+  const STRETCH_FN = {
+    linear: (t) => t,
+    sqrt: (t) => Math.sqrt(t),
+    log: (t) => Math.log1p(1000 * t) / Math.log1p(1000),
+    asinh: (t) => Math.asinh(t / 0.1) / Math.asinh(1 / 0.1),
+  };
+
+  // 표시 구간(코드): percent_clip이면 서버가 준 p1/p99, 아니면 min/max (양자화 구간이 곧 min..max → 0..65534)
+  function clipCodes(raw, percentClip) {
+    if (percentClip > 0 && raw.p99 - raw.p1 >= 1) return [raw.p1, raw.p99];
+    return [0, raw.nodata - 1];
+  }
+
+  // restretchRaw(raw, { percentClip, stretch, cmap }) → ImageData (서버 왕복 없음)
+  //   코드 65536개 → 팔레트 인덱스 표를 먼저 만들고, 픽셀당 표 조회 두 번
+  window.restretchRaw = async function restretchRaw(raw, { percentClip = Number(PERCENT_CLIP), stretch = G.stretch, cmap = G.cmap } = {}) {
+    const lut = await colormapLut(cmap || "gray");
+    const fn = STRETCH_FN[stretch || "linear"] || STRETCH_FN.linear;
+    const [cLo, cHi] = clipCodes(raw, percentClip);
+    const span = Math.max(1, cHi - cLo);
+    const index = new Uint8Array(65536);
+    for (let c = 0; c < 65536; c++) {
+      const t = Math.min(1, Math.max(0, (c - cLo) / span));
+      index[c] = Math.min(255, Math.floor(fn(t) * 255));
+    }
+    // NaN/inf는 서버처럼 0.0 값으로 취급
+    index[raw.nodata] = index[Math.min(65534, Math.max(0, Math.round(-raw.offset / raw.scale)))];
+
+    const [h, w] = raw.shape;
+    const img = new ImageData(w, h);
+    const px = img.data, q = raw.data;
+    for (let i = 0, j = 0; i < q.length; i++, j += 4) {
+      const k = index[q[i]] * 3;
+      px[j] = lut[k]; px[j + 1] = lut[k + 1]; px[j + 2] = lut[k + 2]; px[j + 3] = 255;
     }
+    return img;
   };
 
   // 선택 좌표 기준 슬릿/스펙트럼 요청 후 렌더
   window.drawSlitAndSpectrum = async function drawSlitAndSpectrum(x, y) {
-    const correctionOn = !!window.HeaderControls?.clipOn;
-
-    // 슬릿
-    let out = await fetchJSON(
-      `${API_BASE}/slit?file_id=${G.fileId}&x=${x}&percent_clip=${PERCENT_CLIP}&apply_correction=${correctionOn ? "true" : "false"}`
-    );
-    G._lastSlit = out.slit_png;
-    drawImageToCanvas(out.slit_png, slitCanvas);
-
-    // 스펙트럼
-    out = await fetchJSON(
-      `${API_BASE}/spectrum?file_id=${G.fileId}&x=${x}&y=${y}&apply_correction=${correctionOn ? "true" : "false"}`
-    );
+    // 슬릿 (이미지 URL → 브라우저가 직접 받아 캐시)
+    G._lastSlit = slitUrl(G.fileId, x);
+    drawImageToCanvas(G._lastSlit, slitCanvas);
+
+    // 스펙트럼 (확대 구간이 있으면 그 구간만)
+    await loadSpectrum(x, y, G.spectrumWindow);
+  };
+
+  // 캔버스 가로 픽셀당 min/max 두 점이면 눈에 보이는 모양은 그대로 → 그 이상은 서버에서 줄여 받음
+  function spectrumMaxPoints() {
+    const w = spectrumCanvas?.getBoundingClientRect().width || 600;
+    return Math.max(200, Math.round(w * 2));
+  }
+
+  async function loadSpectrum(x, y, win) {
+    const params = new URLSearchParams({
+      file_id: G.fileId, x: String(x), y: String(y),
+      apply_correction: correctionFlag(),
+      max_points: String(spectrumMaxPoints()),
+    });
+    if (win) { params.set("lam_min", String(win[0])); params.set("lam_max", String(win[1])); }
+    const out = await fetchJSON(`${API_BASE}/spectrum?${params.toString()}`);
     G._lastSpec = { wavelength: out.wavelength, intensity: out.intensity };
     renderSpectrum(out.wavelength, out.intensity);
+  }
+
+  // 파장 구간 확대: zoomSpectrum(lo, hi) → 그 구간만 원본 해상도(필요하면 max_points 이하)로 다시 받음
+  //                zoomSpectrum() → 전체 보기로 복귀
+  window.zoomSpectrum = async function zoomSpectrum(lo, hi) {
+    G.spectrumWindow = (lo === undefined || hi === undefined) ? null : [Math.min(lo, hi), Math.max(lo, hi)];
+    if (Number.isInteger(G.lastX) && Number.isInteger(G.lastY)) {
+      await loadSpectrum(G.lastX, G.lastY, G.spectrumWindow);
+    }
   };
 
   // ---------- 그리기 ----------
-  function drawFitsPreview(dataUrl) {
+  function drawFitsPreview(src) {
     const ctx = fitsCanvas.getContext("2d");
     const { width: contW, height: contH } = fitsCanvas.getBoundingClientRect();
     ctx.clearRect(0, 0, contW, contH);
@@ -177,10 +314,11 @@
         drawMarkerAtDataXY(G.lastX, G.lastY);
       }
     };
-    img.src = dataUrl;
+    img.onerror = () => console.warn("프리뷰 이미지 불러오기 실패", src);
+    img.src = src;
   }
 
-  function drawImageToCanvas(dataUrl, canvas) {
+  function drawImageToCanvas(src, canvas) {
     if (!canvas) return;
     const ctx = canvas.getContext("2d");
     const { width: contW, height: contH } = canvas.getBoundingClientRect();
@@ -196,7 +334,8 @@
       else { w = cw; h = Math.floor(w / imgAR); x = 0; y = Math.floor((ch - h)/2); }
       ctx.drawImage(img, x, y, w, h);
     };
-    img.src = dataUrl;
+    img.onerror = () => console.warn("이미지 불러오기 실패", src);
+    img.src = src;
   }
 
   function drawMarkerAtDataXY(x, y) {
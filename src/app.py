@@ -9,9 +9,6 @@ from .mock.local_mock import mock_bp
 ENV_FILE = find_dotenv(filename=".env", usecwd=True) or str(Path(__file__).resolve().parents[1] / ".env")
 load_dotenv(ENV_FILE, override=True)
 
-print("[ENV] CHALLAN_APP_DIR =", os.getenv("CHALLAN_APP_DIR"))
-print("[ENV] CHAILLAN_APP_DIR =", os.getenv("CHAILLAN_APP_DIR"))  # ← 이 키는 오타일 가능성 있음
-
 # 2) 이후 Flask/DB import
 from flask import Flask, render_template
 from flask_migrate import Migrate  # type: ignore
@@ -19,7 +16,11 @@ from flask_migrate import Migrate  # type: ignore
 # 블루프린트/DB/모델 상대임포트 (app 패키지 기준)
 from .controller.FitsController import fits_bp
 from .controller.searchController import search_bp
+from .controller.metricsController import metrics_bp
+from .controller.debugController import debug_bp
+from .controller.exportController import export_bp
 from .model import db
+from .utils import metrics, profiler
 
 migrate = Migrate()  # ← 오타 수정 (migrAge -> migrAte)
 
@@ -45,6 +46,11 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # 계측: 요청/SQL 지연시간 → /metrics
+    metrics.install_flask(app)
+    metrics.instrument_sqlalchemy()
+    profiler.install_flask(app)   # PROFILE_TOKEN / PROFILE_SAMPLE_RATE 설정 시에만 동작
+
     # 라우트
     @app.route("/")
     def main():
@@ -54,4 +60,7 @@ def create_app():
     app.register_blueprint(fits_bp, url_prefix="/fits")
     app.register_blueprint(search_bp)  # /search, /api/search
     app.register_blueprint(mock_bp) # local_fits 파일과 테스트 하기 위함으로 만듦.
+    app.register_blueprint(metrics_bp)  # /metrics (Prometheus)
+    app.register_blueprint(debug_bp)    # /debug/profiles
+    app.register_blueprint(export_bp)   # /fits/export (ROI/z 범위/비닝 내보내기)
     return app
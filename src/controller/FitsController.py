@@ -3,19 +3,103 @@ from __future__ import annotations
 import os, base64, uuid, traceback
 from uuid import UUID  # ✅ 추가
 from sqlalchemy import asc  # ✅ 추가
-from flask import Blueprint, request, jsonify, current_app, abort , send_file
+import gzip, hashlib, json, math
+from io import BytesIO
+from flask import Blueprint, request, jsonify, current_app, abort, url_for, Response
 from werkzeug.utils import secure_filename
-from src.services import fits_service
+from src.services import fits_service, prefetch
 from ..model import db
-from ..model.models import PreviewImage, FileStorage
+from ..model.models import PreviewImage, FileStorage, FitsFile
+from ..utils import colormap, downsample, encoder
+from ..utils.lazy import lazy_module
+from ..utils.sendfile import serve_file
+
+np = lazy_module("numpy")
 
 fits_bp = Blueprint("fits", __name__)
 
 ALLOWED_EXT = {".fits", ".fts", ".fit"}
 
+# 같은 URL(file_id + 렌더 파라미터) = 같은 바이트 → 브라우저가 재검증 없이 재사용
+IMMUTABLE = "public, max-age=31536000, immutable"
+META_CACHE = "private, max-age=3600"
+# 업로드 직후 첫 프리뷰 (보정 없이, 기본 스트레치/컬러맵)
+UPLOAD_RENDER = {"percent_clip": 1.0, "apply_correction": False,
+                 "stretch": colormap.DEFAULT_STRETCH, "cmap": colormap.DEFAULT_CMAP,
+                 "fmt": encoder.DEFAULT_FORMAT, "profile": encoder.DEFAULT_PROFILE}
+
 def _b64(png: bytes) -> str:
     return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
 
+def _flag(name: str, default: str = "true") -> bool:
+    return request.args.get(name, default=default).lower() == "true"
+
+def _inline() -> bool:
+    # ?inline=1 이면 예전처럼 JSON 안에 data URL도 넣어 준다 (구 클라이언트 호환)
+    return request.args.get("inline", "").lower() in ("1", "true")
+
+def _render_args(image: bool = False) -> dict:
+    """
+    렌더 파라미터: percent_clip, apply_correction, stretch(linear|sqrt|log|asinh), cmap(gray|viridis|...),
+    profile(interactive|archive|thumbnail), fmt.
+    fmt는 이미지 응답(image=True)일 때만 ?format= 또는 Accept로 협상하고, JSON 응답은 PNG
+    (inline data URL이 PNG이고, 크기만 알면 되므로). 알 수 없는 값은 ValueError
+    """
+    out = {
+        "percent_clip": request.args.get("percent_clip", default=1.0, type=float),
+        "apply_correction": _flag("apply_correction"),
+        "stretch": request.args.get("stretch", default=colormap.DEFAULT_STRETCH).lower(),
+        "cmap": request.args.get("cmap", default=colormap.DEFAULT_CMAP).lower(),
+        "fmt": encoder.negotiate(request.accept_mimetypes, request.args.get("format")) if image
+               else encoder.DEFAULT_FORMAT,
+        "profile": request.args.get("profile", default=encoder.DEFAULT_PROFILE).lower(),
+    }
+    colormap.check(out["cmap"], out["stretch"])
+    encoder.check(out["fmt"], out["profile"])
+    return out
+
+def _style_params(r: dict) -> dict:
+    # 기본값(linear/gray/interactive)이면 URL에서 빼서 예전 URL과 같게. 이미지 형식은 URL에 넣지 않고 Accept로 협상
+    out = {}
+    if r["stretch"] != colormap.DEFAULT_STRETCH:
+        out["stretch"] = r["stretch"]
+    if r["cmap"] != colormap.DEFAULT_CMAP:
+        out["cmap"] = r["cmap"]
+    if r["profile"] != encoder.DEFAULT_PROFILE:
+        out["profile"] = r["profile"]
+    return out
+
+def _preview_url(file_id: str, z, r: dict) -> str:
+    params = {} if z is None else {"z": int(z)}
+    return url_for("fits.preview_png", file_id=file_id, **params, percent_clip=float(r["percent_clip"]),
+                   apply_correction="true" if r["apply_correction"] else "false", **_style_params(r))
+
+def _slit_url(file_id: str, x: int, r: dict) -> str:
+    return url_for("fits.slit_png", file_id=file_id, x=int(x), percent_clip=float(r["percent_clip"]),
+                   apply_correction="true" if r["apply_correction"] else "false", **_style_params(r))
+
+def _prefetch(fn, file_id: str, pos, r: dict) -> None:
+    # 프리페치 예약 실패가 응답을 막지 않도록
+    try:
+        fn(file_id, pos, **r)
+    except Exception as e:
+        print(f"[prefetch skipped] {type(e).__name__}: {e}")
+
+def _cached(etag: str, cache_control: str, build) -> Response:
+    """
+    If-None-Match가 etag와 맞으면 build() 없이 304.
+    build() -> (body, mimetype, 추가 헤더 dict)
+    """
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        body, mimetype, headers = build()
+        resp = Response(body, mimetype=mimetype)
+        resp.headers.update(headers)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = cache_control
+    return resp
+
 def _uploads_dir() -> str:
     root = current_app.root_path
     updir = os.path.join(root, "..", "uploads")
@@ -55,18 +139,23 @@ def upload():
         f.save(path)
 
         file_id, shape, header = fits_service.register_fits(path)
-        png, w, h = fits_service.load_preview(file_id, percent_clip=1.0, apply_correction=False)
+        # 여기서 한 번 렌더해 두면 곧 이어질 preview_url 요청은 파이프라인 캐시에서 나간다
+        png, w, h = fits_service.load_preview(file_id, **UPLOAD_RENDER)
 
-        return jsonify({
+        out = {
             "file_id": file_id,
             "filename": base,
             "saved_as": unique,
             "shape": list(shape) if shape else None,
             "header": header,
-            "preview_png": _b64(png),
+            "preview_url": _preview_url(file_id, None, UPLOAD_RENDER),
+            "meta_url": url_for("fits.meta", file_id=file_id),
             "width": w,
             "height": h,
-        })
+        }
+        if _inline():
+            out["preview_png"] = _b64(png)
+        return jsonify(out)
     except Exception as e:
         return jsonify({
             "error": f"업로드 실패: {type(e).__name__}: {e}",
@@ -75,28 +164,183 @@ def upload():
 
 @fits_bp.route("/preview", methods=["GET"], endpoint="preview")
 def preview_by_file():
+    """
+    프리뷰 JSON: 이미지 URL + 크기만. 이미지 바이트는 /fits/image/preview/<file_id>.png,
+    헤더는 /fits/meta/<file_id> 에서 따로 (각각 브라우저 캐시됨).
+    ?inline=1 이면 예전 형식(preview_png data URL, filename, header)도 함께.
+    """
     file_id = request.args.get("file_id")
     z = request.args.get("z", type=int)
-    percent_clip = request.args.get("percent_clip", default=1.0, type=float)
-    apply_correction = request.args.get("apply_correction", default="true").lower() == "true"
     if not file_id:
         return jsonify({"error": "file_id가 필요합니다"}), 400
     try:
-        png, w, h = fits_service.load_preview(
-            file_id, z=z, percent_clip=percent_clip, apply_correction=apply_correction
-        )
-        # ✅ 메타 함께 내려주기 (mainViewer.js의 refreshPreview에서 사용)
-        meta = fits_service.get_meta(file_id)
-        return jsonify({
-            "preview_png": _b64(png),
+        r = _render_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        png, w, h = fits_service.load_preview(file_id, z=z, **r)
+        _prefetch(fits_service.prefetch_preview, file_id, z, r)
+        out = {
+            "preview_url": _preview_url(file_id, z, r),
+            "meta_url": url_for("fits.meta", file_id=file_id),
             "width": w,
             "height": h,
-            "filename": os.path.basename(meta.get("path") or "") or meta.get("header", {}).get("FILENAME"),
-            "header": meta.get("header") or {},
-        })
+        }
+        if _inline():
+            meta = fits_service.get_meta(file_id)
+            out.update({
+                "preview_png": _b64(png),
+                "filename": os.path.basename(meta.get("path") or "") or meta.get("header", {}).get("FILENAME"),
+                "header": meta.get("header") or {},
+            })
+        return jsonify(out)
     except Exception as e:
         return jsonify({"error": f"프리뷰 실패: {type(e).__name__}: {e}"}), 500
 
+@fits_bp.get("/image/preview/<file_id>.png", endpoint="preview_png")
+def preview_png(file_id: str):
+    """
+    /fits/image/preview/<file_id>.png?z=&percent_clip=&apply_correction=&stretch=&cmap= → image/png (ETag, immutable)
+      stretch: linear(기본)|sqrt|log|asinh, cmap: gray(기본)|viridis|inferno|magma|plasma|hot (+ "_r")
+      형식: ?format=png|webp, 없으면 Accept에 image/webp가 있으면 WebP (URL은 .png 그대로, Vary: Accept)
+      profile: interactive(기본, 빠른 인코딩)|archive(무손실 최소 크기)|thumbnail(손실 허용)
+    """
+    z = request.args.get("z", type=int)
+    try:
+        r = _render_args(image=True)
+        etag = fits_service.preview_etag(file_id, z, **r)
+    except KeyError:
+        return jsonify({"error": "알 수 없는 file_id"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def build():
+        prefetch.wait(etag)   # 프리페치가 이 z를 그리는 중이면 그 결과를 쓴다
+        png, w, h = fits_service.load_preview(file_id, z=z, **r)
+        return png, encoder.FORMATS[r["fmt"]], {"X-Image-Width": str(w), "X-Image-Height": str(h)}
+
+    try:
+        resp = _cached(etag, IMMUTABLE, build)
+        resp.vary.add("Accept")   # 같은 URL이라도 Accept에 따라 PNG/WebP
+        _prefetch(fits_service.prefetch_preview, file_id, z, r)
+        return resp
+    except Exception as e:
+        return jsonify({"error": f"프리뷰 실패: {type(e).__name__}: {e}"}), 500
+
+def _raw_url(file_id: str, z, apply_correction: bool) -> str:
+    params = {} if z is None else {"z": int(z)}
+    return url_for("fits.raw_u16", file_id=file_id, **params,
+                   apply_correction="true" if apply_correction else "false")
+
+@fits_bp.get("/raw", endpoint="raw")
+def raw_slice():
+    """
+    /fits/raw?file_id=&z=&apply_correction=&bins=1024
+      z 평면을 16bit 양자화해서 한 번만 받고, percent_clip/스트레치/컬러맵은 브라우저에서 다시 적용하기 위한 메타.
+      → data_url(/fits/image/raw/<file_id>.u16), shape, offset, scale, nodata, hist(bins개, nodata 제외),
+        p1/p99(코드 단위 백분위수 — 프리뷰 percent_clip과 같은 구간)
+      값 ≈ offset + code * scale. 히스토그램 i번 구간 = 코드 [i*65536/bins, (i+1)*65536/bins)
+    """
+    file_id = request.args.get("file_id")
+    z = request.args.get("z", type=int)
+    apply_correction = _flag("apply_correction")
+    bins = request.args.get("bins", default=1024, type=int)
+    if not file_id:
+        return jsonify({"error": "file_id가 필요합니다"}), 400
+    try:
+        hist, p1, p99 = fits_service.raw_histogram(file_id, z, apply_correction=apply_correction, bins=bins)
+        q, offset, scale = fits_service.load_raw(file_id, z, apply_correction=apply_correction)
+    except KeyError:
+        return jsonify({"error": "알 수 없는 file_id"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"raw 슬라이스 실패: {type(e).__name__}: {e}"}), 500
+    _prefetch(fits_service.prefetch_raw, file_id, z, {"apply_correction": apply_correction})
+    return jsonify({
+        "data_url": _raw_url(file_id, z, apply_correction),
+        "shape": list(q.shape),
+        "dtype": "uint16",
+        "offset": offset,
+        "scale": scale,
+        "nodata": fits_service.RAW_NODATA,
+        "bins": bins,
+        "hist": hist.tolist(),
+        "p1": p1,
+        "p99": p99,
+    })
+
+@fits_bp.get("/image/raw/<file_id>.u16", endpoint="raw_u16")
+def raw_u16(file_id: str):
+    """
+    /fits/image/raw/<file_id>.u16?z=&apply_correction= → 리틀엔디언 uint16 (h*w*2바이트, C 순서)
+      X-Raw-Shape/X-Raw-Offset/X-Raw-Scale/X-Raw-Nodata 헤더. 브라우저가 gzip을 받으면 level 1로 압축.
+    """
+    z = request.args.get("z", type=int)
+    apply_correction = _flag("apply_correction")
+    gz = "gzip" in request.accept_encodings
+    try:
+        etag = fits_service.raw_etag(file_id, z, apply_correction=apply_correction) + ("-gz" if gz else "")
+    except KeyError:
+        return jsonify({"error": "알 수 없는 file_id"}), 404
+
+    def build():
+        prefetch.wait(etag.removesuffix("-gz"))
+        q, offset, scale = fits_service.load_raw(file_id, z, apply_correction=apply_correction)
+        body = q.tobytes()
+        headers = {
+            "X-Raw-Shape": ",".join(map(str, q.shape)),
+            "X-Raw-Offset": repr(offset),
+            "X-Raw-Scale": repr(scale),
+            "X-Raw-Nodata": str(fits_service.RAW_NODATA),
+        }
+        if gz:
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        return body, "application/octet-stream", headers
+
+    try:
+        resp = _cached(etag, IMMUTABLE, build)
+        resp.vary.add("Accept-Encoding")
+        _prefetch(fits_service.prefetch_raw, file_id, z, {"apply_correction": apply_correction})
+        return resp
+    except Exception as e:
+        return jsonify({"error": f"raw 슬라이스 실패: {type(e).__name__}: {e}"}), 500
+
+@fits_bp.get("/colormap/<name>", endpoint="colormap")
+def colormap_lut(name: str):
+    """/fits/colormap/<name> → {"name", "lut": [r,g,b, ...] 768개} (raw 슬라이스를 브라우저에서 칠할 때)"""
+    try:
+        table = colormap.lut(name)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    etag = hashlib.sha1(table.tobytes()).hexdigest()
+
+    def build():
+        return json.dumps({"name": name.lower(), "lut": table.ravel().tolist()}), "application/json", {}
+
+    return _cached(etag, IMMUTABLE, build)
+
+@fits_bp.get("/meta/<file_id>", endpoint="meta")
+def meta(file_id: str):
+    """파일명/shape/헤더. file_id가 같으면 내용도 같으므로 ETag로 재검증만."""
+    try:
+        m = fits_service.get_meta(file_id)
+    except KeyError:
+        return jsonify({"error": "알 수 없는 file_id"}), 404
+    etag = hashlib.sha1(f"{file_id}:{m.get('path')}".encode()).hexdigest()
+
+    def build():
+        body = json.dumps({
+            "file_id": file_id,
+            "filename": os.path.basename(m.get("path") or "") or m.get("header", {}).get("FILENAME"),
+            "shape": list(m["shape"]) if m.get("shape") else None,
+            "header": m.get("header") or {},
+        }, ensure_ascii=False, default=str)
+        return body, "application/json", {}
+
+    return _cached(etag, META_CACHE, build)
+
 @fits_bp.get("/preview/<preview_id_hex>", endpoint="preview_image")
 def preview_image(preview_id_hex: str):
     try:
@@ -109,7 +353,26 @@ def preview_image(preview_id_hex: str):
     fs = db.session.query(FileStorage).filter_by(file_id=pr.storage_file_id).first()
     if not fs:
         abort(404)
-    return send_file(fs.file_path, mimetype=fs.media_type or "image/png")
+    return serve_file(fs.file_path, mimetype=fs.media_type or "image/png", etag=fs.sha256_hash, max_age=86400)
+
+@fits_bp.get("/download/<fits_id_hex>", endpoint="download")
+def download(fits_id_hex: str):
+    """원본 FITS 다운로드 (Range 이어받기, SENDFILE_MODE 시 프런트 서버가 전송)"""
+    try:
+        fid = UUID(hex=fits_id_hex).bytes
+    except Exception:
+        abort(404)
+    row = (
+        db.session.query(FitsFile.original_filename, FileStorage.file_path, FileStorage.media_type, FileStorage.sha256_hash)
+        .join(FileStorage, FileStorage.file_id == FitsFile.storage_file_id)
+        .filter(FitsFile.fits_id == fid)
+        .first()
+    )
+    if not row:
+        abort(404)
+    name, path, media_type, sha = row
+    return serve_file(path, mimetype=media_type or "application/fits", as_attachment=True,
+                      download_name=name or os.path.basename(path), etag=sha)
 
 @fits_bp.get("/frames/<fits_id_hex>", endpoint="frames")
 def frames(fits_id_hex: str):
@@ -139,37 +402,149 @@ def frames(fits_id_hex: str):
 
     return jsonify({"count": len(items), "items": items})
 
+CUBE_DTYPES = ("float32", "float16")
+
+@fits_bp.get("/cube/<file_id>", endpoint="cube")
+def cube(file_id: str):
+    """
+    /fits/cube/<file_id>?z=10:40:2&y=100:164&x=5&apply_correction=true&dtype=float32&format=raw
+      z/y/x: NumPy식 "start:stop:step" 또는 정수(그 축 제거), 생략하면 전체
+      format=raw(기본): 리틀엔디언 배열 바이트 + X-Cube-Shape/X-Cube-Dtype 헤더 (JS: new Float32Array(buf))
+      format=npy: .npy (np.load로 바로)
+      dtype=float16이면 크기 절반. 요청 복셀 수는 CUBE_MAX_VOXELS(기본 16M) 이하.
+    """
+    apply_correction = _flag("apply_correction")
+    dtype = request.args.get("dtype", "float32")
+    fmt = request.args.get("format", "raw")
+    if dtype not in CUBE_DTYPES or fmt not in ("raw", "npy"):
+        return jsonify({"error": f"dtype은 {CUBE_DTYPES}, format은 raw/npy 중 하나"}), 400
+    try:
+        index = fits_service.subcube_index(file_id, request.args.get("z"), request.args.get("y"), request.args.get("x"))
+    except KeyError:
+        return jsonify({"error": "알 수 없는 file_id"}), 404
+    except (ValueError, IndexError) as e:
+        return jsonify({"error": f"잘못된 슬라이스: {e}"}), 400
+    shape = fits_service.subcube_shape(index)
+    limit = int(os.getenv("CUBE_MAX_VOXELS", str(16 * 1024 * 1024)))
+    n = int(math.prod(shape))
+    if n > limit:
+        return jsonify({"error": f"요청 복셀 수 {n}이 한도 {limit}를 넘습니다 (step이나 범위를 줄이세요)"}), 413
+    etag = fits_service.subcube_etag(file_id, index, apply_correction=apply_correction, dtype=f"{dtype}:{fmt}")
+
+    def build():
+        arr = fits_service.get_subcube(file_id, index, apply_correction=apply_correction, dtype=dtype)
+        if fmt == "npy":
+            buf = BytesIO()
+            np.save(buf, arr)
+            body = buf.getvalue()
+        else:
+            body = arr.tobytes()
+        return body, "application/octet-stream", {
+            "X-Cube-Shape": ",".join(map(str, arr.shape)),
+            "X-Cube-Dtype": dtype,
+            "X-Cube-Index": ";".join(
+                str(i) if isinstance(i, int) else f"{i.start}:{i.stop}:{i.step}" for i in index
+            ),
+        }
+
+    try:
+        return _cached(etag, IMMUTABLE, build)
+    except Exception as e:
+        return jsonify({"error": f"큐브 슬라이스 실패: {type(e).__name__}: {e}"}), 500
+
 @fits_bp.route("/slit", methods=["GET"])
 def slit():
     file_id = request.args.get("file_id")
     x = request.args.get("x", type=int)
-    percent_clip = request.args.get("percent_clip", default=1.0, type=float)
-    apply_correction = request.args.get("apply_correction", default="true").lower() == "true"
     if not file_id or x is None:
         return jsonify({"error": "file_id, x 가 필요합니다"}), 400
     try:
-        png, w, h = fits_service.get_slit_image(
-            file_id, x, percent_clip=percent_clip, apply_correction=apply_correction
-        )
-        return jsonify({"slit_png": _b64(png), "width": w, "height": h})
+        r = _render_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        png, w, h = fits_service.get_slit_image(file_id, x, **r)
+        _prefetch(fits_service.prefetch_slit, file_id, x, r)
+        out = {"slit_url": _slit_url(file_id, x, r), "width": w, "height": h}
+        if _inline():
+            out["slit_png"] = _b64(png)
+        return jsonify(out)
+    except Exception as e:
+        return jsonify({"error": f"슬릿 생성 실패: {type(e).__name__}: {e}"}), 500
+
+@fits_bp.get("/image/slit/<file_id>.png", endpoint="slit_png")
+def slit_png(file_id: str):
+    """/fits/image/slit/<file_id>.png?x=&percent_clip=&apply_correction=&stretch=&cmap=&profile= → 이미지 (preview_png와 같은 규칙)"""
+    x = request.args.get("x", type=int)
+    if x is None:
+        return jsonify({"error": "x 가 필요합니다"}), 400
+    try:
+        r = _render_args(image=True)
+        etag = fits_service.slit_etag(file_id, x, **r)
+    except KeyError:
+        return jsonify({"error": "알 수 없는 file_id"}), 404
+    except ValueError as e:
+        return jsonify({"error": f"슬릿 생성 실패: {e}"}), 400
+
+    def build():
+        prefetch.wait(etag)
+        png, w, h = fits_service.get_slit_image(file_id, x, **r)
+        return png, encoder.FORMATS[r["fmt"]], {"X-Image-Width": str(w), "X-Image-Height": str(h)}
+
+    try:
+        resp = _cached(etag, IMMUTABLE, build)
+        resp.vary.add("Accept")
+        _prefetch(fits_service.prefetch_slit, file_id, x, r)
+        return resp
     except Exception as e:
         return jsonify({"error": f"슬릿 생성 실패: {type(e).__name__}: {e}"}), 500
 
 @fits_bp.route("/spectrum", methods=["GET"])
 def spectrum():
+    """
+    /fits/spectrum?file_id=...&x=..&y=..
+      조리개(선택): r=반지름(원) 또는 hw/hh=x/y 반폭(박스), bg_in/bg_out=배경 고리 반지름
+      조리개 인자가 없으면 기존처럼 단일 픽셀 스펙트럼.
+      LOD(선택): max_points=N 이면 버킷별 min/max로 N점 이하, lam_min/lam_max로 파장 구간만
+      (확대 구간은 lam_min/lam_max만 주면 원본 해상도). 응답 "lod"에 원본/반환 개수.
+    """
     file_id = request.args.get("file_id")
     x = request.args.get("x", type=int)
     y = request.args.get("y", type=int)
-    apply_correction = request.args.get("apply_correction", default="true").lower() == "true"
+    apply_correction = _flag("apply_correction")
+    r = request.args.get("r", type=float)
+    hw = request.args.get("hw", default=0, type=int)
+    hh = request.args.get("hh", default=0, type=int)
+    bg_in = request.args.get("bg_in", type=float)
+    bg_out = request.args.get("bg_out", type=float)
+    max_points = request.args.get("max_points", type=int)
+    lam_min = request.args.get("lam_min", type=float)
+    lam_max = request.args.get("lam_max", type=float)
     if not file_id or x is None or y is None:
         return jsonify({"error": "file_id, x, y 가 필요합니다"}), 400
+    if hw < 0 or hh < 0 or (r is not None and r < 0):
+        return jsonify({"error": "hw, hh, r 는 0 이상이어야 합니다"}), 400
+    if bg_out is not None and not (0 <= (bg_in or 0.0) < bg_out):
+        return jsonify({"error": "배경 고리는 0 <= bg_in < bg_out 이어야 합니다"}), 400
     try:
-        lam, spec = fits_service.get_spectrum(file_id, x, y, apply_correction=apply_correction)
-        return jsonify({
+        out = {"x": x, "y": y}
+        if r or hw or hh or bg_out:
+            annulus = (bg_in or 0.0, bg_out) if bg_out else None
+            lam, spec, aperture = fits_service.get_aperture_spectrum(
+                file_id, x, y, half_w=hw, half_h=hh, radius=r, annulus=annulus,
+                apply_correction=apply_correction,
+            )
+            out["aperture"] = aperture
+        else:
+            lam, spec = fits_service.get_spectrum(file_id, x, y, apply_correction=apply_correction)
+        if max_points or lam_min is not None or lam_max is not None:
+            lam, spec, out["lod"] = downsample.reduce_series(
+                lam, spec, max_points=max_points, x_min=lam_min, x_max=lam_max
+            )
+        out.update({
             "wavelength": lam.tolist(),
             "intensity": spec.tolist(),
-            "x": x,
-            "y": y,
         })
+        return jsonify(out)
     except Exception as e:
         return jsonify({"error": f"스펙트럼 추출 실패: {type(e).__name__}: {e}"}), 500
@@ -0,0 +1,45 @@
+# src/controller/debugController.py
+from __future__ import annotations
+import os
+from pathlib import Path
+
+from flask import Blueprint, abort, current_app, jsonify, request, send_file, url_for
+
+from ..utils import profiler
+
+debug_bp = Blueprint("debug", __name__, url_prefix="/debug")
+
+
+def _require_token() -> None:
+    # PROFILE_TOKEN이 없으면 엔드포인트 자체를 숨김
+    if not profiler.authorized(request, (os.getenv("PROFILE_TOKEN") or "").strip().strip('\'"')):
+        abort(404)
+
+
+def _dir() -> Path:
+    return Path(current_app.config.get("PROFILE_DIR") or profiler.profile_dir(current_app))
+
+
+@debug_bp.get("/profiles")
+def profiles():
+    """최근 프로파일 목록 (최신순). ?_profile=<PROFILE_TOKEN> 또는 X-Profile 헤더 필요"""
+    _require_token()
+    tok = request.args.get("_profile")
+    items = profiler.list_profiles(_dir())
+    for it in items:
+        for kind in ("txt", "sql", "prof"):
+            it[f"{kind}_url"] = url_for("debug.profile_file", name=it["id"], kind=kind, _profile=tok)
+    return jsonify({"count": len(items), "items": items})
+
+
+@debug_bp.get("/profiles/<name>.<kind>")
+def profile_file(name: str, kind: str):
+    """txt: 누적시간 상위 함수, sql: SQL 로그(JSON), prof: pstats 원본 (snakeviz 등으로 열기)"""
+    _require_token()
+    p = profiler.profile_file(_dir(), name, kind)
+    if p is None:
+        abort(404)
+    if kind == "prof":
+        return send_file(p.resolve(), mimetype="application/octet-stream", as_attachment=True)
+    mimetype = "application/json" if kind == "sql" else "text/plain; charset=utf-8"
+    return send_file(p.resolve(), mimetype=mimetype)
@@ -0,0 +1,129 @@
+# src/controller/exportController.py
+from __future__ import annotations
+import os
+from uuid import UUID
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, url_for
+
+from ..model import db
+from ..model.models import FileStorage, FitsFile
+from ..services import export_service, fits_service
+from ..utils.sendfile import disposition_params, serve_file
+
+export_bp = Blueprint("export", __name__, url_prefix="/fits/export")
+
+
+def _params() -> dict:
+    # GET 쿼리 / POST form / POST JSON 모두 허용
+    out = dict(request.values.items())
+    out.update(request.get_json(silent=True) or {})
+    return out
+
+
+def _int(p: dict, key: str, default=None):
+    v = p.get(key)
+    if v is None or v == "":
+        return default
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key}는 정수여야 합니다")
+
+
+def _source(p: dict):
+    """fits_id(DB, FileStorage.file_path) 또는 file_id(업로드 등록본) → (경로, fits_id bytes|None)"""
+    if p.get("fits_id"):
+        try:
+            fid = UUID(hex=str(p["fits_id"])).bytes
+        except ValueError:
+            abort(404)
+        row = (
+            db.session.query(FileStorage.file_path)
+            .join(FitsFile, FitsFile.storage_file_id == FileStorage.file_id)
+            .filter(FitsFile.fits_id == fid)
+            .first()
+        )
+        if not row:
+            abort(404)
+        return row[0], fid
+    if p.get("file_id"):
+        try:
+            return fits_service.get_meta(str(p["file_id"]))["path"], None
+        except KeyError:
+            abort(404)
+    raise ValueError("fits_id 또는 file_id가 필요합니다")
+
+
+def _plan(p: dict):
+    path, fid = _source(p)
+    if not path or not os.path.isfile(path):
+        abort(404)
+    spec = export_service.plan(
+        path,
+        x=(_int(p, "x0"), _int(p, "x1")),
+        y=(_int(p, "y0"), _int(p, "y1")),
+        z=(_int(p, "z0"), _int(p, "z1")),
+        bin_xy=_int(p, "bin", 1),
+        bin_z=_int(p, "zbin", 1),
+    )
+    return spec, fid
+
+
+@export_bp.get("")
+def export_stream():
+    """
+    /fits/export?fits_id=<hex>|file_id=<id>&x0=&x1=&y0=&y1=&z0=&z1=&bin=&zbin=&format=fits|npy|npz
+      범위는 반열림 [시작, 끝), 생략하면 전체. bin=공간 비닝, zbin=파장축 비닝 (블록 평균).
+      메모리 사용량은 출력 크기와 무관 (청크 단위 스트리밍).
+    """
+    p = _params()
+    fmt = (p.get("format") or "fits").lower()
+    try:
+        spec, _ = _plan(p)
+        chunks, length = export_service.stream(spec, fmt)
+    except ValueError as e:
+        return jsonify({"error": f"내보내기 실패: {e}"}), 400
+
+    stem = os.path.splitext(os.path.basename(spec.path))[0]
+    resp = Response(chunks, mimetype=export_service.FORMATS[fmt], direct_passthrough=True)
+    resp.headers.set("Content-Disposition", "attachment", **disposition_params(f"{stem}_export.{fmt}"))
+    resp.headers["X-Export-Shape"] = "x".join(map(str, spec.shape))
+    if length is not None:
+        resp.content_length = length
+    return resp
+
+
+@export_bp.post("/jobs")
+def export_submit():
+    """같은 인자로 백그라운드 작업(JobTask EXPORT) 생성 → 202 + 상태 URL"""
+    p = _params()
+    fmt = (p.get("format") or "fits").lower()
+    try:
+        spec, fid = _plan(p)
+        task_hex = export_service.submit(current_app._get_current_object(), spec, fmt, fits_id=fid)
+    except ValueError as e:
+        return jsonify({"error": f"내보내기 실패: {e}"}), 400
+    return jsonify({
+        "task_id": task_hex,
+        "status_url": url_for("export.export_status", task_hex=task_hex),
+        "shape": list(spec.shape),
+    }), 202
+
+
+@export_bp.get("/jobs/<task_hex>")
+def export_status(task_hex: str):
+    st = export_service.status(task_hex)
+    if st is None:
+        abort(404)
+    if st["status"] == "SUCCESS":
+        st["download_url"] = url_for("export.export_download", task_hex=task_hex)
+    return jsonify(st)
+
+
+@export_bp.get("/jobs/<task_hex>/file")
+def export_download(task_hex: str):
+    path = export_service.result_path(task_hex)
+    if path is None:
+        abort(404)
+    return serve_file(str(path), mimetype=export_service.FORMATS[path.suffix[1:]], as_attachment=True,
+                      download_name=f"export_{task_hex[:8]}{path.suffix}")
@@ -0,0 +1,13 @@
+# src/controller/metricsController.py
+from __future__ import annotations
+from flask import Blueprint, Response
+
+from ..utils import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.get("/metrics")
+def prometheus_metrics():
+    """Prometheus 텍스트 형식 (scrape_configs에 /metrics 등록)"""
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -110,7 +110,7 @@ def api_search():
     def preview_url(pid_bytes):
         if not pid_bytes:
             return None
-        return url_for("fits.preview", preview_id_hex=UUID(bytes=pid_bytes).hex)
+        return url_for("fits.preview_image", preview_id_hex=UUID(bytes=pid_bytes).hex)
 
     items = []
     for ff, inst_name, obj, exptime, frames, pid in rows:
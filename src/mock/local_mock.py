@@ -1,23 +1,32 @@
 # src/mock/local_mock.py
 from __future__ import annotations
-from datetime import datetime
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timedelta
 import os
+import pickle
+import re
+import threading
 import uuid
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
-from flask import Blueprint, jsonify, request, send_file, abort, url_for
+from flask import Blueprint, jsonify, request, abort, url_for
 
-from ..utils.nameparse import parse_stem  # 파일명(stem) → 날짜/메타 파싱
+from ..utils.nameparse import parse_stem, parse_timestamp  # 파일명(stem) → 날짜/메타 파싱
+from ..utils.cache import ByteLRU
+from ..utils import downsample, metrics
+from ..utils.lazy import lazy_module
+from ..utils.sendfile import serve_file
 
-# ── 이미지/스펙트럼 계산 의존성 ────────────────────────────────────────────────
+# ── 이미지/스펙트럼 계산 의존성 (첫 사용 때 import) ─────────────────────────────
 #  PNG → numpy
-from PIL import Image
-import numpy as np
+Image = lazy_module("PIL.Image")
+np = lazy_module("numpy")
 
-#  FITS/WCS → 파장축 계산
-from astropy.io import fits
-from astropy.wcs import WCS
+#  FITS/WCS → 파장축 계산 (astropy.wcs는 import만 ~0.3s라 특히 지연)
+fits = lazy_module("astropy.io.fits")
+wcs = lazy_module("astropy.wcs")
 
 
 mock_bp = Blueprint("mock", __name__, url_prefix="/dev")
@@ -26,6 +35,19 @@ mock_bp = Blueprint("mock", __name__, url_prefix="/dev")
 _INDEX: Dict[str, Dict] = {}
 _LAST = {"png_dir": None, "fits_dir": None}
 
+# 보조 인덱스 (_scan 때 함께 구성)
+#  - _BY_FID: file_id_hex -> stem (O(1) 조회)
+#  - _BY_DATE: (datetime, stem) 시간순 정렬 배열 → 같은 날짜 구간을 bisect로 자름
+_BY_FID: Dict[str, str] = {}
+_BY_DATE: List[Tuple[datetime, str]] = []
+
+# 검색용 컬럼 배열 (_INDEX 삽입 순서와 같은 행 번호)
+#  stems/lower/target: 문자열, epoch_us: int64 (datetime 없으면 has_dt=False)
+#  exptime: float64 (NaN=없음), frames: int32
+#  order_*: 정렬 키별 argsort 결과 (미리 계산)
+_COLS: Dict[str, np.ndarray] = {}
+_EPOCH0 = datetime(1970, 1, 1)
+
 
 # ── 경로 읽기 (.env) ─────────────────────────────────────────────────────────
 def _env_paths() -> Tuple[Path, Path]:
@@ -39,14 +61,121 @@ def _env_paths() -> Tuple[Path, Path]:
     return png, fits_dir
 
 
+# ── 인덱스 스냅샷 (디스크 영속화) ─────────────────────────────────────────────
+#  - 디렉토리별 (mtime_ns, 하위 디렉토리, 대상 파일명) 목록과 완성된 _INDEX를 pickle로 저장
+#  - 재시작 시 스냅샷을 읽고, 디렉토리 mtime만 stat 해서 바뀐 디렉토리만 다시 listing
+#    (파일 추가/삭제/이름 변경은 부모 디렉토리 mtime을 바꾸므로 이것만으로 감지 가능)
+_SNAPSHOT_VERSION = 2  # 매칭 규칙이 바뀌면 올려서 이전 스냅샷을 무효화
+_PNG_EXTS = {".png"}
+_FITS_EXTS = {".fits", ".fts", ".fit"}
+
+# root 종류("png"/"fits") -> { dir_path: (mtime_ns, [subdir_path...], [file_name...]) }
+_DIRS: Dict[str, Dict[str, Tuple[int, List[str], List[str]]]] = {"png": {}, "fits": {}}
+
+
+def _snapshot_path() -> Path:
+    """LOCAL_INDEX_CACHE 미지정 시 <repo>/.cache/local_mock_index.pkl"""
+    raw = os.getenv("LOCAL_INDEX_CACHE", "").strip()
+    if raw:
+        return Path(raw)
+    return Path(__file__).resolve().parents[2] / ".cache" / "local_mock_index.pkl"
+
+
+def _load_snapshot(png_dir: Path, fits_dir: Path) -> bool:
+    path = _snapshot_path()
+    try:
+        with path.open("rb") as f:
+            snap = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return False
+    if (
+        not isinstance(snap, dict)
+        or snap.get("version") != _SNAPSHOT_VERSION
+        or snap.get("png_dir") != str(png_dir)
+        or snap.get("fits_dir") != str(fits_dir)
+    ):
+        return False
+    _DIRS.update(snap["dirs"])
+    _INDEX.clear()
+    _INDEX.update(snap["index"])
+    return True
+
+
+def _save_snapshot(png_dir: Path, fits_dir: Path) -> None:
+    path = _snapshot_path()
+    snap = {
+        "version": _SNAPSHOT_VERSION,
+        "png_dir": str(png_dir),
+        "fits_dir": str(fits_dir),
+        "dirs": _DIRS,
+        "index": _INDEX,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump(snap, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[mock] index snapshot not saved: {e}")
+
+
+def _walk_incremental(root: Path, kind: str, exts: set) -> bool:
+    """
+    root 아래를 훑어 _DIRS[kind]를 갱신한다.
+    mtime이 그대로인 디렉토리는 이전 listing을 재사용 → 디렉토리당 stat 1번.
+    반환: 변경 여부
+    """
+    old = _DIRS[kind]
+    new: Dict[str, Tuple[int, List[str], List[str]]] = {}
+    changed = False
+    stack = [str(root)] if root.exists() else []
+    while stack:
+        d = stack.pop()
+        try:
+            mtime = os.stat(d).st_mtime_ns
+        except OSError:
+            changed = True
+            continue
+        entry = old.get(d)
+        if entry is None or entry[0] != mtime:
+            subdirs, files = [], []
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_dir():
+                            subdirs.append(e.path)
+                        elif os.path.splitext(e.name)[1].lower() in exts:
+                            files.append(e.name)
+            except OSError:
+                pass
+            entry = (mtime, subdirs, files)
+            changed = True
+        new[d] = entry
+        stack.extend(entry[1])
+    if new.keys() != old.keys():
+        changed = True
+    _DIRS[kind] = new
+    return changed
+
+
+def _files(kind: str):
+    for d, (_, _, files) in _DIRS[kind].items():
+        for name in files:
+            yield Path(d) / name
+
+
 # ── 인덱스 스캔 ───────────────────────────────────────────────────────────────
-def _scan(force: bool = False) -> None:
+def _scan(force: bool = False, full: bool = False) -> None:
     """
     PNG/FITS를 훑어서 인메모리 인덱스(_INDEX)를 구성한다.
       - PNG가 있으면 그 stem을 기준으로 등록하고, 동일 stem FITS를 우선 매칭
-      - 동일 stem 매칭 실패 시, 파일명에서 파싱한 타임스탬프(YYYYMMDD_HHMMSS)로
-        FITS 후보를 찾아 '유일 후보'일 때만 보조 매칭
+      - 동일 stem 매칭 실패 시, 파일명에서 파싱한 타임스탬프로 FITS를 초 단위 버킷에서 찾아
+        허용 오차(LOCAL_FITS_MATCH_TOL 초, 기본 1.0) 안의 가장 가까운 것으로 보조 매칭
       - PNG가 전혀 없어도 FITS만 있는 항목은 frames=0으로 별도 등록
+    첫 호출 시 디스크 스냅샷을 읽고 디렉토리 mtime 비교로 증분 갱신한다.
+    바뀐 디렉토리가 없으면 스냅샷의 인덱스를 그대로 쓰고, 있으면 재구성 후 다시 저장.
+    full=True면 스냅샷/디렉토리 캐시를 버리고 전체를 다시 훑는다.
     """
     png_dir, fits_dir = _env_paths()
 
@@ -59,21 +188,174 @@ def _scan(force: bool = False) -> None:
     ):
         return
 
-    _INDEX.clear()
+    roots_changed = _LAST["png_dir"] != str(png_dir) or _LAST["fits_dir"] != str(fits_dir)
+    if full:
+        _DIRS.update({"png": {}, "fits": {}})
+        _INDEX.clear()
+    elif roots_changed and not _load_snapshot(png_dir, fits_dir):
+        _DIRS.update({"png": {}, "fits": {}})
+        _INDEX.clear()
     _LAST.update({"png_dir": str(png_dir), "fits_dir": str(fits_dir)})
 
+    changed = _walk_incremental(png_dir, "png", _PNG_EXTS)
+    changed = _walk_incremental(fits_dir, "fits", _FITS_EXTS) or changed
+    if changed or not _INDEX:
+        _build_index()
+        _save_snapshot(png_dir, fits_dir)
+    _build_secondary()
+    _build_columns()
+
+
+def _nearest_fits(dt: datetime, fits_by_sec: Dict[int, List[Tuple[int, str]]], tol_us: int) -> Optional[str]:
+    """
+    dt와 가장 가까운 FITS stem (|차이| <= tol_us). 인접 초 버킷만 확인하므로 O(1).
+    차이가 같으면 stem 사전순으로 골라 결과가 항상 같게 한다.
+    """
+    us = _epoch_us(dt)
+    sec = us // 1_000_000
+    span = -(-tol_us // 1_000_000)  # ceil
+    best: Optional[Tuple[int, str]] = None
+    for k in range(sec - span, sec + span + 1):
+        for fus, fstem in fits_by_sec.get(k, ()):
+            cand = (abs(fus - us), fstem)
+            if cand[0] <= tol_us and (best is None or cand < best):
+                best = cand
+    return best[1] if best else None
+
+
+def _build_secondary() -> None:
+    """_INDEX로부터 file_id → stem 해시맵과 시간순 (datetime, stem) 배열을 만든다."""
+    _BY_FID.clear()
+    pairs: List[Tuple[datetime, str]] = []
+    for stem, rec in _INDEX.items():
+        _BY_FID[rec["file_id_hex"]] = stem
+        dt = _parse_iso(rec["meta"].get("datetime"))
+        if dt is not None:
+            pairs.append((dt, stem))
+    pairs.sort()
+    _BY_DATE[:] = pairs
+
+
+def _epoch_us(dt: datetime) -> int:
+    return (dt - _EPOCH0) // timedelta(microseconds=1)
+
+
+def _build_columns() -> None:
+    """_INDEX를 컬럼형 NumPy 배열로 펼치고 정렬 순서를 미리 계산한다."""
+    n = len(_INDEX)
+    stems = list(_INDEX.keys())
+    epoch = np.zeros(n, dtype=np.int64)
+    has_dt = np.zeros(n, dtype=bool)
+    exptime = np.full(n, np.nan, dtype=np.float64)
+    frames = np.zeros(n, dtype=np.int32)
+    for i, rec in enumerate(_INDEX.values()):
+        meta = rec["meta"]
+        dt = _parse_iso(meta.get("datetime"))
+        if dt is not None:
+            epoch[i] = _epoch_us(dt)
+            has_dt[i] = True
+        if meta.get("exptime") is not None:
+            exptime[i] = meta["exptime"]
+        frames[i] = meta.get("frames") or 0
+
+    stems_arr = np.array(stems, dtype=str)
+    target = np.array([st.split("_")[0] for st in stems], dtype=str)
+
+    # 날짜순: datetime 없는 행이 앞(기존 문자열 정렬에서 ""가 가장 작았던 것과 동일)
+    order_date = np.lexsort((epoch, has_dt))
+    n_missing = int(n - has_dt.sum())
+    exp0 = np.nan_to_num(exptime, nan=0.0)
+    target_rank = np.unique(target, return_inverse=True)[1]
+
+    _COLS.clear()
+    _COLS.update({
+        "stems": stems_arr,
+        "lower": np.char.lower(stems_arr),
+        "target": target,
+        "epoch_us": epoch,
+        "has_dt": has_dt,
+        "exptime": exptime,
+        "frames": frames,
+        "order_date": order_date,
+        "n_missing": np.int64(n_missing),
+        "sorted_epoch": epoch[order_date[n_missing:]],
+        "order_exptime": np.argsort(exp0, kind="stable"),
+        "order_target": np.argsort(target, kind="stable"),
+        # 내림차순도 안정 정렬로 따로 (오름차순을 뒤집으면 같은 키끼리 순서까지 뒤집힌다 —
+        # 기존 list.sort(reverse=True)는 같은 키의 스캔 순서를 유지)
+        "order_date_desc": np.lexsort((-epoch, ~has_dt)),
+        "order_exptime_desc": np.argsort(-exp0, kind="stable"),
+        "order_target_desc": np.argsort(-target_rank, kind="stable"),
+    })
+
+
+def _query_columns(q: str, df: Optional[datetime], dt: Optional[datetime], sort: str) -> np.ndarray:
+    """조건에 맞는 행 번호를 정렬 순서대로 반환 (JSON 변환 없이 배열 연산만)"""
+    n = len(_COLS.get("stems", ()))
+    if not n:
+        return np.zeros(0, dtype=np.int64)
+
+    if df or dt:
+        order_date = _COLS["order_date"]
+        n_missing = int(_COLS["n_missing"])
+        sorted_epoch = _COLS["sorted_epoch"]
+        lo = np.searchsorted(sorted_epoch, _epoch_us(df), "left") if df else 0
+        hi = np.searchsorted(sorted_epoch, _epoch_us(dt), "right") if dt else sorted_epoch.size
+        mask = np.zeros(n, dtype=bool)
+        mask[order_date[:n_missing]] = True  # datetime 없는 행은 날짜 조건을 통과
+        mask[order_date[n_missing + lo:n_missing + max(lo, hi)]] = True
+    else:
+        mask = np.ones(n, dtype=bool)
+
+    if q:
+        cand = np.flatnonzero(mask)
+        hit = np.char.find(_COLS["lower"][cand], q) >= 0
+        mask[cand[~hit]] = False
+
+    key = (sort or "-observed_at").lstrip("-")
+    rev = (sort or "-observed_at").startswith("-")
+    suffix = "_desc" if rev else ""
+    if key in ("observed_at", "date_obs"):
+        order = _COLS["order_date" + suffix]
+    elif key == "exptime":
+        order = _COLS["order_exptime" + suffix]
+    elif key in ("object", "target"):
+        order = _COLS["order_target" + suffix]
+    else:
+        return np.flatnonzero(mask)
+    return order[mask[order]]
+
+
+def _stems_on_date(anchor: datetime) -> List[str]:
+    """anchor와 같은 날짜(00:00 ~ 다음날 00:00 미만)의 stem들을 시간순으로"""
+    day0 = datetime(anchor.year, anchor.month, anchor.day)
+    lo = bisect_left(_BY_DATE, (day0,))
+    hi = bisect_left(_BY_DATE, (day0 + timedelta(days=1),))
+    return [stem for _, stem in _BY_DATE[lo:hi]]
+
+
+def _build_index() -> None:
+    """_DIRS의 파일 목록으로 _INDEX를 다시 만든다."""
+    _INDEX.clear()
+
     # 1) FITS stem 수집
     fits_map: Dict[str, Path] = {}
-    if fits_dir.exists():
-        for p in fits_dir.rglob("*"):
-            if p.suffix.lower() in {".fits", ".fts", ".fit"}:
-                fits_map[p.stem] = p
+    for p in _files("fits"):
+        fits_map[p.stem] = p
+
+    # 1-1) FITS stem을 초 단위 타임스탬프 버킷으로 (보조 매칭용)
+    fits_by_sec: Dict[int, List[Tuple[int, str]]] = {}
+    for stem in fits_map:
+        fdt = parse_timestamp(stem)
+        if fdt is not None:
+            us = _epoch_us(fdt)
+            fits_by_sec.setdefault(us // 1_000_000, []).append((us, stem))
+    tol_us = int(float(os.getenv("LOCAL_FITS_MATCH_TOL", "1.0")) * 1_000_000)
 
     # 2) PNG stem → 파일들
     png_groups: Dict[str, List[Path]] = {}
-    if png_dir.exists():
-        for p in png_dir.rglob("*.png"):
-            png_groups.setdefault(p.stem, []).append(p)
+    for p in _files("png"):
+        png_groups.setdefault(p.stem, []).append(p)
 
     # 3) PNG가 있는 stem 우선 등록
     for stem, arr in png_groups.items():
@@ -87,12 +369,11 @@ def _scan(force: bool = False) -> None:
         # ① 기본: 동일 stem으로 FITS 매칭
         fpath: Optional[Path] = fits_map.get(stem)
 
-        # ② 기본 매칭 실패 시: 타임스탬프 기반 보조 매칭 (유일 후보일 때만)
+        # ② 기본 매칭 실패 시: 타임스탬프 기반 보조 매칭 (허용 오차 안에서 가장 가까운 FITS)
         if not fpath and meta.get("dt"):
-            ts = meta["dt"].strftime("%Y%m%d_%H%M%S")  # 예: 20241017_043512
-            candidates = [k for k in fits_map.keys() if ts in k]
-            if len(candidates) == 1:
-                fpath = fits_map[candidates[0]]
+            fstem = _nearest_fits(meta["dt"], fits_by_sec, tol_us)
+            if fstem:
+                fpath = fits_map[fstem]
 
         # 안정적 파일 ID (앱 재시작해도 동일)
         fid = uuid.uuid5(uuid.NAMESPACE_URL, f"mock:{stem}").hex
@@ -133,6 +414,25 @@ def _scan(force: bool = False) -> None:
 
 
 # ── 유틸: 스펙트럼 계산 (PNG/FITS) ───────────────────────────────────────────
+#  디코딩한 PNG 프레임 캐시: (path, mtime_ns) -> (uint8 프레임 (H, W), 행 누적합 (H+1, W))
+#  y 대역 슬라이더를 끌 때마다 같은 PNG를 다시 디코딩하지 않고,
+#  임의의 (y, h) 대역 합을 rowcum[y1] - rowcum[y0] 한 번의 뺄셈(O(W))으로 구한다.
+_FRAME_CACHE = ByteLRU(int(os.getenv("LOCAL_FRAME_CACHE_MB", "256")) * 1024 * 1024, name="mock_frames")
+
+
+def _decoded_png(png_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    def decode():
+        with metrics.timed(metrics.STAGE_SECONDS, stage="png_decode"):
+            img = Image.open(png_path).convert("L")  # grayscale
+        frame = np.asarray(img, dtype=np.uint8)  # (H, W)
+        rowcum = np.zeros((frame.shape[0] + 1, frame.shape[1]), dtype=np.uint32)
+        np.cumsum(frame, axis=0, dtype=np.uint32, out=rowcum[1:])
+        return frame, rowcum
+
+    key = (png_path, os.stat(png_path).st_mtime_ns)
+    return _FRAME_CACHE.get_or_compute(key, decode)
+
+
 def _spectrum_from_png(
     png_path: str, y: Optional[int] = None, h: int = 5
 ) -> Tuple[List[int], List[float], Dict]:
@@ -140,15 +440,14 @@ def _spectrum_from_png(
     PNG 이미지를 열어 x-축 스펙트럼(픽셀 vs intensity)을 만든다.
     y: 중심 y 픽셀(미지정 시 중앙), h: ±h 합(총 2h+1 행)
     """
-    img = Image.open(png_path).convert("L")  # grayscale
-    arr = np.asarray(img, dtype=np.float32)  # (H, W)
-    H, W = arr.shape
+    frame, rowcum = _decoded_png(png_path)
+    H, W = frame.shape
     if y is None:
         y = H // 2
-    y0 = max(0, y - h)
-    y1 = min(H, y + h + 1)
-    band = arr[y0:y1, :]  # (rows, W)
-    spec = band.sum(axis=0)  # (W,)
+    # 범위 밖 y(음수 포함)는 빈 대역 → 0 스펙트럼 (rowcum 음수/초과 인덱싱 방지)
+    y0 = min(max(0, y - h), H)
+    y1 = max(y0, min(H, y + h + 1))
+    spec = (rowcum[y1] - rowcum[y0]).astype(np.float32)  # (W,) = band.sum(axis=0)
 
     # 보기 좋게 정규화
     if spec.max() > 0:
@@ -159,6 +458,82 @@ def _spectrum_from_png(
     return x, yvals, {"height": H, "width": W, "y0": y0, "y1": y1}
 
 
+# ── FITS 핸들 / 파장축 캐시 ───────────────────────────────────────────────────
+#  같은 파일을 반복 클릭할 때 fits.open / HDU 탐색 / WCS 생성을 다시 하지 않도록
+#  - _FITS_HANDLES: (path, mtime_ns, hdu_index) -> (HDUList, 선택된 HDU), LRU
+#  - _LAMBDA_CACHE: (WCS 키워드들, 축 길이) -> (λ 리스트, 단위), LRU
+_FITS_HANDLES: "OrderedDict[Tuple[str, int, Optional[int]], Tuple[object, object]]" = OrderedDict()
+_FITS_HANDLES_MAX = int(os.getenv("LOCAL_FITS_HANDLES", "16"))
+_LAMBDA_CACHE: "OrderedDict[Tuple, Tuple[Optional[List[float]], Optional[str]]]" = OrderedDict()
+_LAMBDA_CACHE_MAX = 256
+_CACHE_LOCK = threading.Lock()
+_WCS_KEY_RE = re.compile(
+    r"^(WCSAXES|CTYPE\d|CUNIT\d|CRVAL\d|CDELT\d|CRPIX\d|CROTA\d|PC\d_\d|CD\d_\d|PV\d_\d+|PS\d_\d+"
+    r"|LONPOLE|LATPOLE|RESTFRQ|RESTWAV|SPECSYS|EQUINOX|RADESYS|NAXIS\d?)$"
+)
+
+
+def _open_image_hdu(fits_path: str, hdu_index: Optional[int]):
+    """memmap으로 연 이미지 HDU를 LRU에서 꺼내거나 새로 열어 넣는다."""
+    key = (fits_path, os.stat(fits_path).st_mtime_ns, hdu_index)
+    with _CACHE_LOCK:
+        hit = _FITS_HANDLES.get(key)
+        if hit is not None:
+            _FITS_HANDLES.move_to_end(key)
+            return hit[1]
+
+    with metrics.timed(metrics.STAGE_SECONDS, stage="fits_open"):
+        hdul = fits.open(fits_path, memmap=True)
+    try:
+        # 이미지 HDU 선택
+        if (
+            hdu_index is not None
+            and 0 <= hdu_index < len(hdul)
+            and getattr(hdul[hdu_index], "data", None) is not None
+        ):
+            hdu = hdul[hdu_index]
+        else:
+            hdu = next(
+                (h for h in hdul if getattr(h, "data", None) is not None and h.data.ndim >= 2),
+                None,
+            )
+            if hdu is None:
+                raise ValueError("No image HDU found in FITS")
+    except Exception:
+        hdul.close()
+        raise
+
+    with _CACHE_LOCK:
+        # 다른 스레드가 같은 파일을 먼저 넣었으면 그쪽을 쓰고 우리 것은 버린다 (아무도 안 씀)
+        hit = _FITS_HANDLES.get(key)
+        if hit is not None:
+            _FITS_HANDLES.move_to_end(key)
+            hdul.close()
+            return hit[1]
+        _FITS_HANDLES[key] = (hdul, hdu)
+        while len(_FITS_HANDLES) > _FITS_HANDLES_MAX:
+            # 밀려난 HDUList는 close()하지 않는다: 다른 요청 스레드가 아직 memmap된 hdu.data를
+            # 읽고 있을 수 있다. 마지막 참조가 사라지면 GC가 memmap/파일을 닫는다.
+            _FITS_HANDLES.popitem(last=False)
+    return hdu
+
+
+def _cached_wavelength_axis(hdr, length: int) -> Tuple[Optional[List[float]], Optional[str]]:
+    """WCS 관련 키워드 + 길이가 같으면 이전 λ 계산 결과를 재사용"""
+    key = (length, tuple((k, hdr[k]) for k in hdr.keys() if _WCS_KEY_RE.match(k)))
+    with _CACHE_LOCK:
+        hit = _LAMBDA_CACHE.get(key)
+        if hit is not None:
+            _LAMBDA_CACHE.move_to_end(key)
+            return hit
+    out = _wavelength_axis_from_header(hdr, length)
+    with _CACHE_LOCK:
+        _LAMBDA_CACHE[key] = out
+        while len(_LAMBDA_CACHE) > _LAMBDA_CACHE_MAX:
+            _LAMBDA_CACHE.popitem(last=False)
+    return out
+
+
 def _wavelength_axis_from_header(hdr, length: int) -> Tuple[Optional[List[float]], Optional[str]]:
     """
     FITS header에서 1축 파장 보정 정보를 뽑아 λ 배열 생성.
@@ -166,13 +541,13 @@ def _wavelength_axis_from_header(hdr, length: int) -> Tuple[Optional[List[float]
     """
     # ① WCS 시도
     try:
-        w = WCS(hdr)
+        w = wcs.WCS(hdr)
         pix = np.arange(length, dtype=float)
         # y=0 고정, x만 스캔 (2D 가정)
         world = w.all_pix2world(np.vstack([pix, np.zeros_like(pix)]).T, 0)
         lam = np.asarray(world[:, 0], dtype=float)
         unit = hdr.get("CUNIT1") or "unknown"
-        if np.isfinite(lam).all() and lam.ptp() > 0:
+        if np.isfinite(lam).all() and np.ptp(lam) > 0:
             return lam.tolist(), unit
     except Exception:
         pass
@@ -188,7 +563,7 @@ def _wavelength_axis_from_header(hdr, length: int) -> Tuple[Optional[List[float]
         x = np.arange(length, dtype=float) + 1.0  # FITS는 1-indexed
         lam = crval + (x - crpix) * cdelt
         unit = hdr.get("CUNIT1") or "unknown"
-        if np.isfinite(lam).all() and lam.ptp() > 0:
+        if np.isfinite(lam).all() and np.ptp(lam) > 0:
             return lam.tolist(), unit
     except Exception:
         pass
@@ -205,62 +580,42 @@ def _spectrum_from_fits(
     - λ 축은 WCS 또는 CRVAL1/CD1_1/CRPIX1 기반
     반환: (lambda(list), flux(list), meta(dict))
     """
-    with fits.open(fits_path, memmap=True) as hdul:
-        # 이미지 HDU 선택
-        if (
-            hdu_index is not None
-            and 0 <= hdu_index < len(hdul)
-            and getattr(hdul[hdu_index], "data", None) is not None
-        ):
-            hdu = hdul[hdu_index]
-        else:
-            hdu = next(
-                (h for h in hdul if getattr(h, "data", None) is not None and h.data.ndim >= 2),
-                None,
-            )
-            if hdu is None:
-                raise ValueError("No image HDU found in FITS")
+    hdu = _open_image_hdu(fits_path, hdu_index)
+    data = hdu.data
+    hdr = hdu.header
 
-        data = hdu.data
-        hdr = hdu.header
+    # 2D/3D 처리: 필요한 y 대역만 memmap에서 읽는다 (3D면 첫 프레임)
+    H, W = data.shape[-2], data.shape[-1]
+    if y is None:
+        y = H // 2
+    y0 = max(0, y - h)
+    y1 = min(H, y + h + 1)
+    band = np.asarray(data[0, y0:y1, :] if data.ndim == 3 else data[y0:y1, :], dtype=np.float32)
+    flux = band.sum(axis=0)  # (W,)
 
-        # 2D/3D 처리
-        if data.ndim == 3:
-            img = np.asarray(data[0], dtype=np.float32)  # 첫 프레임
-        else:
-            img = np.asarray(data, dtype=np.float32)
-
-        H, W = img.shape[-2], img.shape[-1]
-        if y is None:
-            y = H // 2
-        y0 = max(0, y - h)
-        y1 = min(H, y + h + 1)
-        band = img[y0:y1, :]  # (rows, W)
-        flux = band.sum(axis=0)  # (W,)
-
-        # 파장축
-        lam, unit = _wavelength_axis_from_header(hdr, W)
-        lam_is_wavelength = lam is not None
-        if lam is None:
-            lam = np.arange(W, dtype=float).tolist()
-            unit = "pixel"
-
-        # 보기 좋게 정규화
-        f = flux.astype(float)
-        m = np.nanmax(f)
-        if m > 0:
-            f = f / m
-
-        meta = {
-            "height": H,
-            "width": W,
-            "y0": y0,
-            "y1": y1,
-            "wavelength_unit": unit,
-            "x_is_wavelength": bool(lam_is_wavelength),
-            "hdu_index": getattr(hdu, "index", None),
-        }
-        return lam, f.tolist(), meta
+    # 파장축
+    lam, unit = _cached_wavelength_axis(hdr, W)
+    lam_is_wavelength = lam is not None
+    if lam is None:
+        lam = np.arange(W, dtype=float).tolist()
+        unit = "pixel"
+
+    # 보기 좋게 정규화
+    f = flux.astype(float)
+    m = np.nanmax(f)
+    if m > 0:
+        f = f / m
+
+    meta = {
+        "height": H,
+        "width": W,
+        "y0": y0,
+        "y1": y1,
+        "wavelength_unit": unit,
+        "x_is_wavelength": bool(lam_is_wavelength),
+        "hdu_index": getattr(hdu, "index", None),
+    }
+    return lam, f.tolist(), meta
 
 
 # ── API: 관리/검색/파일/스펙트럼 ──────────────────────────────────────────────
@@ -281,7 +636,8 @@ def debug_paths():
 
 @mock_bp.get("/reindex")
 def reindex():
-    _scan(force=True)
+    # ?full=1 이면 디스크 스냅샷을 무시하고 전체 재스캔
+    _scan(force=True, full=request.args.get("full", "").lower() in ("1", "true"))
     return jsonify({"stems": len(_INDEX)})
 
 
@@ -343,29 +699,29 @@ def search():
 
     if df and not dt:
         dt = df.replace(hour=23 , minute=59 , second=59 , microsecond=0)
-    rows = []
-    for stem, row in _INDEX.items():
-        if q and q not in stem.lower():
-            continue
-        iso = row["meta"].get("datetime", "")  # 'YYYY-MM-DDTHH:MM:SS.ssssss'
-        # 문자열 비교 대신 datetime으로 비교 (보다 안전)
-        pass_ok = True
-        if iso and (df or dt):
-            try:
-                obs = datetime.fromisoformat(iso)  # PNG 이름에서 파싱된 값
-            except Exception:
-                obs = None
-            if df and obs and obs < df: pass_ok = False
-            if dt and obs and obs > dt: pass_ok = False
-        if not pass_ok:
-            continue
 
+    hits = _query_columns(q, df, dt, sort)
+
+    # page/page_size를 주면 그 페이지만 JSON 변환 (/api/search와 같은 기본 60건).
+    # 둘 다 없으면 예전처럼 전체 (search.js는 페이저 없이 total과 목록을 같이 보여 준다)
+    paged = "page" in request.args or "page_size" in request.args
+    if paged:
+        page = max(1, request.args.get("page", type=int, default=1))
+        page_size = min(500, max(1, request.args.get("page_size", type=int, default=60)))
+    else:
+        page, page_size = 1, max(1, len(hits))
+    start = (page - 1) * page_size
+    stems = _COLS.get("stems")
+    rows = []
+    for i in hits[start:start + page_size]:
+        stem = str(stems[i])
+        row = _INDEX[stem]
         rows.append(
             {
                 "file_id": row["file_id_hex"],
                 "filename": (Path(row["fits_path"]).name if row.get("fits_path") else stem + ".fts"),
                 "target": stem.split("_")[0],
-                "date_obs": iso or None,
+                "date_obs": row["meta"].get("datetime") or None,
                 "exptime": row["meta"].get("exptime"),
                 "frames": row["meta"].get("frames"),
                 "shape": None,
@@ -379,16 +735,7 @@ def search():
             }
         )
 
-    key = (sort or "-observed_at").lstrip("-")
-    rev = (sort or "-observed_at").startswith("-")
-    if key in ("observed_at", "date_obs"):
-        rows.sort(key=lambda r: (r["date_obs"] or ""), reverse=rev)
-    elif key == "exptime":
-        rows.sort(key=lambda r: (r["exptime"] or 0), reverse=rev)
-    elif key in ("object", "target"):
-        rows.sort(key=lambda r: (r["target"] or ""), reverse=rev)
-
-    return jsonify({"total": len(rows), "items": rows})
+    return jsonify({"total": int(len(hits)), "page": page, "page_size": page_size, "items": rows})
 
 
 @mock_bp.get("/frames/<file_id>")
@@ -401,7 +748,7 @@ def frames(file_id: str):
     """
     _scan()
     # 기준 stem 찾기
-    stem = next((s for s, v in _INDEX.items() if v["file_id_hex"] == file_id), None)
+    stem = _BY_FID.get(file_id)
     if not stem:
         abort(404)
 
@@ -415,33 +762,18 @@ def frames(file_id: str):
         ]
         return jsonify({"items": items})
 
-    # 같은 '날짜'의 모든 레코드 수집
-    try:
-        anchor = datetime.fromisoformat(dt_iso)
-    except Exception:
-        anchor = None
-
-    def same_date(rec_dt_iso: str) -> bool:
-        if not anchor or not rec_dt_iso:
-            return False
-        try:
-            d = datetime.fromisoformat(rec_dt_iso)
-            return (d.date() == anchor.date())
-        except Exception:
-            return False
-
-    # 같은 날짜의 모든 인덱스들을 시간순 정렬
+    # 같은 '날짜'의 모든 레코드를 시간순으로 (정렬된 보조 인덱스에서 bisect)
+    anchor = _parse_iso(dt_iso)
     pool = []
-    for s, v in _INDEX.items():
-        iso = v["meta"].get("datetime")
-        if same_date(iso) and (v.get("pngs") or []):
-            pool.append((iso, v))  # iso로 정렬
-
-    pool.sort(key=lambda t: t[0])  # 시간순
+    if anchor is not None:
+        for s in _stems_on_date(anchor):
+            v = _INDEX[s]
+            if v.get("pngs") or []:
+                pool.append(v)
 
     # 각 항목의 첫 이미지를 한 프레임으로 사용
     items = []
-    for i, (_, v) in enumerate(pool):
+    for i, v in enumerate(pool):
         fid = v["file_id_hex"]
         items.append({
             "index": i,
@@ -454,24 +786,24 @@ def frames(file_id: str):
 @mock_bp.get("/png/<file_id>/<int:idx>", endpoint="png_file")
 def png_file(file_id: str, idx: int):
     _scan()
-    stem = next((s for s, v in _INDEX.items() if v["file_id_hex"] == file_id), None)
+    stem = _BY_FID.get(file_id)
     if not stem:
         abort(404)
     lst = _INDEX[stem]["pngs"]
     if idx < 0 or idx >= len(lst):
         abort(404)
-    return send_file(lst[idx], mimetype="image/png")
+    return serve_file(lst[idx], mimetype="image/png")
 
 @mock_bp.get("/fits/<file_id>")
 def fits_file(file_id: str):
     _scan()
-    stem = next((s for s, v in _INDEX.items() if v["file_id_hex"] == file_id), None)
+    stem = _BY_FID.get(file_id)
     if not stem:
         abort(404)
     fpath = _INDEX[stem]["fits_path"]
     if not fpath:
         abort(404)
-    return send_file(fpath, as_attachment=True)
+    return serve_file(fpath, as_attachment=True)
 
 
 @mock_bp.get("/spectrum")
@@ -480,6 +812,7 @@ def spectrum():
     /dev/spectrum?file_id=...&idx=0&y=...&h=...
       - idx: PNG 프레임 인덱스(현재는 FITS 3D 매핑 없이 무시; 향후 확장 가능)
       - y/h: 세로 합 대역
+      - max_points / x_min / x_max: LOD (버킷별 min/max 다운샘플, 구간 자르기) → 응답 "lod"
     FITS가 있으면 FITS 기반 λ-스펙트럼, 없으면 PNG 기반(픽셀축)으로 반환.
     """
     _scan()
@@ -490,8 +823,19 @@ def spectrum():
     idx = request.args.get("idx", type=int, default=0)
     y = request.args.get("y", type=int)
     h = request.args.get("h", type=int, default=5)
-
-    stem = next((s for s, v in _INDEX.items() if v["file_id_hex"] == file_id), None)
+    max_points = request.args.get("max_points", type=int)
+    x_min = request.args.get("x_min", type=float)
+    x_max = request.args.get("x_max", type=float)
+    lod = max_points or x_min is not None or x_max is not None
+
+    def respond(xs, ys, meta):
+        out = {"x": xs, "y": ys, "frame": idx, "meta": meta}
+        if lod:
+            xs, ys, out["lod"] = downsample.reduce_series(xs, ys, max_points=max_points, x_min=x_min, x_max=x_max)
+            out["x"], out["y"] = xs.tolist(), ys.tolist()
+        return jsonify(out)
+
+    stem = _BY_FID.get(file_id)
     if not stem:
         abort(404)
 
@@ -502,7 +846,7 @@ def spectrum():
         # 1) FITS 우선: λ-스펙트럼
         if fits_path and Path(fits_path).exists():
             lam, flux, meta = _spectrum_from_fits(fits_path, hdu_index=None, y=y, h=h)
-            return jsonify({"x": lam, "y": flux, "frame": idx, "meta": meta})
+            return respond(lam, flux, meta)
 
         # 2) PNG fallback: 픽셀축 스펙트럼
         pngs = rec.get("pngs") or []
@@ -510,7 +854,7 @@ def spectrum():
             abort(404, "no png or fits to compute spectrum")
         x, yvals, meta = _spectrum_from_png(pngs[idx], y=y, h=h)
         meta.update({"wavelength_unit": "pixel", "x_is_wavelength": False})
-        return jsonify({"x": x, "y": yvals, "frame": idx, "meta": meta})
+        return respond(x, yvals, meta)
     except Exception as e:
         abort(500, f"spectrum failed: {type(e).__name__}: {e}")
 
@@ -1,5 +1,7 @@
 # models.py
 from __future__ import annotations
+import os
+import threading
 import uuid
 from datetime import datetime
 from sqlalchemy.dialects.mysql import BINARY, DATETIME as MySQL_DATETIME
@@ -12,6 +14,44 @@ from . import db  # Flask SQLAlchemy 인스턴스
 def gen_uuid_bytes() -> bytes:
     return uuid.uuid4().bytes
 
+_UUID7_LOCK = threading.Lock()
+_UUID7_LAST = {"ms": -1, "seq": 0}
+
+def gen_uuid7_bytes(at: datetime | None = None) -> bytes:
+    """
+    UUIDv7 (RFC 9562) 바이트 생성: 상위 48비트 = unix ms 타임스탬프.
+    BINARY(16) PK가 시간순으로 증가하므로 InnoDB clustered index 끝에 append 되어
+    bulk ingest 시 page split이 줄고, 같은 파일의 행들이 인접 페이지에 모인다.
+    - at 미지정: 현재 시각. 같은 ms 안에서는 12비트 시퀀스(rand_a)로 단조 증가 보장
+    - at 지정: 해당 시각 기준 (기존 행 재키잉 마이그레이션용)
+    """
+    if at is None:
+        ms = int(datetime.now().timestamp() * 1000)
+        with _UUID7_LOCK:
+            if ms <= _UUID7_LAST["ms"]:
+                # 시계가 같거나 역행하면 직전 ms를 유지하고 시퀀스만 증가
+                ms = _UUID7_LAST["ms"]
+                seq = _UUID7_LAST["seq"] + 1
+                if seq > 0xFFF:
+                    ms += 1
+                    seq = int.from_bytes(os.urandom(2), "big") & 0x3FF
+            else:
+                seq = int.from_bytes(os.urandom(2), "big") & 0x3FF  # 여유분 남겨 overflow 방지
+            _UUID7_LAST.update({"ms": ms, "seq": seq})
+    else:
+        ms = int(at.timestamp() * 1000)
+        seq = int.from_bytes(os.urandom(2), "big") & 0xFFF
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (
+        ((ms & ((1 << 48) - 1)) << 80)
+        | (0x7 << 76)
+        | (seq << 64)
+        | (0b10 << 62)
+        | rand_b
+    )
+    return value.to_bytes(16, "big")
+
 def uuid_bytes_to_hex(b: bytes | None) -> str | None:
     if b is None:
         return None
@@ -31,7 +71,7 @@ class Instrument(db.Model):
 
 class FileStorage(db.Model):
     __tablename__ = "file_storage"
-    file_id     = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    file_id     = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     file_path   = db.Column(db.String(512), nullable=False, unique=True)
     media_type  = db.Column(db.String(64))
     file_size   = db.Column(db.BigInteger)
@@ -54,7 +94,7 @@ class Tag(db.Model):
 # ------------------
 class FitsFile(db.Model):
     __tablename__ = "fits_file"
-    fits_id           = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    fits_id           = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     storage_file_id   = db.Column(BINARY(16), db.ForeignKey("file_storage.file_id"), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
     canonical_name    = db.Column(db.String(255), nullable=False)
@@ -89,7 +129,7 @@ class FitsFile(db.Model):
 
 class FitsHDU(db.Model):
     __tablename__ = "fits_hdu"
-    hdu_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    hdu_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     fits_id     = db.Column(BINARY(16), db.ForeignKey("fits_file.fits_id", ondelete="CASCADE"), nullable=False, index=True)
     hdu_index   = db.Column(db.Integer, nullable=False)
     hdu_type    = db.Column(db.Enum("IMAGE","TABLE","OTHER"), nullable=False, server_default="IMAGE")
@@ -124,7 +164,7 @@ class FitsHeaderKeyvalue(db.Model):
 # ------------------
 class PreviewImage(db.Model):
     __tablename__ = "preview_image"
-    preview_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    preview_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     fits_id         = db.Column(BINARY(16), db.ForeignKey("fits_file.fits_id", ondelete="CASCADE"), nullable=False, index=True)
     hdu_id          = db.Column(BINARY(16), db.ForeignKey("fits_hdu.hdu_id", ondelete="SET NULL"))
     storage_file_id = db.Column(BINARY(16), db.ForeignKey("file_storage.file_id"), nullable=False, unique=True)
@@ -152,7 +192,7 @@ class PreviewImage(db.Model):
 # ------------------
 class SlitBoundary(db.Model):
     __tablename__ = "slit_boundary"
-    slit_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    slit_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     fits_id      = db.Column(BINARY(16), db.ForeignKey("fits_file.fits_id", ondelete="CASCADE"), nullable=False, index=True)
     label        = db.Column(db.String(191))
     geometry_json = db.Column(db.JSON)        # {x,y,width,height} or polygon
@@ -165,7 +205,7 @@ class SlitBoundary(db.Model):
 
 class SpectrumRequest(db.Model):
     __tablename__ = "spectrum_request"
-    request_id  = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    request_id  = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     slit_id     = db.Column(BINARY(16), db.ForeignKey("slit_boundary.slit_id", ondelete="CASCADE"), nullable=False, index=True)
     point_x     = db.Column(db.Integer)
     point_y     = db.Column(db.Integer)
@@ -186,7 +226,7 @@ class SpectrumRequest(db.Model):
 
 class SpectrumResult(db.Model):
     __tablename__ = "spectrum_result"
-    result_id    = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    result_id    = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     request_id   = db.Column(BINARY(16), db.ForeignKey("spectrum_request.request_id", ondelete="CASCADE"), nullable=False, index=True)
     data_file_id = db.Column(BINARY(16), db.ForeignKey("file_storage.file_id"), nullable=False)
     preview_id   = db.Column(BINARY(16), db.ForeignKey("preview_image.preview_id", ondelete="SET NULL"))
@@ -202,7 +242,7 @@ class SpectrumResult(db.Model):
 # ------------------
 class JobTask(db.Model):
     __tablename__ = "job_task"
-    task_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid_bytes)
+    task_id      = db.Column(BINARY(16), primary_key=True, default=gen_uuid7_bytes)
     task_type    = db.Column(db.Enum("INGEST","PREVIEW","SPLIT","SPECTRUM","EXPORT"), nullable=False)
     fits_id      = db.Column(BINARY(16), db.ForeignKey("fits_file.fits_id", ondelete="SET NULL"))
     slit_id      = db.Column(BINARY(16), db.ForeignKey("slit_boundary.slit_id", ondelete="SET NULL"))
@@ -8,11 +8,11 @@ from datetime import datetime
 from PIL import Image
 from astropy.io import fits
 
-from ..App import create_app
+from ..app import create_app
 from ..model import db
 from ..model.models import (
     FileStorage, FitsFile, FitsHeaderKeyvalue, Instrument, FitsHDU,
-    PreviewImage, gen_uuid_bytes, uuid_bytes_to_hex
+    PreviewImage, gen_uuid7_bytes, uuid_bytes_to_hex
 )
 
 # ---------- utils ----------
@@ -73,7 +73,7 @@ def ensure_filestorage(path: Path, media: str) -> bytes:
     if ex:
         return ex.file_id
     fs = FileStorage(
-        file_id=gen_uuid_bytes(),
+        file_id=gen_uuid7_bytes(),
         file_path=str(path.resolve()),
         media_type=media,
         file_size=path.stat().st_size,
@@ -180,7 +180,7 @@ def ingest_fits_if_needed(fits_path: Path, fallback_dt: Optional[datetime]) -> b
         instrument_id = get_or_create_instrument(prim.get("INSTRUME"))
 
         ff = FitsFile(
-            fits_id=gen_uuid_bytes(),
+            fits_id=gen_uuid7_bytes(),
             storage_file_id=storage_file_id,
             original_filename=fits_path.name,
             canonical_name=fits_path.name,
@@ -226,7 +226,7 @@ def ingest_fits_if_needed(fits_path: Path, fallback_dt: Optional[datetime]) -> b
                 except: shape = None
             hdr_json = {k: str(h.header.get(k)) for k in list(h.header.keys())[:128]}
             db.session.add(FitsHDU(
-                hdu_id=gen_uuid_bytes(), fits_id=ff.fits_id,
+                hdu_id=gen_uuid7_bytes(), fits_id=ff.fits_id,
                 hdu_index=idx, hdu_type=h_type,
                 bitpix=int(h.header.get("BITPIX") or 0) if h.header else None,
                 shape_json=shape, header_json=hdr_json
@@ -251,7 +251,7 @@ def upsert_png_frame(fits_id: bytes, png_path: Path, level: Optional[str], frame
         return None
 
     pr = PreviewImage(
-        preview_id=gen_uuid_bytes(),
+        preview_id=gen_uuid7_bytes(),
         fits_id=fits_id,
         hdu_id=None,
         storage_file_id=storage_file_id,
@@ -0,0 +1,115 @@
+# src/scripts/rekey_uuid7.py
+"""
+기존 행의 BINARY(16) 랜덤 UUIDv4 PK를 시간순 UUIDv7로 재키잉하는 마이그레이션.
+
+  python -m src.scripts.rekey_uuid7 --dry-run
+  python -m src.scripts.rekey_uuid7
+
+- 대상: models.py에서 BINARY(16) 단일 PK를 갖는 테이블 전부
+- 새 ID의 타임스탬프: created_at(없으면 현재 시각) → 기존 삽입 순서를 그대로 보존
+- FK 참조 컬럼은 SQLAlchemy 메타데이터에서 자동으로 찾아 같은 매핑으로 갱신
+- MySQL/MariaDB 전용 (UPDATE ... JOIN, FOREIGN_KEY_CHECKS). 실행 전 백업 권장
+- 이미 v7인 ID는 건너뛰므로 여러 번 실행해도 안전
+"""
+from __future__ import annotations
+import argparse
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.dialects.mysql import BINARY
+
+from ..app import create_app
+from ..model import db
+from ..model.models import gen_uuid7_bytes
+
+BATCH = 5000
+
+
+def _rekey_targets():
+    """(table, pk_column, [(child_table, child_column), ...]) 목록"""
+    tables = db.metadata.tables
+    out = []
+    for t in tables.values():
+        pks = list(t.primary_key.columns)
+        if len(pks) != 1 or not isinstance(pks[0].type, BINARY):
+            continue
+        if pks[0].foreign_keys:
+            continue  # PK 자체가 FK인 매핑 테이블(fits_tag_map 등)은 부모 갱신 때 같이 처리됨
+        pk = pks[0]
+        refs = []
+        for child in tables.values():
+            for fk in child.foreign_keys:
+                if fk.column is pk:
+                    refs.append((child.name, fk.parent.name))
+        out.append((t, pk, refs))
+    return out
+
+
+def _build_map(conn, table, pk) -> list[tuple[bytes, bytes]]:
+    ts_col = table.c.get("created_at")
+    cols = [pk] + ([ts_col] if ts_col is not None else [])
+    rows = conn.execute(db.select(*cols).order_by(*cols[::-1])).all()
+    mapping = []
+    for row in rows:
+        old = row[0]
+        if old is None or uuid.UUID(bytes=old).version == 7:
+            continue
+        at = row[1] if len(row) > 1 and isinstance(row[1], datetime) else None
+        mapping.append((old, gen_uuid7_bytes(at)))
+    return mapping
+
+
+def rekey(dry_run: bool = False) -> None:
+    # 세션 대신 연결 하나를 직접 잡는다: FOREIGN_KEY_CHECKS와 임시 테이블은 연결(세션) 단위라
+    # 정리(SET ...=1, DROP)도 반드시 같은 연결에서 실행돼야 한다
+    with db.engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TEMPORARY TABLE IF NOT EXISTS _rekey_map "
+            "(old_id BINARY(16) PRIMARY KEY, new_id BINARY(16) NOT NULL)"
+        ))
+        conn.execute(text("SET FOREIGN_KEY_CHECKS=0"))
+        try:
+            for table, pk, refs in _rekey_targets():
+                mapping = _build_map(conn, table, pk)
+                print(f"[rekey] {table.name}.{pk.name}: {len(mapping)} rows, refs={refs}")
+                if dry_run or not mapping:
+                    continue
+
+                conn.execute(text("DELETE FROM _rekey_map"))
+                for i in range(0, len(mapping), BATCH):
+                    conn.execute(
+                        text("INSERT INTO _rekey_map (old_id, new_id) VALUES (:o, :n)"),
+                        [{"o": o, "n": n} for o, n in mapping[i:i + BATCH]],
+                    )
+                for tname, cname in [(table.name, pk.name), *refs]:
+                    conn.execute(text(
+                        f"UPDATE `{tname}` t JOIN _rekey_map m ON t.`{cname}` = m.old_id "
+                        f"SET t.`{cname}` = m.new_id"
+                    ))
+            if dry_run:
+                conn.rollback()
+            else:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("SET FOREIGN_KEY_CHECKS=1"))
+            conn.execute(text("DROP TEMPORARY TABLE IF EXISTS _rekey_map"))
+            conn.commit()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-key BINARY(16) UUIDv4 primary keys to time-ordered UUIDv7")
+    ap.add_argument("--dry-run", action="store_true", help="count rows per table without writing")
+    args = ap.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        rekey(dry_run=args.dry_run)
+        print("[DONE]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# src/services/calibration.py
+"""
+Dark/Flat 마스터 프레임 라이브러리.
+
+.env 예시:
+  CALIB_DIR="/path/to/Calibration"   # 하위 폴더까지 *.fits/*.fts/*.fit 검색
+
+- 프레임 종류: IMAGETYP/OBSTYPE/FRAMETYP 헤더(없으면 파일명)에 DARK/FLAT 포함 여부
+- 선택 기준: INSTRUME와 (Y, X) 크기가 같은 것 중 EXPTIME이 가장 가까운 것
+- 헤더만 한 번 읽어 목록을 만들고, 데이터는 처음 쓰일 때 memmap으로 연다 (dark/flat 모두 힙에 올리지 않음)
+- 보정은 out= 버퍼에 z 청크 단위로 수행 → 임시 배열은 청크 하나 크기를 넘지 않음
+"""
+from __future__ import annotations
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+fits = lazy_module("astropy.io.fits")
+
+FITS_EXTS = {".fits", ".fts", ".fit"}
+FLAT_EPS = 1e-6  # challan_postprocessing과 같은 0 나눗셈 방지값
+
+
+@dataclass
+class CalibFrame:
+    kind: str                       # "DARK" | "FLAT"
+    path: str
+    instrument: Optional[str]
+    exptime: Optional[float]
+    shape: Tuple[int, ...]
+    _array: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def array(self) -> np.ndarray:
+        """memmap 그대로 (2D). FLAT의 + eps는 apply_dark_flat이 필요한 부분에만 더한다"""
+        if self._array is None:
+            hdul = fits.open(self.path, memmap=True)
+            hdu = next(h for h in hdul if getattr(h, "data", None) is not None)
+            data = hdu.data
+            if data.ndim > 2:
+                data = data[0]
+            self._array = data
+        return self._array
+
+
+def _header_kind(hdr, path: Path) -> Optional[str]:
+    for k in ("IMAGETYP", "OBSTYPE", "FRAMETYP"):
+        v = str(hdr.get(k) or "").upper()
+        if "DARK" in v:
+            return "DARK"
+        if "FLAT" in v:
+            return "FLAT"
+    name = path.stem.upper()
+    if "DARK" in name:
+        return "DARK"
+    if "FLAT" in name:
+        return "FLAT"
+    return None
+
+
+def _header_exptime(hdr) -> Optional[float]:
+    for k in ("EXPTIME", "EXPOSURE"):
+        v = hdr.get(k)
+        if v is None:
+            continue
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def _norm_instrument(v: Any) -> Optional[str]:
+    s = str(v).strip().upper() if v is not None else ""
+    return s or None
+
+
+class CalibrationLibrary:
+    def __init__(self, root: Optional[str]):
+        self.root = root
+        self.frames: List[CalibFrame] = []
+        if root and Path(root).is_dir():
+            self._scan(Path(root))
+
+    def _scan(self, root: Path) -> None:
+        for p in sorted(root.rglob("*")):
+            if p.suffix.lower() not in FITS_EXTS:
+                continue
+            try:
+                with fits.open(p, memmap=True) as hdul:
+                    hdu = next((h for h in hdul if h.header.get("NAXIS", 0) >= 2), None)
+                    if hdu is None:
+                        continue
+                    hdr = hdu.header
+                    kind = _header_kind(hdr, p)
+                    if kind is None:
+                        continue
+                    shape = (int(hdr["NAXIS2"]), int(hdr["NAXIS1"]))
+                    self.frames.append(CalibFrame(
+                        kind=kind,
+                        path=str(p),
+                        instrument=_norm_instrument(hdr.get("INSTRUME")),
+                        exptime=_header_exptime(hdr),
+                        shape=shape,
+                    ))
+            except Exception as e:
+                print(f"[calib skipped] {p}: {type(e).__name__}: {e}")
+
+    def _best(self, kind: str, instrument: Optional[str], exptime: Optional[float],
+              shape: Tuple[int, int]) -> Optional[CalibFrame]:
+        cands = [
+            f for f in self.frames
+            if f.kind == kind and f.shape == shape
+            and (f.instrument is None or instrument is None or f.instrument == instrument)
+        ]
+        if not cands:
+            return None
+
+        def score(f: CalibFrame):
+            inst_miss = 0 if (f.instrument == instrument) else 1
+            if exptime is None or f.exptime is None:
+                dt = float("inf")
+            else:
+                dt = abs(f.exptime - exptime)
+            return (inst_miss, dt, f.path)
+
+        return min(cands, key=score)
+
+    def select(self, header: Dict[str, Any], shape: Tuple[int, ...]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        과학 프레임 헤더/크기에 맞는 (dark, flat) memmap 반환. 없으면 각각 None.
+        shape: 데이터 shape (마지막 두 축이 (Y, X))
+        """
+        if not self.frames or len(shape) < 2:
+            return None, None
+        yx = (int(shape[-2]), int(shape[-1]))
+        instrument = _norm_instrument(header.get("INSTRUME"))
+        exptime = _header_exptime(header)
+        dark = self._best("DARK", instrument, exptime, yx)
+        flat = self._best("FLAT", instrument, exptime, yx)
+        return (dark.array() if dark else None), (flat.array() if flat else None)
+
+
+@lru_cache(maxsize=4)
+def _library_for(root: Optional[str]) -> CalibrationLibrary:
+    return CalibrationLibrary(root)
+
+
+def get_library() -> CalibrationLibrary:
+    raw = (os.getenv("CALIB_DIR") or "").strip().strip('\'"')
+    return _library_for(os.path.expanduser(raw) if raw else None)
+
+
+def apply_dark_flat(
+    arr: np.ndarray,
+    dark: Optional[np.ndarray] = None,
+    flat: Optional[np.ndarray] = None,
+    *,
+    out: Optional[np.ndarray] = None,
+    chunk: int = 16,
+) -> np.ndarray:
+    """
+    (arr - dark) / (flat + FLAT_EPS) 를 out(float32)에 계산한다.
+    - dark/flat은 arr의 마지막 축들과 브로드캐스트 가능해야 함
+      (예: cube[:, :, x] 에는 dark[:, x], cube[:, y, x] 에는 dark[y, x])
+    - arr.ndim > dark.ndim 이면 0번 축을 chunk 단위로 나눠 처리
+    - out=None이면 결과 버퍼 하나만 새로 만들고, out=arr(float32)이면 제자리 보정
+    - flat(memmap)에서 읽은 분모 (flat + eps, float32)가 임시 배열의 전부 — 프레임(슬라이스) 하나 크기
+    """
+    inplace = out is arr
+    if out is None:
+        out = np.empty(arr.shape, dtype=np.float32)
+    flat_denom = None if flat is None else np.add(flat, np.float32(FLAT_EPS), dtype=np.float32)
+    ref_ndim = max(np.ndim(dark) if dark is not None else 0, np.ndim(flat) if flat is not None else 0)
+    n = arr.shape[0] if arr.ndim > ref_ndim else 1
+    step = max(1, int(chunk)) if arr.ndim > ref_ndim else 1
+
+    for i in range(0, n, step):
+        src = arr[i:i + step] if arr.ndim > ref_ndim else arr
+        dst = out[i:i + step] if arr.ndim > ref_ndim else out
+        if dark is not None:
+            np.subtract(src, dark, out=dst, casting="unsafe")
+        elif not inplace:
+            np.copyto(dst, src, casting="unsafe")
+        if flat_denom is not None:
+            np.divide(dst, flat_denom, out=dst, casting="unsafe")
+    return out
@@ -0,0 +1,229 @@
+# src/services/cube_store.py
+"""
+여러 WSGI 워커 프로세스가 같은 큐브를 공유하는 저장소.
+
+.env 예시:
+  CUBE_SHARED=1                      # wsgi.py가 기본으로 켬 (run.py 개발 서버는 꺼짐)
+  CUBE_SHM_DIR="/dev/shm/astro_cubes"  # 없으면 /dev/shm(리눅스) 또는 임시 폴더
+  CUBE_TTL_SEC=1800                  # 아무 워커도 참조하지 않는 큐브를 지우기까지의 유휴 시간
+
+- 디코딩된 float32 큐브를 공유 메모리(tmpfs) 위 .npy 파일로 한 번만 쓰고,
+  각 워커는 np.load(mmap_mode="r")로 붙어서 복사 없이 같은 물리 페이지를 본다
+  → RAM 사용량이 워커 수와 무관
+- 메타(path/shape/header)는 같은 이름의 .json
+- 큐브에서 파생된 큰 배열(적분 영상 등)은 aux()로 <id>.<이름>.aux (.npy 형식)에 한 번만 만들어
+  모든 워커가 memmap으로 공유하고, 큐브가 지워질 때 같이 지운다
+- 참조 카운트: <id>.refs/<pid> 파일 하나 = 그 프로세스의 참조 1개 (죽은 pid는 무시).
+  release()는 참조만 놓고 마지막 사용 시각(.json mtime)을 갱신한다.
+  파일 삭제는 sweep()이: 살아 있는 참조가 없고 CUBE_TTL_SEC 이상 쓰이지 않은 큐브만.
+  → 워커가 자기 LRU에서 큐브를 밀어내도, 다른 사용자가 곧 다시 열면 그대로 붙는다
+  sweep()은 wsgi 기동 시와 새 큐브를 publish 할 때마다 돈다.
+- 이미 매핑된 파일은 삭제돼도 매핑이 끝날 때까지 유효하다 (POSIX)
+
+multiprocessing.shared_memory 대신 파일을 쓰는 이유: 세그먼트 이름/크기/메타를
+다른 워커가 찾을 방법이 필요하고, resource_tracker가 만든 프로세스 종료 시
+세그먼트를 지워 버리는 문제가 있다. /dev/shm 파일은 같은 공유 메모리이면서 이 둘이 없다.
+"""
+from __future__ import annotations
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+
+_LOCK = threading.Lock()
+_HELD: set = set()   # 이 프로세스가 참조 중인 file_id
+
+
+def enabled() -> bool:
+    return (os.getenv("CUBE_SHARED") or "").lower() in ("1", "true", "yes")
+
+
+def _ttl() -> float:
+    return float(os.getenv("CUBE_TTL_SEC", "1800"))
+
+
+def _root() -> Path:
+    raw = (os.getenv("CUBE_SHM_DIR") or "").strip().strip('\'"')
+    if raw:
+        root = Path(os.path.expanduser(raw))
+    elif Path("/dev/shm").is_dir():
+        root = Path("/dev/shm") / "astro_cubes"
+    else:
+        root = Path(tempfile.gettempdir()) / "astro_cubes"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _paths(file_id: str) -> Tuple[Path, Path, Path]:
+    root = _root()
+    return root / f"{file_id}.npy", root / f"{file_id}.json", root / f"{file_id}.refs"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _live_refs(refs: Path) -> int:
+    n = 0
+    for p in refs.glob("*"):
+        try:
+            pid = int(p.name)
+        except ValueError:
+            continue
+        if _alive(pid):
+            n += 1
+        else:
+            p.unlink(missing_ok=True)   # 죽은 워커의 참조 정리
+    return n
+
+
+def _acquire(file_id: str) -> None:
+    _, _, refs = _paths(file_id)
+    refs.mkdir(exist_ok=True)
+    (refs / str(os.getpid())).touch()
+    with _LOCK:
+        _HELD.add(file_id)
+
+
+def _remove(file_id: str) -> None:
+    data, meta, refs = _paths(file_id)
+    for p in (data, meta, *_root().glob(f"{file_id}.*.aux")):
+        p.unlink(missing_ok=True)
+    try:
+        refs.rmdir()
+    except OSError:
+        pass
+
+
+def publish(file_id: str, src, meta: Dict[str, Any], *, chunk: int = 16):
+    """
+    src(디스크 memmap 등)를 float32로 변환하며 z 청크 단위로 공유 파일에 쓴다 (전체 사본 없이).
+    반환: 읽기 전용 공유 뷰 (np.memmap)
+    """
+    data, meta_path, _ = _paths(file_id)
+    _acquire(file_id)   # 먼저 참조를 잡아 두어야 다른 워커의 sweep()이 쓰는 도중 지우지 않음
+    tmp = data.with_suffix(".npy.tmp")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=tuple(src.shape))
+    if out.ndim >= 3:
+        for z0 in range(0, out.shape[0], chunk):
+            out[z0:z0 + chunk] = src[z0:z0 + chunk]
+    else:
+        out[...] = src
+    out.flush()
+    del out
+    os.replace(tmp, data)   # 다른 워커는 완성된 파일만 보게 됨
+    meta_tmp = meta_path.with_suffix(".json.tmp")
+    meta_tmp.write_text(json.dumps(meta, default=str), encoding="utf-8")
+    os.replace(meta_tmp, meta_path)
+    try:
+        sweep()   # 새 큐브가 들어올 때 오래 안 쓰인 큐브 정리
+    except OSError as e:
+        print(f"[cube_store] sweep failed: {e}")
+    return np.load(data, mmap_mode="r")
+
+
+def attach(file_id: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """다른 워커가 올린 큐브에 붙기. 없으면 None"""
+    data, meta_path, _ = _paths(file_id)
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        cube = np.load(data, mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return None
+    _acquire(file_id)
+    return cube, meta
+
+
+def aux(file_id: str, name: str, shape: Tuple[int, ...], dtype, fill: Callable[[Any], None]):
+    """
+    큐브 file_id에 딸린 보조 배열 (읽기 전용 memmap). 없으면 0으로 채운 파일에 fill(out)으로 한 번 만든다.
+    여러 워커가 동시에 만들면 각자 임시 파일에 쓰고 os.replace로 바꿔 끼우므로 결과는 하나 (계산만 중복).
+    """
+    path = _root() / f"{file_id}.{name}.aux"
+    try:
+        return np.load(path, mmap_mode="r")
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=tuple(shape))
+    try:
+        fill(out)
+        out.flush()
+    except BaseException:
+        del out
+        tmp.unlink(missing_ok=True)
+        raise
+    del out
+    os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
+
+
+def release(file_id: str) -> None:
+    """이 프로세스의 참조를 놓는다. 파일은 남겨 두고 sweep()이 유휴 시간으로 지운다."""
+    with _LOCK:
+        if file_id not in _HELD:
+            return
+        _HELD.discard(file_id)
+    _, meta_path, refs = _paths(file_id)
+    (refs / str(os.getpid())).unlink(missing_ok=True)
+    try:
+        os.utime(meta_path)   # 마지막 사용 시각
+    except FileNotFoundError:
+        pass
+
+
+def sweep(ttl: Optional[float] = None) -> int:
+    """
+    살아 있는 참조가 없고 ttl초(기본 CUBE_TTL_SEC) 이상 쓰이지 않은 큐브 삭제
+    (밀려난 큐브, 비정상 종료한 워커가 남긴 큐브). 삭제 개수 반환
+    """
+    ttl = _ttl() if ttl is None else ttl
+    now = time.time()
+    removed = 0
+    for data in _root().glob("*.npy"):
+        file_id = data.stem
+        _, meta_path, refs = _paths(file_id)
+        try:
+            idle = now - max(data.stat().st_mtime, meta_path.stat().st_mtime)
+        except FileNotFoundError:
+            idle = float("inf")   # 메타 없이 남은 데이터 (쓰다 죽은 경우)
+        if idle < ttl:
+            continue
+        if not refs.is_dir() or _live_refs(refs) == 0:
+            _remove(file_id)
+            removed += 1
+    return removed
+
+
+def stats() -> Dict[str, Any]:
+    files = list(_root().glob("*.npy"))
+    extra = list(_root().glob("*.aux"))
+    return {
+        "root": str(_root()),
+        "cubes": len(files),
+        "bytes": sum(p.stat().st_size for p in files + extra if p.exists()),
+        "held_by_this_process": len(_HELD),
+    }
+
+
+@atexit.register
+def _release_all() -> None:
+    for file_id in list(_HELD):
+        try:
+            release(file_id)
+        except Exception:
+            pass
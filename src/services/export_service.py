@@ -0,0 +1,402 @@
+# src/services/export_service.py
+"""
+큐브 잘라내기(ROI / z 범위 / 비닝) 내보내기 → FITS / .npy / .npz 스트림.
+
+  spec = plan(path, x=(10, 200), y=(0, 128), z=(40, 80), bin_xy=2, bin_z=1)
+  chunks, length = stream(spec, "fits")     # length는 미리 아는 경우(fits/npy)만
+  for b in chunks: ...
+
+- 원본은 memmap으로 열고 출력 z 평면 묶음(또는 y 행 묶음) 단위로 읽어 바로 내보낸다
+  → 한 번에 메모리에 있는 것은 EXPORT_CHUNK_MB(기본 16MB) 안팎의 블록 하나뿐
+- 비닝은 블록 평균 (나머지 픽셀은 버림). 비닝하거나 BSCALE/BZERO가 있으면 물리값 float32,
+  아니면 원본 dtype 그대로 (FITS 출력은 원본 정수 + BSCALE/BZERO 카드 유지)
+- FITS 헤더는 원본 카드를 복사하고 WCS(CRPIXn/CDELTn/CDi_j)를 ROI/비닝에 맞게 고친다
+- 큰 내보내기는 submit()으로 JobTask(EXPORT) 백그라운드 작업 → EXPORT_DIR 파일
+
+.env 예시:
+  EXPORT_DIR=".cache/exports"   # 백그라운드 결과 폴더
+  EXPORT_WORKERS=1              # 동시에 도는 내보내기 작업 수
+  EXPORT_TTL_H=24               # 이보다 오래된 결과 파일은 새 작업 제출 시 삭제
+"""
+from __future__ import annotations
+import io
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+fits = lazy_module("astropy.io.fits")
+
+FORMATS = {"fits": "application/fits", "npy": "application/octet-stream", "npz": "application/zip"}
+_BITPIX = {"u1": 8, "i2": 16, "i4": 32, "i8": 64, "f4": -32, "f8": -64}
+_STRUCTURAL = re.compile(r"^(SIMPLE|XTENSION|BITPIX|NAXIS\d*|EXTEND|PCOUNT|GCOUNT|BSCALE|BZERO|BLANK|CHECKSUM|DATASUM)$")
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass
+class ExportSpec:
+    path: str
+    hdu: int
+    src_shape: Tuple[int, ...]
+    x: Tuple[int, int]
+    y: Tuple[int, int]
+    z: Tuple[int, int]
+    bin_xy: int
+    bin_z: int
+    scale: Tuple[float, float]          # (BSCALE, BZERO)
+    raw_dtype: Any
+    header: Any = field(repr=False)
+
+    @property
+    def cube(self) -> bool:
+        return len(self.src_shape) == 3
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        ny = (self.y[1] - self.y[0]) // self.bin_xy
+        nx = (self.x[1] - self.x[0]) // self.bin_xy
+        if not self.cube:
+            return (ny, nx)
+        return ((self.z[1] - self.z[0]) // self.bin_z, ny, nx)
+
+    @property
+    def scaled(self) -> bool:
+        return self.scale != (1.0, 0.0)
+
+    def out_dtype(self, fmt: str):
+        binned = self.bin_xy > 1 or self.bin_z > 1
+        if binned or (self.scaled and fmt != "fits"):
+            raw = np.dtype(self.raw_dtype)
+            # int16 + BZERO=32768 (흔한 uint16 카메라 저장 방식)은 정확히 uint16으로
+            if not binned and raw.kind == "i" and self.scale == (1.0, float(2 ** (raw.itemsize * 8 - 1))):
+                return np.dtype(f"u{raw.itemsize}")
+            return np.dtype(np.float32)
+        return np.dtype(self.raw_dtype).newbyteorder("=")
+
+    def nbytes(self, fmt: str) -> int:
+        return int(np.prod(self.shape)) * self.out_dtype(fmt).itemsize
+
+    def describe(self) -> str:
+        z = f" z={self.z[0]}:{self.z[1]}" if self.cube else ""
+        return (f"{os.path.basename(self.path)} x={self.x[0]}:{self.x[1]} y={self.y[0]}:{self.y[1]}{z}"
+                f" bin={self.bin_xy}x{self.bin_z} -> {self.shape}")
+
+
+def _chunk_bytes() -> int:
+    return int(float(os.getenv("EXPORT_CHUNK_MB", "16")) * 1024 * 1024)
+
+
+def _range(name: str, r: Optional[Tuple[Optional[int], Optional[int]]], n: int, step: int) -> Tuple[int, int]:
+    lo, hi = r if r is not None else (None, None)
+    lo = 0 if lo is None else int(lo)
+    hi = n if hi is None else int(hi)
+    if not (0 <= lo < hi <= n):
+        raise ValueError(f"{name} 범위가 잘못되었습니다: {lo}:{hi} (0..{n})")
+    if (hi - lo) // step < 1:
+        raise ValueError(f"{name} 범위({hi - lo})가 비닝({step})보다 작습니다")
+    return lo, hi
+
+
+def plan(path: str, *, x=None, y=None, z=None, bin_xy: int = 1, bin_z: int = 1) -> ExportSpec:
+    """범위는 (시작, 끝) 반열림 구간, None이면 전체. 데이터는 읽지 않고 헤더/shape만 본다."""
+    bin_xy, bin_z = int(bin_xy), int(bin_z)
+    if bin_xy < 1 or bin_z < 1:
+        raise ValueError("bin은 1 이상이어야 합니다")
+    with fits.open(path, memmap=True, do_not_scale_image_data=True) as hdul:
+        idx = next((i for i, h in enumerate(hdul) if getattr(h, "data", None) is not None), None)
+        if idx is None:
+            raise ValueError("No IMAGE HDU with data")
+        hdu = hdul[idx]
+        shape = tuple(hdu.data.shape)
+        raw_dtype = hdu.data.dtype
+        header = hdu.header.copy()
+    if len(shape) not in (2, 3):
+        raise ValueError(f"2D/3D 이미지만 내보낼 수 있습니다 (shape={shape})")
+    return ExportSpec(
+        path=path, hdu=idx, src_shape=shape,
+        x=_range("x", x, shape[-1], bin_xy),
+        y=_range("y", y, shape[-2], bin_xy),
+        z=_range("z", z, shape[0], bin_z) if len(shape) == 3 else (0, 1),
+        bin_xy=bin_xy, bin_z=bin_z if len(shape) == 3 else 1,
+        scale=(float(header.get("BSCALE", 1.0)), float(header.get("BZERO", 0.0))),
+        raw_dtype=raw_dtype, header=header,
+    )
+
+
+# ---------------- 블록 읽기 ----------------
+def _bin(block: np.ndarray, bz: int, bxy: int) -> np.ndarray:
+    if bz == 1 and bxy == 1:
+        return block
+    z, y, x = block.shape
+    return block.reshape(z // bz, bz, y // bxy, bxy, x // bxy, bxy).mean(axis=(1, 3, 5), dtype=np.float64)
+
+
+def _blocks(spec: ExportSpec, dtype) -> Iterator[np.ndarray]:
+    """출력 배열을 C 순서대로 나눈 블록 (z 평면 묶음, 평면 하나가 크면 y 행 묶음)"""
+    b, bz = spec.bin_xy, spec.bin_z
+    (x0, x1), (y0, y1), (z0, z1) = spec.x, spec.y, spec.z
+    x1 = x0 + (x1 - x0) // b * b
+    y1 = y0 + (y1 - y0) // b * b
+    z1 = z0 + (z1 - z0) // bz * bz
+    binned = b > 1 or bz > 1
+    convert = dtype != np.dtype(spec.raw_dtype).newbyteorder("=")
+    work = np.float64 if binned else (np.int64 if dtype.kind == "u" else dtype)
+    bscale, bzero = spec.scale
+
+    # 출력 평면 하나에 필요한 작업 배열 크기(최대 8바이트/픽셀)로 묶음 크기 결정
+    row_bytes = (x1 - x0) * 8 * bz
+    budget = _chunk_bytes()
+    if row_bytes * (y1 - y0) <= budget:
+        planes, rows = max(1, budget // (row_bytes * (y1 - y0))), y1 - y0
+    else:
+        planes, rows = 1, max(b, budget // row_bytes // b * b)
+
+    with fits.open(spec.path, memmap=True, do_not_scale_image_data=True) as hdul:
+        data = hdul[spec.hdu].data
+        if data.ndim == 2:
+            data = data[None]
+        for za in range(z0, z1, planes * bz):
+            zb = min(z1, za + planes * bz)
+            for ya in range(y0, y1, rows):
+                block = np.asarray(data[za:zb, ya:min(y1, ya + rows), x0:x1])
+                if convert:
+                    block = block.astype(work)
+                    if spec.scaled:
+                        block = block * bscale + bzero
+                yield np.ascontiguousarray(_bin(block, bz, b), dtype=dtype)
+
+
+# ---------------- 포맷별 스트림 ----------------
+def _npy_header(spec: ExportSpec, dtype) -> bytes:
+    buf = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buf, {
+        "descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": spec.shape,
+    })
+    return buf.getvalue()
+
+
+def _fits_header(spec: ExportSpec, dtype) -> bytes:
+    src = spec.header
+    hdr = fits.Header()
+    hdr["SIMPLE"] = True
+    hdr["BITPIX"] = _BITPIX[dtype.str[1:]]
+    hdr["NAXIS"] = len(spec.shape)
+    for i, n in enumerate(reversed(spec.shape), 1):
+        hdr[f"NAXIS{i}"] = n
+    for card in src.cards:
+        if not _STRUCTURAL.match(card.keyword or ""):
+            hdr.append(card, end=True)
+    if dtype == np.dtype(spec.raw_dtype).newbyteorder("=") and spec.scaled:
+        hdr["BSCALE"], hdr["BZERO"] = spec.scale
+        if "BLANK" in src:
+            hdr["BLANK"] = src["BLANK"]
+
+    # WCS: 픽셀 축 i의 원점 이동(offset)과 비닝(step) 반영
+    axes = [(1, spec.x[0], spec.bin_xy), (2, spec.y[0], spec.bin_xy)]
+    if spec.cube:
+        axes.append((3, spec.z[0], spec.bin_z))
+    for i, off, step in axes:
+        if f"CRPIX{i}" in hdr:
+            hdr[f"CRPIX{i}"] = (hdr[f"CRPIX{i}"] - off - 0.5) / step + 0.5
+        if step > 1:
+            if f"CDELT{i}" in hdr:
+                hdr[f"CDELT{i}"] = hdr[f"CDELT{i}"] * step
+            for j in range(1, 4):
+                if f"CD{j}_{i}" in hdr:
+                    hdr[f"CD{j}_{i}"] = hdr[f"CD{j}_{i}"] * step
+    hdr.add_history(f"export {spec.describe()}")
+    return hdr.tostring().encode("ascii")
+
+
+def _iter_raw(spec: ExportSpec, dtype, big_endian: bool) -> Iterator[bytes]:
+    out = dtype.newbyteorder(">") if big_endian else dtype
+    for block in _blocks(spec, dtype):
+        yield block.astype(out, copy=False).tobytes()
+
+
+def _iter_fits(spec: ExportSpec, dtype, head: bytes) -> Iterator[bytes]:
+    yield head
+    size = 0
+    for b in _iter_raw(spec, dtype, big_endian=True):
+        size += len(b)
+        yield b
+    if size % 2880:
+        yield b"\0" * (2880 - size % 2880)
+
+
+def _iter_npy(spec: ExportSpec, dtype, head: bytes) -> Iterator[bytes]:
+    yield head
+    yield from _iter_raw(spec, dtype, big_endian=False)
+
+
+class _Sink:
+    """zipfile이 쓰는 내용을 모아 두었다가 조금씩 내보내는 비탐색(unseekable) 파일"""
+    def __init__(self):
+        self.parts = []
+
+    def write(self, b) -> int:
+        self.parts.append(bytes(b))
+        return len(b)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+
+def _iter_npz(spec: ExportSpec, dtype) -> Iterator[bytes]:
+    # np.savez와 같은 무압축 zip, 항목 하나(data.npy). 크기를 모르므로 data descriptor + zip64
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        with zf.open("data.npy", "w", force_zip64=True) as member:
+            member.write(_npy_header(spec, dtype))
+            for b in _iter_raw(spec, dtype, big_endian=False):
+                member.write(b)
+                yield sink.drain()
+    yield sink.drain()
+
+
+def stream(spec: ExportSpec, fmt: str) -> Tuple[Iterator[bytes], Optional[int]]:
+    """(바이트 청크 이터레이터, 전체 길이 또는 None)"""
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} ({', '.join(FORMATS)})")
+    dtype = spec.out_dtype(fmt)
+    data = spec.nbytes(fmt)
+    if fmt == "fits":
+        head = _fits_header(spec, dtype)
+        return _iter_fits(spec, dtype, head), len(head) + data + (-data % 2880)
+    if fmt == "npy":
+        head = _npy_header(spec, dtype)
+        return _iter_npy(spec, dtype, head), len(head) + data
+    return _iter_npz(spec, dtype), None
+
+
+# ---------------- 백그라운드 작업 (JobTask EXPORT) ----------------
+def export_dir() -> Path:
+    raw = (os.getenv("EXPORT_DIR") or "").strip().strip('\'"')
+    d = Path(os.path.expanduser(raw)) if raw else Path(".cache") / "exports"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def result_path(task_hex: str) -> Optional[Path]:
+    if not re.fullmatch(r"[0-9a-f]{32}", task_hex):
+        return None
+    for fmt in FORMATS:
+        p = export_dir() / f"{task_hex}.{fmt}"
+        if p.is_file():
+            return p
+    return None
+
+
+def _sweep() -> None:
+    cutoff = time.time() - float(os.getenv("EXPORT_TTL_H", "24")) * 3600
+    for p in export_dir().iterdir():
+        try:
+            if p.stat().st_mtime < cutoff:
+                p.unlink()
+        except OSError:
+            pass
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("EXPORT_WORKERS", "1")), thread_name_prefix="export")
+    return _EXECUTOR
+
+
+def _update(task_id: bytes, *, status: Optional[str] = None, pct: Optional[int] = None,
+            message: Optional[str] = None, level: str = "INFO") -> None:
+    from src.model import db
+    from src.model.models import JobEvent, JobTask
+
+    task = db.session.get(JobTask, task_id)
+    if task is None:
+        return
+    if status:
+        task.status = status
+    if pct is not None:
+        task.progress_pct = pct
+    if message:
+        task.message = message[:512]
+        db.session.add(JobEvent(task_id=task_id, level=level, progress_pct=pct, message=message[:512]))
+    db.session.commit()
+
+
+def _run(app, task_id: bytes, spec: ExportSpec, fmt: str) -> None:
+    task_hex = task_id.hex()
+    out = export_dir() / f"{task_hex}.{fmt}"
+    tmp = out.with_name(out.name + ".part")
+    with app.app_context():
+        try:
+            _update(task_id, status="RUNNING", pct=0, message=f"시작: {spec.describe()}")
+            chunks, total = stream(spec, fmt)
+            total = total or spec.nbytes(fmt)
+            written, last = 0, 0
+            with open(tmp, "wb") as f:
+                for b in chunks:
+                    f.write(b)
+                    written += len(b)
+                    pct = min(99, written * 100 // max(1, total))
+                    if pct >= last + 5:   # DB 갱신은 5% 단위로만
+                        _update(task_id, pct=pct)
+                        last = pct
+            os.replace(tmp, out)
+            _update(task_id, status="SUCCESS", pct=100, message=f"완료: {out.name} ({written} bytes)")
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            print(f"[export failed] {task_hex}: {type(e).__name__}: {e}")
+            try:
+                from src.model import db
+                db.session.rollback()
+                _update(task_id, status="FAILED", message=f"{type(e).__name__}: {e}", level="ERROR")
+            except Exception as e2:
+                print(f"[export status update failed] {task_hex}: {e2}")
+        finally:
+            from src.model import db
+            db.session.remove()
+
+
+def submit(app, spec: ExportSpec, fmt: str, fits_id: Optional[bytes] = None) -> str:
+    """JobTask(EXPORT, QUEUED)를 만들고 작업 스레드에 넘긴다 → task id(hex)"""
+    from src.model import db
+    from src.model.models import JobTask
+
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt} ({', '.join(FORMATS)})")
+    _sweep()
+    task = JobTask(task_type="EXPORT", fits_id=fits_id, status="QUEUED", progress_pct=0,
+                   message=spec.describe()[:512])
+    db.session.add(task)
+    db.session.commit()
+    _executor().submit(_run, app, task.task_id, spec, fmt)
+    return task.task_id.hex()
+
+
+def status(task_hex: str) -> Optional[Dict[str, Any]]:
+    from src.model import db
+    from src.model.models import JobTask
+
+    if not re.fullmatch(r"[0-9a-f]{32}", task_hex):
+        return None
+    task = db.session.get(JobTask, bytes.fromhex(task_hex))
+    if task is None or task.task_type != "EXPORT":
+        return None
+    return {
+        "task_id": task_hex,
+        "status": task.status,
+        "progress_pct": task.progress_pct,
+        "message": task.message,
+    }
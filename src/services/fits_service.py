@@ -1,41 +1,107 @@
 # src/services/fits_service.py
 from __future__ import annotations
+import hashlib
+import os
+import threading
 import uuid
+from collections import OrderedDict
+from functools import partial
 from typing import Dict, Any, Optional
-import numpy as np
-from astropy.io import fits
-from io import BytesIO
-from PIL import Image
 
 from src.external.challan_loader import load_challan_postprocessing, load_fit_ellipse
+from src.services import calibration, cube_store, prefetch, slit_curvature
+from src.services.pipeline import MEMO, Pipeline, Stage
+from src.utils import colormap, encoder, metrics
+from src.utils.lazy import lazy_module
 
-_FILE_REG: Dict[str, Dict[str, Any]] = {}
+# 과학 계산 모듈은 첫 요청 때 import (앱/워커 기동 시간 단축)
+np = lazy_module("numpy")
+fits = lazy_module("astropy.io.fits")
+Image = lazy_module("PIL.Image")
+
+_FILE_REG: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_REG_LOCK = threading.Lock()
 
 # ---------------- Register / Meta ----------------
+# CUBE_SHARED=1 (wsgi.py)이면 큐브는 cube_store의 공유 메모리 파일에 한 번만 올라가고,
+# 다른 워커는 같은 file_id로 get_meta 할 때 복사 없이 붙는다.
+def _registry_size() -> int:
+    # 공유 모드의 큐브는 memmap이라 여러 개 붙어 있어도 싸다 / 아니면 예전처럼 큐브 하나
+    return max(1, int(os.getenv("FITS_REGISTRY_SIZE", "4" if cube_store.enabled() else "1")))
+
+def _set_current(file_id: str, entry: Dict[str, Any]) -> None:
+    # 프로세스당 최근 큐브 FITS_REGISTRY_SIZE개만 유지 (LRU).
+    # 밀려난 큐브는 이 프로세스의 공유 참조만 놓는다 — 다른 사용자가 보던 큐브일 수 있으므로
+    # 공유 파일 삭제는 cube_store.sweep()이 유휴 시간(CUBE_TTL_SEC)으로 판단한다.
+    with _REG_LOCK:
+        _FILE_REG[file_id] = entry
+        _FILE_REG.move_to_end(file_id)
+        evicted = []
+        while len(_FILE_REG) > _registry_size():
+            evicted.append(_FILE_REG.popitem(last=False)[0])
+    if cube_store.enabled():
+        for old in evicted:
+            cube_store.release(old)
+
 def register_fits(path: str) -> tuple[str, tuple[int, ...] | None, dict[str, Any]]:
     """FITS 파일 등록: 첫 번째 데이터가 있는 IMAGE HDU 자동 선택"""
-    with fits.open(path, memmap=False, do_not_scale_image_data=True) as hdul:
+    shared = cube_store.enabled()
+    file_id = str(uuid.uuid4())
+    with metrics.timed(metrics.STAGE_SECONDS, stage="fits_open"), \
+            fits.open(path, memmap=shared, do_not_scale_image_data=True) as hdul:
         hdu = next((h for h in hdul if getattr(h, "data", None) is not None), None)
         if hdu is None:
             raise ValueError("No IMAGE HDU with data")
         arr = hdu.data
         shape = tuple(arr.shape) if arr is not None else None
         header = dict(hdu.header) if hdu.header else {}
+        if shared and arr is not None:
+            # 디스크 memmap → 공유 파일로 청크 복사 (이 워커에도 사본을 만들지 않음)
+            cube = cube_store.publish(file_id, arr, {"path": path, "shape": shape, "header": header})
+        else:
+            cube = np.asarray(arr, dtype=np.float32) if arr is not None else None
 
-    _FILE_REG.clear()
-    file_id = str(uuid.uuid4())
-    _FILE_REG[file_id] = {
+    _set_current(file_id, {
         "path": path,
         "shape": shape,                                             
         "header": header,
-        "cube": np.asarray(arr, dtype=np.float32) if arr is not None else None,
-    }
+        "cube": cube,
+    })
     return file_id, shape, header
 
 def get_meta(file_id: str) -> dict[str, Any]:
-    if file_id not in _FILE_REG:
+    with _REG_LOCK:
+        entry = _FILE_REG.get(file_id)
+        if entry is not None:
+            _FILE_REG.move_to_end(file_id)
+            return entry
+    hit = cube_store.attach(file_id) if cube_store.enabled() else None
+    if hit is None:
         raise KeyError(f"Unknown file_id {file_id}")
-    return _FILE_REG[file_id]
+    cube, meta = hit
+    entry = {
+        "path": meta.get("path"),
+        "shape": tuple(meta["shape"]) if meta.get("shape") else None,
+        "header": meta.get("header") or {},
+        "cube": cube,
+    }
+    _set_current(file_id, entry)
+    return entry
+
+@metrics.register_collector
+def _registry_families() -> list:
+    """/metrics: 이 프로세스 레지스트리의 큐브 메모리 + 공유 저장소 크기 (적분 영상은 pipeline 캐시 지표에 포함)"""
+    cube_bytes = sum(getattr(entry.get("cube"), "nbytes", 0) for entry in list(_FILE_REG.values()))
+    families = [
+        ("fits_registry_cubes", "gauge", "Cubes registered in this process", [({}, len(_FILE_REG))]),
+        ("fits_registry_bytes", "gauge", "Bytes referenced by this process's registry",
+         [({"kind": "cube"}, cube_bytes)]),
+    ]
+    if cube_store.enabled():
+        st = cube_store.stats()
+        families.append(("cube_store_bytes", "gauge", "Bytes in the shared cube store", [({}, st["bytes"])]))
+        families.append(("cube_store_cubes", "gauge", "Cubes in the shared cube store", [({}, st["cubes"])]))
+    return families
 
 # ---------------- New: Z 슬라이스 자동 추정 ----------------
 def guess_best_z(file_id: str, target: int = 512) -> int:
@@ -59,21 +125,92 @@ def guess_best_z(file_id: str, target: int = 512) -> int:
         return 0
     return int(np.nanargmax(var))
 
-# ---------------- External algorithms (fail-soft) ----------------
-def _apply_dark_flat_via_external(data: np.ndarray) -> np.ndarray:
+# ---------------- Dark / Flat (calibration library → CHALLAN_APP_DIR 훅) ----------------
+def _external_postproc():
+    """CHALLAN_APP_DIR/challan_postprocessing.py 모듈. 폴더/파일이 설정되지 않았으면 None"""
+    try:
+        return load_challan_postprocessing()
+    except (RuntimeError, FileNotFoundError):
+        return None
+
+
+def _apply_dark_flat_via_external(mod, data: np.ndarray) -> np.ndarray:
+    """
+    외부 모듈의 apply_dark_flat (이전부터 쓰던 훅). 실패하거나 모양이 다르면 경고 후 원본.
+    """
     try:
-        chl_mod = load_challan_postprocessing()
-        if hasattr(chl_mod, "challan_postprocessing"):
-            chl = chl_mod.challan_postprocessing()
-            if hasattr(chl, "apply_dark_flat"):
-                return chl.apply_dark_flat(data)
-        if hasattr(chl_mod, "apply_dark_flat"):
-            return chl_mod.apply_dark_flat(data)
+        if hasattr(mod, "challan_postprocessing"):
+            out = mod.challan_postprocessing().apply_dark_flat(data)
+        elif hasattr(mod, "apply_dark_flat"):
+            out = mod.apply_dark_flat(data)
+        else:
+            return data
+    except Exception as e:
+        print(f"[postproc skipped] {type(e).__name__}: {e}")
+        return data
+    if not isinstance(out, np.ndarray) or out.shape != data.shape:
+        print("[warn] correction returned invalid result; using original")
+        return data
+    return out
+
+
+def _full_frame(yx) -> bool:
+    return all(isinstance(s, slice) and s == slice(None) for s in yx)
+
+
+def _apply_dark_flat(meta: dict[str, Any], arr: np.ndarray, yx=(slice(None), slice(None)),
+                     index=None) -> np.ndarray:
+    """
+    CALIB_DIR의 마스터 dark/flat 중 헤더(INSTRUME/EXPTIME)와 크기가 맞는 것으로 보정.
+    yx: arr가 큐브의 어느 (y, x) 부분인지 → dark/flat도 같은 인덱스로 잘라 브로드캐스트
+        preview: [:, :], slit(x): [:, x], spectrum(x, y): [y, x]
+    맞는 프레임이 없으면 CHALLAN_APP_DIR의 외부 훅으로 넘기고, 그것도 없으면
+    보정할 것이 없으므로 복사 없이 원본을 그대로 돌려준다.
+    외부 훅은 예전처럼 (…, Y, X) 전체 프레임을 받는다고 가정한다: arr가 전체 프레임이 아니면
+    (slit/spectrum/부분 큐브) 큐브 전체를 보정한 뒤 index(기본: 모든 z + yx)로 잘라 복사한다.
+    이 경우 요청마다 큐브 크기의 float32 임시 배열이 생긴다 (기존 동작과 같은 비용).
+    """
+    try:
+        dark, flat = calibration.get_library().select(meta.get("header") or {}, meta.get("shape") or ())
+        if dark is None and flat is None:
+            mod = _external_postproc()
+            if mod is None:
+                return arr
+            if _full_frame(yx):
+                return _apply_dark_flat_via_external(mod, arr)
+            cube = meta["cube"]
+            full = _apply_dark_flat_via_external(mod, cube)
+            if full is cube:
+                return arr
+            if index is None:
+                index = (slice(None),) * (cube.ndim - len(yx)) + tuple(yx)
+            # 잘라낸 뷰는 임시 큐브 전체를 붙잡으므로 복사
+            return np.array(full[index], dtype=np.float32)
+        return calibration.apply_dark_flat(
+            arr,
+            dark[yx] if dark is not None else None,
+            flat[yx] if flat is not None else None,
+        )
     except Exception as e:
         print(f"[postproc skipped] {type(e).__name__}: {e}")
-    return data
+    return arr
+
+# ---------------- External algorithms (fail-soft) ----------------
+def _curvature_mode() -> str:
+    """
+    SLIT_CURVATURE:
+      builtin (기본) slit_curvature.make_circle — 번들 challan_postprocessing.make_circle과 같은
+                     warpPolar 기하(이미지 중심)를 기하별로 캐시한 좌표 맵으로 remap. fit_ellipse 불필요
+      external       CHALLAN_APP_DIR/fit_ellipse.make_circular (있을 때만, 없으면 원본 - 예전 동작).
+                     외부 함수는 변환표를 내부에서 만들므로 앞에서 맵을 캐시할 수 없고,
+                     pipeline이 slit별 결과만 메모이즈한다
+      off            보정 안 함
+    """
+    mode = (os.getenv("SLIT_CURVATURE") or "builtin").strip().lower()
+    return mode if mode in ("builtin", "external", "off") else "builtin"
 
 def _correct_slit_curvature_via_external(slit2d: np.ndarray) -> np.ndarray:
+    """fit_ellipse가 있을 때만 곡률 보정 (없으면 원본 그대로 - 기존 동작 유지)"""
     try:
         fit_mod = load_fit_ellipse()
         if fit_mod is not None and hasattr(fit_mod, "make_circular"):
@@ -85,13 +222,21 @@ def _correct_slit_curvature_via_external(slit2d: np.ndarray) -> np.ndarray:
         print(f"[curvature skipped] {type(e).__name__}: {e}")
     return slit2d
 
+def _correct_slit_curvature(slit2d: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "builtin":
+        return slit_curvature.make_circle(slit2d)
+    if mode == "external":
+        return _correct_slit_curvature_via_external(slit2d)
+    return slit2d
+
 # ---------------- PNG helpers ----------------
-def _to_png(arr2d: np.ndarray, max_wh: int = 1024, *, percent_clip: float = 1.0):
+def _stretch_u8(arr2d: np.ndarray, percent_clip: float = 1.0, stretch: str = colormap.DEFAULT_STRETCH) -> np.ndarray:
     arr = np.nan_to_num(arr2d, nan=0.0, posinf=0.0, neginf=0.0)
 
     # robust stretch: p1/p99가 비정상이면 min/max로 폴백
     if percent_clip > 0:
-        p1, p99 = np.percentile(arr, (1.0, 99.0))
+        with metrics.timed(metrics.STAGE_SECONDS, stage="percentile"):
+            p1, p99 = np.percentile(arr, (1.0, 99.0))
         if (not np.isfinite(p1)) or (not np.isfinite(p99)) or (p99 - p1) < 1e-6:
             vmin, vmax = float(np.min(arr)), float(np.max(arr))
         else:
@@ -103,48 +248,268 @@ def _to_png(arr2d: np.ndarray, max_wh: int = 1024, *, percent_clip: float = 1.0)
             vmin, vmax = 0.0, 1.0
 
     denom = (vmax - vmin) if (vmax - vmin) != 0 else 1.0
-    u8 = ((arr - vmin) / denom * 255.0).astype(np.uint8)
+    t = (arr - vmin) / denom
+    if stretch != "linear":
+        colormap.stretch(t, stretch)   # [0, 1] → [0, 1], 제자리 벡터 연산
+    t *= 255.0
+    return t.astype(np.uint8)
+
+def _encode_image(u8: np.ndarray, max_wh: int = 1024, cmap: str = colormap.DEFAULT_CMAP,
+                  fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE):
     im = Image.fromarray(u8, mode="L")
 
     h, w = im.height, im.width
     scale = min(1.0, max_wh / max(h, w))
     if scale < 1.0:
-        im = im.resize((int(w * scale), int(h * scale)), Image.BILINEAR)
-    buf = BytesIO(); im.save(buf, format="PNG"); buf.seek(0)
-    return buf.getvalue(), im.width, im.height
+        with metrics.timed(metrics.STAGE_SECONDS, stage="resize"):
+            im = im.resize((int(w * scale), int(h * scale)), Image.BILINEAR)
+    if cmap != "gray":
+        # 축소는 회색조에서 끝내고(팔레트 이미지는 NEAREST로만 리사이즈됨) 팔레트만 붙인다
+        # → "P" 모드 8비트 PNG: 회색조와 같은 인코딩 비용/크기, 색은 디코더가 팔레트로 펼침
+        im.putpalette(colormap.palette(cmap))
+    with metrics.timed(metrics.STAGE_SECONDS, stage=f"{fmt}_encode"):
+        data = encoder.encode(im, fmt, profile)   # 형식/프로필별 zlib·WebP 설정은 utils/encoder.py
+    return data, im.width, im.height
+
+def _to_png(arr2d: np.ndarray, max_wh: int = 1024, *, percent_clip: float = 1.0,
+            stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP):
+    return _encode_image(_stretch_u8(arr2d, percent_clip, stretch), max_wh, cmap)
+
+# ---------------- Raw (16bit 양자화) helpers ----------------
+# 브라우저가 percent_clip/스트레치/컬러맵을 직접 다시 적용할 수 있도록 평면을 uint16 코드로 보낸다.
+#   값 ≈ offset + code * scale, code == RAW_NODATA 이면 NaN/inf
+# 히스토그램은 코드 상위 비트로 나눈 bins개 구간 (클라이언트가 누적합으로 p1/p99를 찾는다).
+RAW_NODATA = 65535
+
+def _quantize_u16(arr2d: np.ndarray):
+    a = np.asarray(arr2d, dtype=np.float32)
+    finite = np.isfinite(a)
+    if finite.all():
+        lo, hi = float(a.min()), float(a.max())
+    elif finite.any():
+        lo, hi = float(a[finite].min()), float(a[finite].max())
+    else:
+        lo, hi = 0.0, 0.0
+    scale = (hi - lo) / (RAW_NODATA - 1) if hi > lo else 1.0
+    t = a - np.float32(lo)
+    t *= np.float32(1.0 / scale)
+    np.rint(t, out=t)
+    t[~finite] = RAW_NODATA
+    q = t.astype("<u2")
+    q.flags.writeable = False
+    return q, lo, scale
+
+def _histogram_u16(quant, bins: int):
+    # → (hist, p1, p99): p1/p99는 코드 단위 정확한 백분위수 (프리뷰 percent_clip과 같은 기준)
+    q = quant[0]
+    shift = 16 - (int(bins).bit_length() - 1)
+    codes = q.ravel()
+    codes = codes[codes != RAW_NODATA]
+    hist = np.bincount(codes >> shift, minlength=bins).astype(np.int64)
+    if codes.size == 0:
+        return hist, 0.0, 0.0
+    p1, p99 = np.percentile(codes, (1.0, 99.0))
+    return hist, float(p1), float(p99)
+
+# ---------------- Pipeline stages ----------------
+# 각 public API는 아래 단계들을 조합한 Pipeline으로 실행된다.
+# 단계 키는 (파일, 앞 단계들, 파라미터)의 해시라서, 예컨대 percent_clip만 바뀌면
+# 보정/곡률 결과는 pipeline.MEMO에서 꺼내 쓰고 stretch/encode만 다시 계산한다.
+# (cmap이나 이미지 형식/프로필만 바뀌면 stretch 결과도 재사용하고 encode만)
+def _source(meta: dict[str, Any]):
+    return meta["cube"]
+
+def _source_key(file_id: str, meta: dict[str, Any]) -> str:
+    return f"{file_id}:{meta.get('path')}"
+
+def _slice_stage(cube: np.ndarray, index) -> np.ndarray:
+    return cube[index]
+
+def _dark_flat_stage(meta: dict[str, Any], arr: np.ndarray, yx, calib: str, hook: str) -> np.ndarray:
+    # calib(CALIB_DIR)/hook(CHALLAN_APP_DIR)은 키에만 쓰인다: 보정 소스가 바뀌면 이전 결과를 재사용하지 않도록
+    return _apply_dark_flat(meta, arr, yx)
+
+def _curvature_stage(slit_zy: np.ndarray, mode: str) -> np.ndarray:
+    return _correct_slit_curvature(slit_zy.T, mode)   # (z, y) → 전치 → (y, z)
+
+def _dark_flat(meta: dict[str, Any], yx) -> Stage:
+    params = {"yx": yx, "calib": os.getenv("CALIB_DIR") or "", "hook": os.getenv("CHALLAN_APP_DIR") or ""}
+    return Stage("dark_flat", partial(_dark_flat_stage, meta), params)
+
+def _render_stages(percent_clip: float, stretch: str, cmap: str, fmt: str, profile: str,
+                   max_wh: int = 1024) -> list[Stage]:
+    colormap.check(cmap, stretch)
+    encoder.check(fmt, profile)
+    return [
+        Stage("stretch", _stretch_u8, {"percent_clip": float(percent_clip), "stretch": stretch}),
+        Stage("encode", _encode_image, {"max_wh": int(max_wh), "cmap": cmap, "fmt": fmt, "profile": profile}),
+    ]
 
 # ---------------- Public APIs ----------------
-def load_preview(file_id: str, z: Optional[int] = None, *, percent_clip: float = 1.0, apply_correction: bool = True):
-    meta = get_meta(file_id)
+def _plane_stages(meta: dict[str, Any], z: Optional[int], apply_correction: bool) -> list[Stage]:
+    # z 평면(2D 영상이면 전체) + 선택적 dark/flat — 프리뷰 PNG와 raw 슬라이스가 공유
     cube = meta["cube"]
     if cube is None:
         raise ValueError("No cube loaded")
 
     if cube.ndim == 3:
         z = cube.shape[0] // 2 if z is None else int(np.clip(z, 0, cube.shape[0]-1))
-        arr2d = cube[z]
+        index = z
     else:
-        arr2d = cube
+        index = np.s_[:, :]
 
+    stages = [Stage("slice", _slice_stage, {"index": index}, cache=False)]
     if apply_correction:
-        arr_corr = _apply_dark_flat_via_external(arr2d)
-        if isinstance(arr_corr, np.ndarray) and arr_corr.shape == arr2d.shape:
-            arr2d = arr_corr
-        else:
-            print("[warn] correction returned invalid result; using original")
+        stages.append(_dark_flat(meta, np.s_[:, :]))
+    return stages
 
-    return _to_png(arr2d, percent_clip=percent_clip)
+def _preview_pipeline(file_id: str, z: Optional[int], percent_clip: float, apply_correction: bool,
+                      stretch: str, cmap: str, fmt: str, profile: str) -> Pipeline:
+    meta = get_meta(file_id)
+    stages = _plane_stages(meta, z, apply_correction) + _render_stages(percent_clip, stretch, cmap, fmt, profile)
+    return Pipeline(_source_key(file_id, meta), partial(_source, meta), stages)
 
-def get_slit_image(file_id: str, x: int, *, percent_clip: float = 1.0, apply_correction: bool = True):
+def _raw_pipeline(file_id: str, z: Optional[int], apply_correction: bool, bins: Optional[int] = None) -> Pipeline:
     meta = get_meta(file_id)
+    stages = _plane_stages(meta, z, apply_correction) + [Stage("quantize", _quantize_u16)]
+    if bins is not None:
+        stages.append(Stage("histogram", _histogram_u16, {"bins": int(bins)}))
+    return Pipeline(_source_key(file_id, meta), partial(_source, meta), stages)
+
+def _slit_stages(meta: dict[str, Any], x: int, apply_correction: bool) -> list[Stage]:
+    # x 열 slit + 선택적 dark/flat + 곡률 보정 — 마지막(curvature) 단계 결과를 _warm_slits가 일괄로 채운다
     cube = meta["cube"]
     if cube is None or cube.ndim != 3:
         raise ValueError("3D cube required")
 
-    data = _apply_dark_flat_via_external(cube) if apply_correction else cube
-    slit = data[:, :, x].T   # (z, y) → 전치 → (y, z)
-    slit = _correct_slit_curvature_via_external(slit)
-    return _to_png(slit, percent_clip=percent_clip)
+    stages = [Stage("slice", _slice_stage, {"index": np.s_[:, :, int(x)]}, cache=False)]
+    if apply_correction:
+        stages.append(_dark_flat(meta, np.s_[:, int(x)]))   # 해당 x 열만 보정
+    stages.append(Stage("curvature", _curvature_stage, {"mode": _curvature_mode()}))
+    return stages
+
+def _slit_pipeline(file_id: str, x: int, percent_clip: float, apply_correction: bool,
+                   stretch: str, cmap: str, fmt: str, profile: str) -> Pipeline:
+    meta = get_meta(file_id)
+    stages = _slit_stages(meta, x, apply_correction) + _render_stages(percent_clip, stretch, cmap, fmt, profile)
+    return Pipeline(_source_key(file_id, meta), partial(_source, meta), stages)
+
+# 파이프라인 마지막(encode) 단계 키는 입력 파일 + 모든 단계 파라미터(CALIB_DIR, 곡률 모드 포함)의 해시라서
+# 렌더하지 않고도 결과 이미지를 식별한다 → 이미지 응답의 강한 ETag로 쓴다.
+def load_preview(file_id: str, z: Optional[int] = None, *, percent_clip: float = 1.0, apply_correction: bool = True,
+                 stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP,
+                 fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE):
+    return _preview_pipeline(file_id, z, percent_clip, apply_correction, stretch, cmap, fmt, profile).run()
+
+def preview_etag(file_id: str, z: Optional[int] = None, *, percent_clip: float = 1.0, apply_correction: bool = True,
+                 stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP,
+                 fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE) -> str:
+    return _preview_pipeline(file_id, z, percent_clip, apply_correction, stretch, cmap, fmt, profile).keys[-1]
+
+def get_slit_image(file_id: str, x: int, *, percent_clip: float = 1.0, apply_correction: bool = True,
+                   stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP,
+                   fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE):
+    return _slit_pipeline(file_id, x, percent_clip, apply_correction, stretch, cmap, fmt, profile).run()
+
+def slit_etag(file_id: str, x: int, *, percent_clip: float = 1.0, apply_correction: bool = True,
+              stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP,
+              fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE) -> str:
+    return _slit_pipeline(file_id, x, percent_clip, apply_correction, stretch, cmap, fmt, profile).keys[-1]
+
+def load_raw(file_id: str, z: Optional[int] = None, *, apply_correction: bool = True):
+    """z 평면을 uint16 코드로 → (q(h, w) '<u2', offset, scale). 같은 평면의 PNG 프리뷰와 보정 단계를 공유"""
+    return _raw_pipeline(file_id, z, apply_correction).run()
+
+def raw_etag(file_id: str, z: Optional[int] = None, *, apply_correction: bool = True) -> str:
+    return _raw_pipeline(file_id, z, apply_correction).keys[-1]
+
+def raw_histogram(file_id: str, z: Optional[int] = None, *, apply_correction: bool = True, bins: int = 1024):
+    """load_raw 코드의 (히스토그램, p1, p99). bins는 2의 거듭제곱(64~65536), RAW_NODATA는 세지 않는다"""
+    if bins < 64 or bins > 65536 or bins & (bins - 1):
+        raise ValueError("bins는 64~65536 사이의 2의 거듭제곱이어야 합니다")
+    return _raw_pipeline(file_id, z, apply_correction, bins).run()
+
+# 슬라이더로 z/x를 한 칸씩 옮기는 동안 진행 방향의 이웃을 미리 렌더 (services/prefetch.py)
+def prefetch_preview(file_id: str, z: Optional[int], *, percent_clip: float = 1.0, apply_correction: bool = True,
+                     stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP,
+                     fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE) -> None:
+    shape = get_meta(file_id).get("shape") or ()
+    if z is None or len(shape) != 3:
+        return
+    kw = {"percent_clip": percent_clip, "apply_correction": apply_correction, "stretch": stretch, "cmap": cmap,
+          "fmt": fmt, "profile": profile}
+    prefetch.note(
+        ("preview", file_id, float(percent_clip), bool(apply_correction), stretch, cmap, fmt, profile), int(z), shape[0],
+        key=lambda p: preview_etag(file_id, p, **kw),
+        render=lambda p: load_preview(file_id, p, **kw),
+    )
+
+def prefetch_slit(file_id: str, x: int, *, percent_clip: float = 1.0, apply_correction: bool = True,
+                  stretch: str = colormap.DEFAULT_STRETCH, cmap: str = colormap.DEFAULT_CMAP,
+                  fmt: str = encoder.DEFAULT_FORMAT, profile: str = encoder.DEFAULT_PROFILE) -> None:
+    shape = get_meta(file_id).get("shape") or ()
+    if len(shape) != 3:
+        return
+    kw = {"percent_clip": percent_clip, "apply_correction": apply_correction, "stretch": stretch, "cmap": cmap,
+          "fmt": fmt, "profile": profile}
+    prefetch.note(
+        ("slit", file_id, float(percent_clip), bool(apply_correction), stretch, cmap, fmt, profile), int(x), shape[2],
+        key=lambda p: slit_etag(file_id, p, **kw),
+        render=lambda p: get_slit_image(file_id, p, **kw),
+        batch=lambda ps: _warm_slits(file_id, ps, apply_correction),
+    )
+
+def get_slit_stack(file_id: str, xs, *, apply_correction: bool = True) -> np.ndarray:
+    """
+    여러 x 위치의 보정된 slit을 한 번에 (N, y, z) float32 배열로.
+    dark/flat은 열 N개를 한 번에, 곡률 보정은 make_circle_batch로 좌표 맵 조회 한 번에 일괄 처리한다.
+    """
+    meta = get_meta(file_id)
+    cube = meta["cube"]
+    if cube is None or cube.ndim != 3:
+        raise ValueError("3D cube required")
+
+    xs = [int(x) for x in xs]
+    slits = cube[:, :, xs]                       # (z, y, N)
+    if apply_correction:
+        slits = _apply_dark_flat(meta, slits, np.s_[:, xs])
+    stack = np.ascontiguousarray(np.transpose(slits, (2, 1, 0)), dtype=np.float32)  # (N, y, z)
+    mode = _curvature_mode()
+    if mode == "builtin":
+        return slit_curvature.make_circle_batch(stack)
+    if mode == "external":
+        return np.stack([_correct_slit_curvature_via_external(s) for s in stack])
+    return stack
+
+def _warm_slits(file_id: str, xs, apply_correction: bool) -> None:
+    """
+    프리페치할 이웃 slit들의 곡률 보정 결과를 get_slit_stack으로 일괄 계산해
+    각 slit 파이프라인의 curvature 단계 키로 MEMO에 넣는다 → 이어지는 렌더는 stretch/encode만
+    """
+    if _curvature_mode() != "builtin":
+        return   # 외부/무보정은 일괄로 얻는 것이 없다
+    meta = get_meta(file_id)
+    source = _source_key(file_id, meta)
+    keys = {int(x): Pipeline(source, partial(_source, meta), _slit_stages(meta, int(x), apply_correction)).keys[-1]
+            for x in xs}
+    todo = [x for x, k in keys.items() if k not in MEMO]
+    if not todo:
+        return
+    stack = get_slit_stack(file_id, todo, apply_correction=apply_correction)
+    for x, slit in zip(todo, stack):
+        slit = slit.copy()                 # 스택 전체를 붙잡지 않도록 slit마다 따로
+        slit.flags.writeable = False
+        MEMO.put(keys[x], slit)
+
+def prefetch_raw(file_id: str, z: Optional[int], *, apply_correction: bool = True) -> None:
+    shape = get_meta(file_id).get("shape") or ()
+    if z is None or len(shape) != 3:
+        return
+    prefetch.note(
+        ("raw", file_id, bool(apply_correction)), int(z), shape[0],
+        key=lambda p: raw_etag(file_id, p, apply_correction=apply_correction),
+        render=lambda p: load_raw(file_id, p, apply_correction=apply_correction),
+    )
 
 def get_spectrum(file_id: str, x: int, y: int, *, apply_correction: bool = True):
     meta = get_meta(file_id)
@@ -152,7 +517,205 @@ def get_spectrum(file_id: str, x: int, y: int, *, apply_correction: bool = True)
     if cube is None or cube.ndim != 3:
         raise ValueError("3D cube required")
 
-    data = _apply_dark_flat_via_external(cube) if apply_correction else cube
-    spec = data[:, y, x].astype(np.float32)
+    stages = [Stage("slice", _slice_stage, {"index": np.s_[:, int(y), int(x)]}, cache=False)]
+    if apply_correction:
+        stages.append(_dark_flat(meta, np.s_[int(y), int(x)]))   # 해당 픽셀만 보정
+    spec = Pipeline(_source_key(file_id, meta), partial(_source, meta), stages).run()
+    spec = np.asarray(spec, dtype=np.float32)
     lam = np.arange(spec.size, dtype=np.float32)
     return lam, spec
+
+# ---------------- Aperture spectra (summed-area tables) ----------------
+def _integral_images(file_id: str, meta: dict[str, Any], apply_correction: bool) -> Optional[np.ndarray]:
+    """
+    큐브의 z 슬라이스별 적분 영상(SAT) (Z, Y+1, X+1) float64.
+    sat[z, i, j] = cube[z, :i, :j].sum() → 임의의 직사각형 합이 4번 조회(O(1))로 끝난다.
+    NaN/inf는 0으로 취급. 크기: Z·(Y+1)·(X+1)·8바이트 ≈ float32 큐브의 2배 (보정 조합마다 하나).
+      - CUBE_SHARED: 공유 큐브 옆 .aux 파일(memmap)로 한 번만 만들어 모든 워커가 공유, 큐브와 함께 삭제
+      - 아니면 pipeline.MEMO(PIPELINE_CACHE_MB)에 — 예산보다 크면 None
+        (get_aperture_spectrum이 조리개 주변 창만의 SAT로 대신한다)
+    """
+    cube = meta["cube"]
+    Z, Y, X = cube.shape
+    calib = f"{bool(apply_correction)}|{os.getenv('CALIB_DIR') or ''}|{os.getenv('CHALLAN_APP_DIR') or ''}"
+    if cube_store.enabled():
+        tag = hashlib.sha1(calib.encode()).hexdigest()[:12]
+        return cube_store.aux(file_id, f"sat-{tag}", (Z, Y + 1, X + 1), np.float64,
+                              partial(_fill_integral_images, meta, apply_correction))
+    if Z * (Y + 1) * (X + 1) * 8 > MEMO.max_bytes:
+        return None
+    key = ("sat", _source_key(file_id, meta), calib)
+    return MEMO.get_or_compute(key, partial(_build_integral_images, meta, apply_correction))
+
+def _build_integral_images(meta: dict[str, Any], apply_correction: bool) -> np.ndarray:
+    Z, Y, X = meta["cube"].shape
+    sat = np.zeros((Z, Y + 1, X + 1), dtype=np.float64)
+    _fill_integral_images(meta, apply_correction, sat)
+    sat.flags.writeable = False   # 캐시에서 공유되므로 읽기 전용
+    return sat
+
+def _fill_integral_images(meta: dict[str, Any], apply_correction: bool, sat: np.ndarray) -> None:
+    # sat: 0으로 초기화된 (Z, Y+1, X+1) float64
+    cube = meta["cube"]
+    step = 8   # z 청크 단위로 계산해 임시 배열을 제한
+    for z0 in range(0, cube.shape[0], step):
+        chunk = cube[z0:z0 + step]
+        if apply_correction:
+            chunk = _apply_dark_flat(meta, chunk)
+        chunk = np.nan_to_num(chunk, nan=0.0, posinf=0.0, neginf=0.0)
+        np.cumsum(chunk, axis=1, dtype=np.float64, out=sat[z0:z0 + step, 1:, 1:])
+        np.cumsum(sat[z0:z0 + step, 1:, 1:], axis=2, out=sat[z0:z0 + step, 1:, 1:])
+
+def _window_integral_images(meta: dict[str, Any], apply_correction: bool, y0: int, y1: int,
+                            x0: int, x1: int) -> np.ndarray:
+    """[y0, y1) × [x0, x1) 창만의 SAT (Z, h+1, w+1) — 전체 SAT가 캐시 예산을 넘을 때. 비용 O(Z·창 넓이)"""
+    yx = np.s_[y0:y1, x0:x1]
+    win = meta["cube"][(slice(None),) + yx]
+    if apply_correction:
+        win = _apply_dark_flat(meta, np.asarray(win, dtype=np.float32), yx, (slice(None),) + yx)
+    win = np.nan_to_num(win, nan=0.0, posinf=0.0, neginf=0.0)
+    sat = np.zeros((win.shape[0], y1 - y0 + 1, x1 - x0 + 1), dtype=np.float64)
+    np.cumsum(win, axis=1, dtype=np.float64, out=sat[:, 1:, 1:])
+    np.cumsum(sat[:, 1:, 1:], axis=2, out=sat[:, 1:, 1:])
+    return sat
+
+def _box_sum(sat: np.ndarray, y0, y1, x0, x1) -> np.ndarray:
+    """[y0, y1) × [x0, x1) 합. 인자가 배열이면 (Z, N) 반환"""
+    return sat[:, y1, x1] - sat[:, y0, x1] - sat[:, y1, x0] + sat[:, y0, x0]
+
+def _circle_sum(sat: np.ndarray, x: int, y: int, r: float) -> tuple[np.ndarray, int]:
+    """
+    반지름 r 원 안 픽셀 합 (Z,)과 픽셀 수. 원을 행 단위 구간으로 나눠 각 행을 높이 1 박스로 → O(Z·r)
+    """
+    _, Yp1, Xp1 = sat.shape
+    ri = int(np.floor(r))
+    dy = np.arange(-ri, ri + 1)
+    half = np.floor(np.sqrt(np.maximum(r * r - dy * dy, 0.0))).astype(np.int64)
+    ys = y + dy
+    x0 = np.clip(x - half, 0, Xp1 - 1)
+    x1 = np.clip(x + half + 1, 0, Xp1 - 1)
+    ok = (ys >= 0) & (ys < Yp1 - 1) & (x1 > x0)
+    ys, x0, x1 = ys[ok], x0[ok], x1[ok]
+    if ys.size == 0:
+        return np.zeros(sat.shape[0], dtype=np.float64), 0
+    rows = _box_sum(sat, ys, ys + 1, x0, x1)   # (Z, rows)
+    return rows.sum(axis=1), int((x1 - x0).sum())
+
+def get_aperture_spectrum(
+    file_id: str,
+    x: int,
+    y: int,
+    *,
+    half_w: int = 0,
+    half_h: int = 0,
+    radius: Optional[float] = None,
+    annulus: Optional[tuple[float, float]] = None,
+    apply_correction: bool = True,
+):
+    """
+    조리개 스펙트럼.
+      - radius 지정: 중심 (x, y) 원형 조리개
+      - 아니면: (x±half_w) × (y±half_h) 박스 (0, 0이면 단일 픽셀)
+      - annulus=(r_in, r_out): 고리 영역의 픽셀당 평균을 배경으로 빼기
+    적분 영상 덕분에 박스는 크기와 무관하게 O(Z), 원/고리는 O(Z·r).
+    전체 SAT가 캐시 예산을 넘으면(비공유 모드의 큰 큐브) 조리개+고리를 덮는 창의 SAT만 만들어 쓴다: O(Z·창).
+    """
+    meta = get_meta(file_id)
+    cube = meta["cube"]
+    if cube is None or cube.ndim != 3:
+        raise ValueError("3D cube required")
+    _, Y, X = cube.shape
+    x, y = int(x), int(y)
+    half_w, half_h = int(half_w), int(half_h)
+    if not (0 <= x < X and 0 <= y < Y):
+        raise ValueError(f"(x, y)=({x}, {y}) outside image {X}x{Y}")
+    if half_w < 0 or half_h < 0 or (radius is not None and radius < 0):
+        raise ValueError("half_w, half_h, radius must be >= 0")
+    if annulus is not None and not (0 <= float(annulus[0]) < float(annulus[1])):
+        raise ValueError("annulus requires 0 <= r_in < r_out")
+
+    sat = _integral_images(file_id, meta, apply_correction)
+    oy = ox = 0   # sat 좌표 = 이미지 좌표 - (oy, ox)
+    if sat is None:
+        reach = int(np.ceil(max(radius or 0.0, float(annulus[1]) if annulus is not None else 0.0)))
+        wy0, wy1 = max(0, y - max(reach, half_h)), min(Y, y + max(reach, half_h) + 1)
+        wx0, wx1 = max(0, x - max(reach, half_w)), min(X, x + max(reach, half_w) + 1)
+        sat = _window_integral_images(meta, apply_correction, wy0, wy1, wx0, wx1)
+        oy, ox = wy0, wx0
+
+    if radius is not None and radius > 0:
+        flux, npix = _circle_sum(sat, x - ox, y - oy, float(radius))
+        aperture = {"shape": "circle", "radius": float(radius)}
+    else:
+        y0, y1 = max(0, y - half_h), min(Y, y + half_h + 1)
+        x0, x1 = max(0, x - half_w), min(X, x + half_w + 1)
+        flux = _box_sum(sat, y0 - oy, y1 - oy, x0 - ox, x1 - ox)
+        npix = (y1 - y0) * (x1 - x0)
+        aperture = {"shape": "box", "x0": x0, "x1": x1, "y0": y0, "y1": y1}
+    aperture["npix"] = npix
+
+    if annulus is not None:
+        r_in, r_out = float(annulus[0]), float(annulus[1])
+        outer, n_out = _circle_sum(sat, x - ox, y - oy, r_out)
+        inner, n_in = _circle_sum(sat, x - ox, y - oy, r_in) if r_in > 0 else (0.0, 0)
+        n_bg = n_out - n_in
+        if n_bg > 0:
+            bg = (outer - inner) / n_bg
+            flux = flux - bg * npix
+            aperture["background_npix"] = n_bg
+
+    spec = np.asarray(flux, dtype=np.float32)
+    lam = np.arange(spec.size, dtype=np.float32)
+    return lam, spec, aperture
+
+# ---------------- Sub-cube slicing ----------------
+def parse_axis(text: Optional[str], n: int):
+    """
+    NumPy식 축 인덱스 문자열 → int 또는 slice (음수 인덱스 허용, step은 1 이상).
+      None/""/":" → 전체, "5" → 5 (축 제거), "10:20", "::2", "-8:"
+    """
+    text = (text or "").strip()
+    if text in ("", ":", "::"):
+        return slice(0, n, 1)
+    parts = text.split(":")
+    if len(parts) == 1:
+        i = int(parts[0])
+        if not -n <= i < n:
+            raise IndexError(f"index {i} out of range 0..{n - 1}")
+        return i % n
+    if len(parts) > 3:
+        raise ValueError(f"bad slice {text!r}")
+    start, stop, step = (int(p) if p.strip() else None for p in parts + [""] * (3 - len(parts)))
+    if step is not None and step < 1:
+        raise ValueError("step must be >= 1")
+    return slice(*slice(start, stop, step).indices(n))
+
+def _axis_len(index) -> Optional[int]:
+    return None if isinstance(index, int) else len(range(index.start, index.stop, index.step))
+
+def subcube_index(file_id: str, z: Optional[str], y: Optional[str], x: Optional[str]) -> tuple:
+    """쿼리 문자열 → 큐브 인덱스 튜플 (2D 영상이면 z는 무시)"""
+    shape = get_meta(file_id)["cube"].shape
+    yx = (parse_axis(y, shape[-2]), parse_axis(x, shape[-1]))
+    return (parse_axis(z, shape[0]),) + yx if len(shape) == 3 else yx
+
+def subcube_shape(index: tuple) -> tuple[int, ...]:
+    return tuple(n for n in map(_axis_len, index) if n is not None)
+
+def subcube_etag(file_id: str, index: tuple, *, apply_correction: bool, dtype: str) -> str:
+    calib = f"{os.getenv('CALIB_DIR') or ''}|{os.getenv('CHALLAN_APP_DIR') or ''}"
+    key = f"{_source_key(file_id, get_meta(file_id))}|{index!r}|{apply_correction}|{calib}|{dtype}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def get_subcube(file_id: str, index: tuple, *, apply_correction: bool = True, dtype: str = "float32") -> np.ndarray:
+    """
+    큐브의 일부 (C-contiguous, 리틀엔디언). CUBE_SHARED면 큐브가 memmap이라 필요한 페이지만 읽힌다.
+    보정은 dark/flat을 같은 (y, x) 인덱스로 잘라 적용 (spectrum/preview와 같은 값).
+    """
+    cube = get_meta(file_id)["cube"]
+    if cube is None:
+        raise ValueError("No cube loaded")
+    sub = cube[index]
+    if apply_correction:
+        sub = _apply_dark_flat(get_meta(file_id), np.asarray(sub, dtype=np.float32), index[-2:], index)
+    return np.ascontiguousarray(sub, dtype=np.dtype(dtype).newbyteorder("<"))
@@ -0,0 +1,96 @@
+# src/services/pipeline.py
+"""
+선언형 처리 파이프라인 + 중간 결과 메모이제이션.
+
+  Pipeline(source_key, source_fn, [
+      Stage("slice_z", fn, {"z": 10}, cache=False),
+      Stage("dark_flat", fn, {"calib": "..."}),
+      Stage("stretch", fn, {"percent_clip": 1.0}),
+      Stage("encode", fn, {"max_wh": 1024}),
+  ]).run()
+
+- 각 단계의 키 = sha1(이전 단계 키 + 단계 이름 + 파라미터) → 입력 내용과 파라미터가 같으면 같은 키
+- 실행 시 뒤에서부터 캐시된 가장 깊은 단계를 찾아, 그 다음 단계부터만 계산
+  (예: stretch 파라미터만 바뀌면 보정/곡률 결과는 재사용)
+- 결과는 공유 ByteLRU(PIPELINE_CACHE_MB, 기본 512MB) 하나에 저장
+  단, 입력과 메모리를 공유하는 결과(보정할 것이 없어 입력을 그대로 돌려준 경우, 전치 뷰 등)는
+  저장하지 않는다 — 큐브의 뷰를 캐시하면 view.nbytes로만 잡히면서 큐브 전체가 붙잡히고,
+  다시 만드는 비용도 없다
+- 실제로 계산된 단계만 metrics.STAGE_SECONDS{stage=이름}에 기록 (캐시 적중은 cache_* 지표)
+"""
+from __future__ import annotations
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.utils.cache import ByteLRU
+from src.utils.lazy import lazy_module
+from src.utils.metrics import STAGE_SECONDS, timed
+
+np = lazy_module("numpy")
+
+MEMO = ByteLRU(int(os.getenv("PIPELINE_CACHE_MB", "512")) * 1024 * 1024, name="pipeline")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[..., Any]                    # fn(value, **params) -> value
+    params: Dict[str, Any] = field(default_factory=dict)
+    cache: bool = True                        # 뷰 만들기처럼 싼 단계는 False
+
+
+def _key(parent: str, stage: Stage) -> str:
+    h = hashlib.sha1(parent.encode())
+    h.update(stage.name.encode())
+    h.update(repr(sorted(stage.params.items())).encode())
+    return h.hexdigest()
+
+
+def _is_view_of(value: Any, prev: Any) -> bool:
+    if value is prev:
+        return True
+    if not (hasattr(value, "flags") and hasattr(prev, "flags")):
+        return False
+    return bool(np.may_share_memory(value, prev))
+
+
+class Pipeline:
+    def __init__(self, source_key: str, source: Callable[[], Any], stages: Sequence[Stage],
+                 memo: Optional[ByteLRU] = None):
+        self.source = source
+        self.stages = list(stages)
+        self.memo = MEMO if memo is None else memo
+        self.keys: List[str] = []
+        k = hashlib.sha1(source_key.encode()).hexdigest()
+        for st in self.stages:
+            k = _key(k, st)
+            self.keys.append(k)
+
+    def run(self) -> Any:
+        # 1) 뒤에서부터 캐시된 가장 깊은 단계 찾기
+        start, value = 0, None
+        miss = object()
+        for i in range(len(self.stages) - 1, -1, -1):
+            if not self.stages[i].cache:
+                continue
+            hit = self.memo.get(self.keys[i], miss, record=False)
+            if hit is not miss:
+                start, value = i + 1, hit
+                break
+        self.memo.record(start > 0)  # 실행 1번당 적중/실패 1번
+        if start == 0:
+            value = self.source()
+
+        # 2) 나머지 단계 계산 + 캐시
+        for i in range(start, len(self.stages)):
+            st = self.stages[i]
+            prev = value
+            with timed(STAGE_SECONDS, stage=st.name):
+                value = st.fn(value, **st.params)
+            if st.cache and not _is_view_of(value, prev):
+                if hasattr(value, "flags"):
+                    value.flags.writeable = False  # 캐시된 배열은 공유되므로 읽기 전용
+                self.memo.put(self.keys[i], value)
+        return value
@@ -0,0 +1,200 @@
+# src/services/prefetch.py
+"""
+슬라이더 스크러빙용 이웃 프리페치 (z 프리뷰 / x 슬릿).
+
+  note(track, pos, n, key=..., render=...)   # 요청 하나 처리할 때마다 호출
+
+- track(예: ("preview", file_id, clip, corr))마다 마지막 위치와 진행 방향을 기억
+- 한 칸씩(±PREFETCH_JUMP 이내) 움직이면 진행 방향으로 PREFETCH_DEPTH칸, 반대쪽으로 1칸을
+  작업 스레드에서 미리 렌더 → 결과는 pipeline.MEMO에 남아 다음 요청이 캐시 적중
+- 멀리 점프하거나 방향을 바꾸면 세대(gen)를 올려 아직 시작 안 한 작업은 버린다
+- 동시 렌더는 PREFETCH_WORKERS개, 대기 작업도 그 몇 배까지만 (넘치면 버림)
+- 요청이 마침 렌더 중인 키를 원하면 wait()로 그 결과를 기다려 중복 계산을 피한다
+- batch(positions)를 주면 예약한 이웃 전체를 작업 하나로 묶어, 공통 중간 결과를 batch로
+  한 번에 채운 뒤 차례로 렌더한다 (slit: 곡률 보정을 make_circle_batch로 일괄)
+
+한계: 위치 추적과 결과(pipeline.MEMO)가 모두 프로세스 안에만 있다. run.py처럼 한 프로세스가
+모든 요청을 받을 때만 효과가 있고, gunicorn -w N 처럼 요청이 워커 사이로 흩어지면
+다음 요청은 대개 프리페치하지 않은 워커로 가서 CPU만 더 쓴다 → wsgi.py는 기본으로 끈다
+(PREFETCH_WORKERS=0). 워커 1개(-w 1 --threads N)나 세션 고정 라우팅일 때만 켜는 것을 권장.
+
+.env 예시:
+  PREFETCH_WORKERS=2   # 0이면 끔 (wsgi.py 기본값은 0)
+  PREFETCH_DEPTH=3
+  PREFETCH_JUMP=8
+"""
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+from src.services.pipeline import MEMO
+from src.utils import metrics
+
+_LOCK = threading.Lock()
+_TRACKS: "OrderedDict[Hashable, dict]" = OrderedDict()   # track -> {"pos", "dir", "gen"}
+_TRACKS_MAX = 32
+_INFLIGHT: Dict[str, Optional[Future]] = {}              # 캐시 키 -> 대기/실행 중 작업 (None: 제출 직전)
+_STATS = {"submitted": 0, "rendered": 0, "cancelled": 0, "cached": 0, "dropped": 0, "failed": 0}
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _workers() -> int:
+    return int(os.getenv("PREFETCH_WORKERS", "2"))
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=max(1, _workers()), thread_name_prefix="prefetch")
+    return _EXECUTOR
+
+
+def _targets(pos: int, direction: int, n: int, depth: int) -> list:
+    if direction == 0:
+        cand = [pos + 1, pos - 1]
+    else:
+        cand = [pos + direction * i for i in range(1, depth + 1)] + [pos - direction]
+    return [t for t in cand if 0 <= t < n]
+
+
+def _count(name: str) -> None:
+    with _LOCK:
+        _STATS[name] += 1
+
+
+def _run(track: Hashable, gen: int, key: str, render: Callable[[int], object], pos: int) -> None:
+    try:
+        with _LOCK:
+            stale = _TRACKS.get(track, {}).get("gen") != gen
+        if stale:
+            _count("cancelled")
+            return
+        if key in MEMO:
+            _count("cached")
+            return
+        render(pos)
+        _count("rendered")
+    except Exception:
+        _count("failed")   # 파일이 바뀌었거나 지워진 경우 등 → 조용히 무시
+    finally:
+        with _LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+def _run_batch(track: Hashable, gen: int, todo: list, render: Callable[[int], object],
+               batch: Callable[[list], object]) -> None:
+    try:
+        with _LOCK:
+            stale = _TRACKS.get(track, {}).get("gen") != gen
+            if stale:
+                _STATS["cancelled"] += len(todo)
+                return
+        pending = [p for p, k in todo if k not in MEMO]
+        with _LOCK:
+            _STATS["cached"] += len(todo) - len(pending)
+        if pending:
+            batch(pending)
+        for p in pending:
+            try:
+                render(p)
+                _count("rendered")
+            except Exception:
+                _count("failed")
+    except Exception:
+        _count("failed")   # batch 실패 → 이번 묶음은 포기 (요청이 오면 그때 렌더)
+    finally:
+        with _LOCK:
+            for _, k in todo:
+                _INFLIGHT.pop(k, None)
+
+
+def note(track: Hashable, pos: int, n: int, *, key: Callable[[int], str], render: Callable[[int], object],
+         batch: Optional[Callable[[list], object]] = None) -> None:
+    """
+    pos를 방금 요청받았다고 기록하고 이웃을 예약.
+    key(p): 렌더 없이 p의 캐시 키, render(p): p를 렌더(결과가 MEMO에 남아야 함)
+    batch(ps): 있으면 이웃 ps 전체에 공통인 중간 결과를 한 번에 계산 (그 뒤 render(p)를 차례로)
+    """
+    workers = _workers()
+    if workers <= 0:
+        return
+    depth = int(os.getenv("PREFETCH_DEPTH", "3"))
+    jump = int(os.getenv("PREFETCH_JUMP", "8"))
+    with _LOCK:
+        st = _TRACKS.pop(track, None)
+        fresh = st is None
+        if fresh:
+            st = {"pos": pos, "dir": 0, "gen": 0}
+        _TRACKS[track] = st
+        while len(_TRACKS) > _TRACKS_MAX:
+            _TRACKS.popitem(last=False)
+        step = pos - st["pos"]
+        if step == 0 and not fresh:
+            return                  # 같은 위치 재요청 (JSON + 이미지 등) → 이미 예약됨
+        if abs(step) > jump:
+            direction = 0
+            st["gen"] += 1          # 점프 → 예약돼 있던 이웃은 쓸모없음
+        else:
+            direction = (step > 0) - (step < 0)
+            if st["dir"] and direction != st["dir"]:
+                st["gen"] += 1      # 방향 전환도 마찬가지
+        st["pos"], st["dir"] = pos, direction
+        gen = st["gen"]
+
+    todo = []
+    for t in _targets(pos, direction, n, depth):
+        k = key(t)
+        with _LOCK:
+            if k in _INFLIGHT:
+                continue
+            if len(_INFLIGHT) >= workers * (depth + 1) * 2:
+                _STATS["dropped"] += 1   # _LOCK 안이라 _count 대신 직접
+                continue
+            if k in MEMO:
+                continue
+            if batch is None:
+                _INFLIGHT[k] = _executor().submit(_run, track, gen, k, render, t)
+            else:
+                _INFLIGHT[k] = None   # 아래에서 묶음 작업 하나로 제출
+                todo.append((t, k))
+            _STATS["submitted"] += 1
+    if todo:
+        with _LOCK:   # 작업의 finally도 _LOCK을 잡으므로 자리표시를 채우기 전에 끝나지 않는다
+            fut = _executor().submit(_run_batch, track, gen, todo, render, batch)
+            for _, k in todo:
+                _INFLIGHT[k] = fut
+
+
+def wait(key: str, timeout: float = 5.0) -> None:
+    """key를 프리페치가 렌더 중이면 끝날 때까지 기다린다 (아직 대기 중이면 취소하고 바로 반환)"""
+    with _LOCK:
+        fut = _INFLIGHT.get(key)
+    if fut is None:
+        return
+    if fut.cancel():
+        with _LOCK:   # 묶음 작업이면 같은 작업을 가리키는 다른 키도 함께 정리
+            for k in [k for k, f in _INFLIGHT.items() if f is fut]:
+                _INFLIGHT.pop(k, None)
+        return
+    try:
+        fut.result(timeout=timeout)
+    except Exception:
+        pass
+
+
+def stats() -> dict:
+    with _LOCK:
+        return dict(_STATS, inflight=len(_INFLIGHT), tracks=len(_TRACKS))
+
+
+@metrics.register_collector
+def _prefetch_families() -> list:
+    st = stats()
+    return [
+        ("prefetch_tasks_total", "counter", "Neighbour prefetch tasks by outcome",
+         [({"outcome": k}, st[k]) for k in ("submitted", "rendered", "cancelled", "cached", "dropped", "failed")]),
+        ("prefetch_inflight", "gauge", "Prefetch tasks queued or running", [({}, st["inflight"])]),
+    ]
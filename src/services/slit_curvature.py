@@ -0,0 +1,106 @@
+# src/services/slit_curvature.py
+"""
+Slit 곡률 보정 (cv2.warpPolar 선형 모드와 같은 기하)을 좌표 맵 캐시로 수행.
+
+warpPolar는 호출마다 (h, w) 전체 극좌표 변환표를 다시 계산하지만,
+표는 이미지 크기/중심(기기마다 고정)에만 의존한다.
+→ geometry key별로 한 번 만들어 두고 remap만 반복한다.
+  - cv2가 있으면 cv2.remap (정수 맵으로 변환해 둠)
+  - 없으면 NumPy gather (평탄 인덱스 + 유효 마스크를 미리 계산)
+보간은 make_circle과 같은 최근접(nearest): flags=WARP_FILL_OUTLIERS+WARP_POLAR_LINEAR 에는
+보간 비트가 없어서 warpPolar가 INTER_NEAREST로 동작한다.
+warpPolar처럼 회전(angle)은 없다 (make_circle의 angle 인자도 warpPolar에 전달되지 않음).
+"""
+from __future__ import annotations
+import math
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+cv2 = lazy_module("cv2", optional=True)  # 선택 의존성: 없으면 NumPy 경로
+
+_MAPS: "OrderedDict[tuple, dict]" = OrderedDict()
+_MAPS_MAX = 32
+_LOCK = threading.Lock()
+
+
+def _geometry(shape: Tuple[int, int], center: Optional[Tuple[float, float]]):
+    h, w = int(shape[0]), int(shape[1])
+    if center is None:
+        center = (w / 2, h / 2)
+    cx, cy = float(center[0]), float(center[1])
+    # 반경: 이미지 경계 안쪽으로 (challan_postprocessing.make_circle과 동일)
+    radius = min(cx, cy, w - cx, h - cy)
+    return (h, w, cx, cy, float(radius))
+
+
+def _build_maps(key: tuple) -> dict:
+    h, w, cx, cy, radius = key
+    # warpPolar(WARP_POLAR_LINEAR): 열 = 반경, 행 = 각도
+    rho = np.arange(w, dtype=np.float64) * (radius / w)
+    phi = np.arange(h, dtype=np.float64) * (2.0 * math.pi / h)
+    map_x = (rho[None, :] * np.cos(phi)[:, None] + cx).astype(np.float32)
+    map_y = (rho[None, :] * np.sin(phi)[:, None] + cy).astype(np.float32)
+
+    maps: dict = {"shape": (h, w)}
+    if cv2:
+        maps["cv"] = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2, nninterpolation=True)
+        return maps
+
+    # NumPy 경로: 최근접 픽셀의 평탄 인덱스, 바깥은 0 (FILL_OUTLIERS)
+    xi = np.rint(map_x).astype(np.int64)
+    yi = np.rint(map_y).astype(np.int64)
+    inside = (yi >= 0) & (yi < h) & (xi >= 0) & (xi < w)
+    maps["idx"] = np.where(inside, yi * w + xi, 0).ravel()
+    maps["mask"] = inside.ravel()
+    return maps
+
+
+def polar_maps(shape: Tuple[int, int], center: Optional[Tuple[float, float]] = None) -> dict:
+    key = _geometry(shape, center)
+    with _LOCK:
+        hit = _MAPS.get(key)
+        if hit is not None:
+            _MAPS.move_to_end(key)
+            return hit
+    maps = _build_maps(key)
+    with _LOCK:
+        _MAPS[key] = maps
+        while len(_MAPS) > _MAPS_MAX:
+            _MAPS.popitem(last=False)
+    return maps
+
+
+def _remap(img: np.ndarray, maps: dict) -> np.ndarray:
+    if "cv" in maps:
+        m1, m2 = maps["cv"]
+        return cv2.remap(img, m1, m2, cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+    flat = np.ascontiguousarray(img, dtype=np.float32).reshape(-1)
+    out = np.where(maps["mask"], flat[maps["idx"]], np.float32(0))
+    return out.reshape(maps["shape"])
+
+
+def make_circle(img: np.ndarray, center: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """곡률 있는 slit 이미지 (h, w)를 원형 좌표계로 펴준다. 같은 기하면 맵 재사용."""
+    img = np.asarray(img, dtype=np.float32)
+    return _remap(img, polar_maps(img.shape[:2], center))
+
+
+
+def make_circle_batch(stack: np.ndarray, center: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """
+    여러 x 위치의 slit (N, h, w)을 한 번에 보정. 맵은 한 번만 조회하고,
+    NumPy 경로에서는 N장 전체를 gather 한 번으로 처리한다.
+    """
+    stack = np.asarray(stack, dtype=np.float32)
+    if stack.ndim != 3:
+        raise ValueError("(N, h, w) stack required")
+    maps = polar_maps(stack.shape[1:], center)
+    if "cv" in maps:
+        return np.stack([_remap(s, maps) for s in stack])
+    flat = np.ascontiguousarray(stack).reshape(stack.shape[0], -1)
+    out = np.where(maps["mask"], flat[:, maps["idx"]], np.float32(0))
+    return out.reshape(stack.shape)
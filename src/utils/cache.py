@@ -0,0 +1,118 @@
+# src/utils/cache.py
+from __future__ import annotations
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+_ALL: "weakref.WeakSet[ByteLRU]" = weakref.WeakSet()   # /metrics 수집용
+
+
+def sizeof(value: Any) -> int:
+    """캐시 예산 계산용 크기(바이트). ndarray/bytes는 실제 버퍼 크기, tuple/list는 합."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ByteLRU:
+    """
+    바이트 예산(max_bytes) 기반 LRU 캐시. 스레드 안전.
+    - 값 하나가 예산보다 크면 저장하지 않고 그대로 돌려준다
+    - hits/misses를 세어 적중률을 볼 수 있다
+    """
+
+    def __init__(self, max_bytes: int, name: str = "cache"):
+        self.name = name
+        self.max_bytes = int(max_bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        _ALL.add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def get(self, key: Hashable, default: Any = None, *, record: bool = True) -> Any:
+        """record=False면 적중/실패 통계에 넣지 않는다 (여러 키를 탐색만 할 때)."""
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                if record:
+                    self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            if record:
+                self.hits += 1
+            return hit[0]
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None) -> Any:
+        n = sizeof(value) if nbytes is None else int(nbytes)
+        if n > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, n)
+            self.bytes += n
+            while self.bytes > self.max_bytes and self._data:
+                _, (_, m) = self._data.popitem(last=False)
+                self.bytes -= m
+        return value
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """없으면 compute()로 만들어 넣는다. compute는 락 밖에서 실행된다."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        return self.put(key, compute())
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "items": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+            }
+
+
+def all_caches() -> List[ByteLRU]:
+    """살아 있는 ByteLRU 전부 (이름순)"""
+    return sorted(list(_ALL), key=lambda c: c.name)
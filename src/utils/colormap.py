@@ -0,0 +1,101 @@
+# src/utils/colormap.py
+"""
+프리뷰/슬릿 PNG용 컬러맵과 강도 스트레치.
+
+  t = stretch(norm01, "asinh")        # [0, 1] float32 → [0, 1] (제자리 연산)
+  im.putpalette(palette("viridis"))   # "L" 이미지 → "P" 팔레트 이미지
+
+- 컬러맵은 256×3 uint8 LUT를 이름별로 한 번만 만들어 둔다 (앵커 색 선형 보간).
+  PNG는 8비트 인덱스 + 팔레트(768바이트)로 저장되므로 회색조와 인코딩 비용/크기가 같다.
+  RGB 배열이 필요하면 to_rgb(u8, name) = LUT.take(u8) 한 번.
+- 이름 뒤에 "_r"을 붙이면 뒤집은 맵. 내장 표에 없는 이름은 matplotlib이 있으면 거기서 LUT만 뽑는다.
+- 스트레치(ds9 관례): linear, sqrt, log(a=1000), asinh(β=0.1) — 모두 벡터 연산 한 번.
+"""
+from __future__ import annotations
+from typing import Dict
+
+from src.utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+
+# matplotlib 표를 균등 간격 9점으로 샘플한 앵커 (hot은 구간별 선형이라 꺾이는 점만)
+_ANCHORS: Dict[str, list] = {
+    "gray":    ["#000000", "#ffffff"],
+    "viridis": ["#440154", "#472d7b", "#3b528b", "#2c728e", "#21918c", "#28ae80", "#5ec962", "#addc30", "#fde725"],
+    "inferno": ["#000004", "#1f0c48", "#550f6d", "#88226a", "#ba3655", "#e35933", "#f98e09", "#f9cb35", "#fcffa4"],
+    "magma":   ["#000004", "#1c1044", "#4f127b", "#812581", "#b5367a", "#e55064", "#fb8761", "#fec287", "#fcfdbf"],
+    "plasma":  ["#0d0887", "#4c02a1", "#7e03a8", "#a92395", "#cc4778", "#e56b5d", "#f89441", "#fdc328", "#f0f921"],
+    "hot":     [(0.0, "#0b0000"), (0.365, "#ff0000"), (0.746, "#ffff00"), (1.0, "#ffffff")],
+}
+STRETCHES = ("linear", "sqrt", "log", "asinh")
+DEFAULT_CMAP = "gray"
+DEFAULT_STRETCH = "linear"
+
+_LUTS: Dict[str, "np.ndarray"] = {}
+_LOG_A = 1000.0
+_ASINH_BETA = 0.1
+
+
+def _from_anchors(anchors: list) -> np.ndarray:
+    if isinstance(anchors[0], str):
+        anchors = [(i / (len(anchors) - 1), c) for i, c in enumerate(anchors)]
+    pos = np.array([p for p, _ in anchors])
+    rgb = np.array([[int(c[i:i + 2], 16) for i in (1, 3, 5)] for _, c in anchors], dtype=np.float64)
+    t = np.linspace(0.0, 1.0, 256)
+    return np.stack([np.interp(t, pos, rgb[:, k]) for k in range(3)], axis=1).round().astype(np.uint8)
+
+
+def _from_matplotlib(name: str) -> np.ndarray:
+    try:
+        import matplotlib
+        cm = matplotlib.colormaps[name]
+    except (ImportError, KeyError):
+        raise ValueError(f"알 수 없는 컬러맵: {name}")
+    return (cm(np.linspace(0.0, 1.0, 256))[:, :3] * 255.0).round().astype(np.uint8)
+
+
+def lut(name: str) -> np.ndarray:
+    """이름 → (256, 3) uint8. 알 수 없으면 ValueError"""
+    name = (name or DEFAULT_CMAP).lower()
+    table = _LUTS.get(name)
+    if table is None:
+        base = name[:-2] if name.endswith("_r") else name
+        table = _from_anchors(_ANCHORS[base]) if base in _ANCHORS else _from_matplotlib(base)
+        if base != name:
+            table = table[::-1].copy()
+        table.setflags(write=False)
+        _LUTS[name] = table
+    return table
+
+
+def palette(name: str) -> bytes:
+    """PIL putpalette용 768바이트"""
+    return lut(name).tobytes()
+
+
+def to_rgb(u8: np.ndarray, name: str) -> np.ndarray:
+    return lut(name).take(u8, axis=0)
+
+
+def check(cmap: str, stretch_name: str) -> None:
+    """요청 파라미터 검증 (렌더 전에 400으로 돌려주기 위함)"""
+    lut(cmap)
+    if stretch_name not in STRETCHES:
+        raise ValueError(f"알 수 없는 스트레치: {stretch_name} (가능: {', '.join(STRETCHES)})")
+
+
+def stretch(t: np.ndarray, name: str) -> np.ndarray:
+    """[0, 1]로 정규화된 float 배열에 스트레치를 제자리로 적용"""
+    if name == "sqrt":
+        np.sqrt(t, out=t)
+    elif name == "log":
+        t *= _LOG_A
+        np.log1p(t, out=t)
+        t *= 1.0 / np.log1p(_LOG_A)
+    elif name == "asinh":
+        t *= 1.0 / _ASINH_BETA
+        np.arcsinh(t, out=t)
+        t *= 1.0 / np.arcsinh(1.0 / _ASINH_BETA)
+    elif name != "linear":
+        raise ValueError(f"알 수 없는 스트레치: {name}")
+    return t
@@ -0,0 +1,61 @@
+# src/utils/downsample.py
+"""
+스펙트럼 응답용 LOD(level of detail) 다운샘플.
+
+  x, y, lod = reduce_series(lam, flux, max_points=1200, x_min=6560, x_max=6566)
+
+- x_min/x_max: 그 파장(또는 픽셀) 구간만 잘라 낸다 (확대한 구간을 원본 해상도로 받기)
+- max_points: 남은 샘플이 더 많으면 버킷별 최솟값/최댓값 두 점만 남긴다 (min/max 다운샘플)
+  → 흡수선/방출선 같은 좁은 극값이 평균에 묻히지 않고 그대로 보인다
+  버킷 나누기/argmin/argmax 모두 reshape 한 번으로 벡터화 (파이썬 루프 없음)
+max_points는 4 이상으로 취급 (양 끝 + 버킷 하나의 min/max).
+lod = {"total": 원본 수, "window": 구간 안 수, "returned": 돌려준 수, "downsampled": bool}
+"""
+from __future__ import annotations
+from typing import Optional, Tuple
+
+from src.utils.lazy import lazy_module
+
+np = lazy_module("numpy")
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """y를 max_points//2 버킷으로 나눠 각 버킷의 argmin/argmax 인덱스 (정렬, 양 끝점 포함)"""
+    n = y.size
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max(1, (int(max_points) - 2) // 2)
+    k = -(-n // buckets)                                  # 버킷 크기(올림)
+    pad = buckets * k - n
+    v = np.asarray(y, dtype=np.float64)
+    lo = np.pad(np.where(np.isnan(v), np.inf, v), (0, pad), mode="edge").reshape(buckets, k)
+    hi = np.pad(np.where(np.isnan(v), -np.inf, v), (0, pad), mode="edge").reshape(buckets, k)
+    base = np.arange(buckets) * k
+    idx = np.concatenate(([0, n - 1], base + lo.argmin(axis=1), base + hi.argmax(axis=1)))
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def reduce_series(
+    x, y, *, max_points: Optional[int] = None,
+    x_min: Optional[float] = None, x_max: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray, dict]:
+    x = np.asarray(x)
+    y = np.asarray(y)
+    total = int(y.size)
+    if x_min is not None or x_max is not None:
+        keep = np.ones(total, dtype=bool)
+        if x_min is not None:
+            keep &= x >= x_min
+        if x_max is not None:
+            keep &= x <= x_max
+        x, y = x[keep], y[keep]
+    in_window = int(y.size)
+    if max_points and in_window > max_points:
+        idx = minmax_indices(y, max(4, int(max_points)))
+        x, y = x[idx], y[idx]
+    return x, y, {
+        "total": total,
+        "window": in_window,
+        "returned": int(y.size),
+        "downsampled": int(y.size) < in_window,
+    }
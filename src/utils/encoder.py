@@ -0,0 +1,102 @@
+# src/utils/encoder.py
+"""
+프리뷰/슬릿 이미지 인코더 (PNG / WebP) + 용도별 설정 + Accept 협상.
+
+  fmt = negotiate(request.accept_mimetypes, request.args.get("format"))   # "png" | "webp"
+  data = encode(im, fmt, "interactive")
+
+프로필 (python -m benchmarks.bench_encode, 1024² 태양/분광 프레임 결과로 고른 값):
+  interactive  슬라이더 스크러빙 등 매 요청 렌더 → 인코딩 시간 우선
+               PNG: 회색조 zlib level 1 + Z_RLE (Pillow 기본 대비 ~4배 빠르고 더 작음),
+                    팔레트(컬러맵)는 level 1 기본 전략 (팔레트 이미지엔 RLE가 오히려 큼)
+               WebP: 손실 quality 90, method 0 (화면 표시용 — 정확한 값은 /fits/raw, /fits/cube)
+  archive      한 번 만들고 오래 캐시/보관 → 크기 우선, 무손실
+               PNG: 회색조 Z_RLE(level 9 기본 전략보다 작고 수십 배 빠름), 팔레트 level 9
+               WebP: 무손실 method 4 (method 6은 한 장에 수십 초라 제외)
+  thumbnail    목록/미리보기용 → 크기 우선, 손실 허용
+               PNG: archive와 같음, WebP: 손실 quality 80, method 4
+PNG 행 필터는 Pillow가 고르므로(지정 불가) 조절 가능한 것은 zlib level/전략(compress_type)이다.
+
+협상: ?format=png|webp 가 있으면 그대로, 없으면 Accept에 image/webp가 명시돼 있을 때만 WebP
+("*/*"만 보내는 fetch/XHR에는 PNG). IMAGE_FORMATS=png 로 WebP를 끌 수 있고,
+Pillow가 WebP 없이 빌드됐으면 자동으로 PNG만.
+"""
+from __future__ import annotations
+import os
+import zlib
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+FORMATS: Dict[str, str] = {"png": "image/png", "webp": "image/webp"}
+DEFAULT_FORMAT = "png"
+DEFAULT_PROFILE = "interactive"
+
+# "형식:모드" 키가 있으면 그 PIL 모드(L/P)에만 적용, 없으면 "형식" 키
+PROFILES: Dict[str, Dict[str, dict]] = {
+    "interactive": {
+        "png": {"compress_level": 1, "compress_type": zlib.Z_RLE},
+        "png:P": {"compress_level": 1},
+        "webp": {"lossless": False, "quality": 90, "method": 0},
+    },
+    "archive": {
+        "png": {"compress_level": 9, "compress_type": zlib.Z_RLE},
+        "png:P": {"compress_level": 9},
+        "webp": {"lossless": True, "quality": 50, "method": 4},
+    },
+    "thumbnail": {
+        "png": {"compress_level": 9, "compress_type": zlib.Z_RLE},
+        "png:P": {"compress_level": 9},
+        "webp": {"lossless": False, "quality": 80, "method": 4},
+    },
+}
+
+_WEBP: Optional[bool] = None
+
+
+def _webp_ok() -> bool:
+    global _WEBP
+    if _WEBP is None:
+        try:
+            from PIL import features
+            _WEBP = bool(features.check("webp"))
+        except Exception:
+            _WEBP = False
+    return _WEBP
+
+
+def enabled_formats() -> Tuple[str, ...]:
+    raw = os.getenv("IMAGE_FORMATS", "png,webp")
+    names = [f.strip().lower() for f in raw.split(",") if f.strip().lower() in FORMATS]
+    return tuple(f for f in names if f != "webp" or _webp_ok()) or (DEFAULT_FORMAT,)
+
+
+def check(fmt: str, profile: str) -> None:
+    if fmt not in enabled_formats():
+        raise ValueError(f"지원하지 않는 이미지 형식: {fmt} (가능: {', '.join(enabled_formats())})")
+    if profile not in PROFILES:
+        raise ValueError(f"알 수 없는 인코더 프로필: {profile} (가능: {', '.join(PROFILES)})")
+
+
+def negotiate(accept=None, explicit: Optional[str] = None) -> str:
+    """
+    accept: werkzeug MIMEAccept(request.accept_mimetypes) 또는 None, explicit: ?format= 값.
+    explicit가 지원 목록에 없으면 ValueError.
+    """
+    if explicit:
+        fmt = explicit.lower()
+        check(fmt, DEFAULT_PROFILE)
+        return fmt
+    if accept is not None and "webp" in enabled_formats():
+        # "*/*"도 image/webp와 맞지만 명시한 클라이언트(<img> 요청)에만 준다
+        if any(v.lower() == "image/webp" and q > 0 for v, q in accept):
+            return "webp"
+    return DEFAULT_FORMAT
+
+
+def encode(im, fmt: str = DEFAULT_FORMAT, profile: str = DEFAULT_PROFILE) -> bytes:
+    """PIL 이미지 → 바이트. WebP는 "L"/"P"를 RGB로 펼쳐 저장한다 (Pillow가 변환)"""
+    check(fmt, profile)
+    prof = PROFILES[profile]
+    buf = BytesIO()
+    im.save(buf, format=fmt.upper(), **prof.get(f"{fmt}:{im.mode}", prof[fmt]))
+    return buf.getvalue()
@@ -0,0 +1,80 @@
+# src/utils/lazy.py
+"""
+무거운 모듈(numpy, astropy, PIL, cv2 ...)을 처음 쓸 때 import 하는 얇은 접근자.
+
+  np = lazy_module("numpy")
+  fits = lazy_module("astropy.io.fits")
+
+  def f():
+      return np.zeros(3)   # 여기서 처음 numpy를 import
+
+- 첫 속성 접근 때 실제 모듈을 import 하고, 선언한 모듈의 전역 이름을 실제 모듈로 바꿔 끼운다
+  → 이후 호출은 프록시를 거치지 않는다 (일반 import와 같은 비용)
+- optional=True면 import 실패 시 None처럼 동작 (bool(proxy) == False)
+"""
+from __future__ import annotations
+import importlib
+import sys
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+_LOCK = threading.Lock()
+
+
+class LazyModule:
+    __slots__ = ("_name", "_optional", "_namespace", "_module", "_failed")
+
+    def __init__(self, name: str, namespace: Optional[dict] = None, optional: bool = False):
+        self._name = name
+        self._optional = optional
+        self._namespace = namespace
+        self._module: Optional[ModuleType] = None
+        self._failed = False
+
+    # 메서드/속성 이름은 감싼 모듈의 속성(np.load 등)과 겹치지 않도록 _lazy_ 접두사
+    def _lazy_load(self) -> Optional[ModuleType]:
+        """실제 모듈 (optional이고 없으면 None)"""
+        if self._module is not None or self._failed:
+            return self._module
+        with _LOCK:
+            if self._module is None and not self._failed:
+                try:
+                    self._module = importlib.import_module(self._name)
+                except Exception:
+                    if not self._optional:
+                        raise
+                    self._failed = True
+                    return None
+                self._lazy_rebind()
+        return self._module
+
+    def _lazy_rebind(self) -> None:
+        # 선언한 모듈의 전역에서 이 프록시를 가리키는 이름을 실제 모듈로 교체
+        ns = self._namespace
+        if ns is None:
+            return
+        for k, v in list(ns.items()):
+            if v is self:
+                ns[k] = self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        mod = self._lazy_load()
+        if mod is None:
+            raise AttributeError(f"optional module {self._name!r} is not available")
+        return getattr(mod, attr)
+
+    def __bool__(self) -> bool:
+        return self._lazy_load() is not None
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else ("missing" if self._failed else "lazy")
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_module(name: str, *, optional: bool = False) -> Any:
+    """이미 import 되어 있으면 실제 모듈을, 아니면 LazyModule 프록시를 돌려준다."""
+    mod = sys.modules.get(name)
+    if mod is not None:
+        return mod
+    return LazyModule(name, sys._getframe(1).f_globals, optional=optional)
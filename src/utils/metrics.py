@@ -0,0 +1,229 @@
+# src/utils/metrics.py
+"""
+가벼운 계측(latency 히스토그램 + 수집기) → Prometheus 텍스트 형식.
+
+  from src.utils import metrics
+  with metrics.timed(metrics.STAGE_SECONDS, stage="png_encode"):
+      ...
+  metrics.render()   # /metrics 본문
+
+- 외부 의존성 없음 (prometheus_client 없이 텍스트 포맷만 직접 생성)
+- observe 한 번 = bisect + 락 안에서 정수 2개 증가 → 측정 한 번에 수 µs (처리 단계는 ms 단위)
+- 캐시 적중률/레지스트리 메모리처럼 "지금 값"은 render 때 collector 콜백으로 읽는다
+- 값은 프로세스별. gunicorn 여러 워커면 워커마다 따로 집계된다
+"""
+from __future__ import annotations
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# 0.5ms ~ 10s: 캐시 적중부터 큰 큐브 첫 로드(수 초)까지
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(float(b) for b in buckets)
+        # labels -> [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple([str(labels.get(k, "")) for k in self.labelnames])
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[i] += 1
+            self._sums[key] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        for key, counts, total in sorted(items):
+            base = _labels(self.labelnames, key)
+            acc = 0
+            for le, n in zip(self.buckets, counts):
+                acc += n
+                yield f'{self.name}_bucket{_labels(self.labelnames + ("le",), key + (_num(le),))} {acc}'
+            acc += counts[-1]
+            yield f'{self.name}_bucket{_labels(self.labelnames + ("le",), key + ("+Inf",))} {acc}'
+            yield f"{self.name}_sum{base} {_num(total)}"
+            yield f"{self.name}_count{base} {acc}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram", *self.samples()]
+
+
+def _num(v: float) -> str:
+    v = float(v)
+    if v != v:
+        return "NaN"
+    if v in (float("inf"), float("-inf")):
+        return "+Inf" if v > 0 else "-Inf"
+    return str(int(v)) if v.is_integer() and abs(v) < 1e15 else repr(v)
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+# ── 등록부 ──────────────────────────────────────────────────────────────────
+_HISTOGRAMS: List[Histogram] = []
+# collector: () -> [(metric 이름, 타입, help, [(labels dict, 값), ...]), ...]
+_COLLECTORS: List[Callable[[], list]] = []
+
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    h = Histogram(name, help, labelnames, buckets)
+    _HISTOGRAMS.append(h)
+    return h
+
+
+def register_collector(fn: Callable[[], list]) -> Callable[[], list]:
+    """render 때마다 호출되는 수집기 등록 (데코레이터로도 사용)"""
+    _COLLECTORS.append(fn)
+    return fn
+
+
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "HTTP request latency by endpoint", ("endpoint", "method", "status"))
+STAGE_SECONDS = histogram(
+    "pipeline_stage_duration_seconds", "Processing stage latency (fits_open, dark_flat, percentile, resize, png_encode, ...)",
+    ("stage",))
+SQL_SECONDS = histogram(
+    "sql_query_duration_seconds", "SQL statement latency by verb", ("verb",))
+
+
+class timed:
+    """with timed(HIST, stage="..."): ...  (@contextmanager보다 호출 비용이 작은 클래스 구현)"""
+    __slots__ = ("hist", "labels", "t0")
+
+    def __init__(self, hist: Histogram, **labels):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0, **self.labels)
+        return False
+
+
+def render() -> str:
+    lines: List[str] = []
+    for h in _HISTOGRAMS:
+        lines += h.render()
+    for fn in _COLLECTORS:
+        try:
+            families = fn()
+        except Exception as e:  # 수집기 하나가 깨져도 나머지는 내보낸다
+            print(f"[metrics collector failed] {getattr(fn, '__name__', fn)}: {type(e).__name__}: {e}")
+            continue
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                names = tuple(labels)
+                lines.append(f"{name}{_labels(names, tuple(str(labels[n]) for n in names))} {_num(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ── SQL (SQLAlchemy 이벤트) ────────────────────────────────────────────────────
+_SQL_HOOKED = False
+
+
+def instrument_sqlalchemy() -> None:
+    """모든 Engine의 커서 실행 시간을 SQL_SECONDS에 기록 (여러 번 불려도 한 번만 등록)"""
+    global _SQL_HOOKED
+    if _SQL_HOOKED:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_t0")
+        if stack:
+            verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"
+            SQL_SECONDS.observe(time.perf_counter() - stack.pop(), verb=verb)
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(ctx):
+        # 실패한 문장은 after_cursor_execute가 오지 않으므로 여기서 시작 시각을 버린다
+        # (안 그러면 conn.info에 쌓여 다음 문장의 시간이 어긋남)
+        stack = ctx.connection.info.get("_metrics_t0") if ctx.connection is not None else None
+        if stack and ctx.statement is not None:
+            stack.pop()
+
+    _SQL_HOOKED = True
+
+
+# ── 기본 수집기: 공유 ByteLRU 캐시들 ───────────────────────────────────────────
+@register_collector
+def _cache_families() -> list:
+    from src.utils.cache import all_caches
+    stats = [c.stats() for c in all_caches()]
+
+    def family(name, kind, help, field):
+        return (name, kind, help, [({"cache": s["name"]}, s[field]) for s in stats])
+
+    return [
+        family("cache_hits_total", "counter", "Cache hits", "hits"),
+        family("cache_misses_total", "counter", "Cache misses", "misses"),
+        family("cache_hit_ratio", "gauge", "hits / (hits + misses)", "hit_ratio"),
+        family("cache_bytes", "gauge", "Bytes held", "bytes"),
+        family("cache_max_bytes", "gauge", "Byte budget", "max_bytes"),
+        family("cache_items", "gauge", "Entries held", "items"),
+    ]
+
+
+# ── Flask 요청 지연시간 ──────────────────────────────────────────────────────
+def install_flask(app) -> None:
+    """
+    모든 요청의 지연시간을 REQUEST_SECONDS에 기록.
+    endpoint 라벨은 URL 규칙(/fits/slit 등)이라 경로 값이 달라도 라벨 수가 늘지 않는다.
+    """
+    from flask import g, request
+
+    def _endpoint() -> str:
+        return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe(response):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, endpoint=_endpoint(),
+                                    method=request.method, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def _metrics_failed(exc):
+        # 처리되지 않은 예외로 after_request가 건너뛰어진 경우
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, endpoint=_endpoint(),
+                                    method=request.method, status=500)
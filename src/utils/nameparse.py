@@ -19,3 +19,23 @@ def parse_stem(stem: str):
     dt = datetime.strptime(f"{d['date']} {d['time']}", "%Y%m%d %H%M%S.%f")
     d["dt"] = dt
     return d
+
+# 규칙에 안 맞는 stem에서도 YYYYMMDD_HHMMSS[.ffffff] 부분만 찾아내기 위한 느슨한 패턴
+TS_RE = re.compile(r'(?P<date>\d{8})_(?P<time>\d{6})(?:\.(?P<frac>\d{1,6}))?')
+
+def parse_timestamp(stem: str):
+    """
+    stem에서 관측 시각만 뽑는다. parse_stem 우선, 실패하면 TS_RE로 부분 검색.
+    return: datetime or None
+    """
+    d = parse_stem(stem)
+    if d:
+        return d["dt"]
+    m = TS_RE.search(stem)
+    if not m:
+        return None
+    frac = (m.group("frac") or "").ljust(6, "0")
+    try:
+        return datetime.strptime(f"{m.group('date')} {m.group('time')}.{frac}", "%Y%m%d %H%M%S.%f")
+    except ValueError:
+        return None
@@ -0,0 +1,211 @@
+# src/utils/profiler.py
+"""
+요청 단위 온디맨드 프로파일러 (cProfile + SQL 로그).
+
+.env 예시:
+  PROFILE_TOKEN="긴-임의-문자열"   # 없으면 헤더/쿼리 트리거 비활성 (관리자만 아는 값)
+  PROFILE_SAMPLE_RATE=0.01        # 요청의 1%를 무작위로 프로파일 (기본 0)
+  PROFILE_DIR=".cache/profiles"   # 결과 저장 폴더 (상대 경로는 앱 루트 기준, 실행 위치와 무관)
+  PROFILE_KEEP=50                 # 최근 N개 요청만 보관 (오래된 것부터 삭제)
+
+트리거:
+  - 헤더  X-Profile: <PROFILE_TOKEN>
+  - 쿼리  ?_profile=<PROFILE_TOKEN>
+  - 샘플링 PROFILE_SAMPLE_RATE
+
+요청마다 <id>.prof(pstats), <id>.txt(누적시간 상위 함수), <id>.sql.json(SQL 문/시간)을 남기고
+응답 헤더 X-Profile-Id로 id를 돌려준다. 목록/내용은 /debug/profiles.
+프로파일하지 않는 요청은 before_request에서 조건 몇 개만 확인하고 끝난다.
+"""
+from __future__ import annotations
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# 현재 요청이 프로파일 중이면 SQL 기록 리스트, 아니면 None
+_SQL_LOG: ContextVar[Optional[list]] = ContextVar("profile_sql_log", default=None)
+_SQL_HOOKED = False
+_NAME_RE = re.compile(r"^[0-9]{8}T[0-9]{12}_[A-Za-z0-9_.-]+_[0-9a-f]{8}$")
+
+
+def _settings() -> dict:
+    raw = (os.getenv("PROFILE_DIR") or "").strip().strip('\'"')
+    return {
+        "token": (os.getenv("PROFILE_TOKEN") or "").strip().strip('\'"'),
+        "rate": float(os.getenv("PROFILE_SAMPLE_RATE", "0") or 0),
+        "dir": Path(os.path.expanduser(raw)) if raw else Path(".cache") / "profiles",
+        "keep": int(os.getenv("PROFILE_KEEP", "50")),
+    }
+
+
+def _hook_sqlalchemy() -> None:
+    global _SQL_HOOKED
+    if _SQL_HOOKED:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _SQL_LOG.get() is not None:
+            conn.info.setdefault("_profile_t0", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        log = _SQL_LOG.get()
+        stack = conn.info.get("_profile_t0")
+        if log is not None and stack:
+            log.append({
+                "ms": round((time.perf_counter() - stack.pop()) * 1000, 3),
+                "statement": statement,
+                "params": repr(parameters)[:500],
+                "executemany": bool(executemany),
+            })
+
+    @event.listens_for(Engine, "handle_error")
+    def _error(ctx):
+        # 실패한 문장은 after_cursor_execute가 없으므로 시작 시각만 버린다
+        stack = ctx.connection.info.get("_profile_t0") if ctx.connection is not None else None
+        if stack and ctx.statement is not None and _SQL_LOG.get() is not None:
+            stack.pop()
+
+    _SQL_HOOKED = True
+
+
+def authorized(request, token: str) -> bool:
+    if not token:
+        return False
+    expected = token.encode()
+    # 후보마다 상수 시간 비교 (토큰을 한 글자씩 맞춰 보는 타이밍 공격 방지)
+    ok = False
+    for given in (request.headers.get("X-Profile"), request.args.get("_profile")):
+        if given is not None and hmac.compare_digest(given.encode(), expected):
+            ok = True
+    return ok
+
+
+def profile_dir(app) -> Path:
+    """PROFILE_DIR. 상대 경로는 앱 루트(src/의 상위 폴더) 기준으로 — 실행 위치(CWD)에 따라 바뀌지 않게"""
+    d = _settings()["dir"]
+    return d if d.is_absolute() else Path(app.root_path).resolve().parent / d
+
+
+def list_profiles(directory: Path) -> List[dict]:
+    if not directory.is_dir():
+        return []
+    out = []
+    for meta in sorted(directory.glob("*.json"), reverse=True):
+        if meta.name.endswith(".sql.json"):
+            continue
+        try:
+            out.append(json.loads(meta.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def profile_file(directory: Path, name: str, kind: str) -> Optional[Path]:
+    """kind: prof | txt | sql → 파일 경로 (이름 검증으로 경로 탈출 방지)"""
+    if not _NAME_RE.match(name) or kind not in ("prof", "txt", "sql"):
+        return None
+    p = directory / (f"{name}.sql.json" if kind == "sql" else f"{name}.{kind}")
+    return p if p.is_file() else None
+
+
+def _rotate(directory: Path, keep: int) -> None:
+    metas = sorted(p for p in directory.glob("*.json") if not p.name.endswith(".sql.json"))
+    for old in metas[:max(0, len(metas) - keep)]:
+        name = old.name[:-len(".json")]
+        for suffix in (".json", ".prof", ".txt", ".sql.json"):
+            (directory / f"{name}{suffix}").unlink(missing_ok=True)
+
+
+def _write(directory: Path, keep: int, name: str, prof: cProfile.Profile, sql: list, meta: dict) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    prof.dump_stats(str(directory / f"{name}.prof"))
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+    (directory / f"{name}.txt").write_text(buf.getvalue(), encoding="utf-8")
+    (directory / f"{name}.sql.json").write_text(json.dumps(sql, indent=1, default=str), encoding="utf-8")
+    # 목록용 메타는 마지막에 써서, 목록에 보이면 나머지 파일은 이미 있음
+    (directory / f"{name}.json").write_text(json.dumps(meta, default=str), encoding="utf-8")
+    _rotate(directory, keep)
+
+
+def install_flask(app) -> None:
+    from flask import g, request
+
+    cfg = _settings()
+    app.config.setdefault("PROFILE_DIR", str(profile_dir(app)))
+    if not cfg["token"] and cfg["rate"] <= 0:
+        return   # 트리거가 없으면 훅도 걸지 않는다
+    _hook_sqlalchemy()
+    token, rate = cfg["token"], cfg["rate"]
+
+    @app.before_request
+    def _profile_start():
+        if request.path.startswith("/debug/profiles"):
+            return
+        if authorized(request, token):
+            trigger = "token"
+        elif rate > 0 and random.random() < rate:
+            trigger = "sample"
+        else:
+            return
+        g._profile = {
+            "prof": cProfile.Profile(),
+            "sql": [],
+            "trigger": trigger,
+            "t0": time.perf_counter(),
+        }
+        g._profile["sql_token"] = _SQL_LOG.set(g._profile["sql"])
+        g._profile["prof"].enable()
+
+    @app.after_request
+    def _profile_stop(response):
+        state = g.pop("_profile", None)
+        if state is None:
+            return response
+        state["prof"].disable()
+        _SQL_LOG.reset(state["sql_token"])
+        elapsed = time.perf_counter() - state["t0"]
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", rule).strip("_") or "root"
+        name = f"{datetime.now():%Y%m%dT%H%M%S%f}_{slug}_{uuid.uuid4().hex[:8]}"   # 이름순 = 시간순
+        meta = {
+            "id": name,
+            "path": request.path,
+            "args": {k: v for k, v in request.args.items() if k != "_profile"},   # 토큰은 남기지 않음
+            "endpoint": rule,
+            "method": request.method,
+            "status": response.status_code,
+            "trigger": state["trigger"],
+            "ms": round(elapsed * 1000, 2),
+            "sql_count": len(state["sql"]),
+            "sql_ms": round(sum(q["ms"] for q in state["sql"]), 2),
+        }
+        try:
+            _write(Path(app.config["PROFILE_DIR"]), cfg["keep"], name, state["prof"], state["sql"], meta)
+            response.headers["X-Profile-Id"] = name
+        except Exception as e:
+            print(f"[profile write failed] {type(e).__name__}: {e}")
+        return response
+
+    @app.teardown_request
+    def _profile_abort(exc):
+        # after_request가 건너뛰어진 경우(처리되지 않은 예외)에도 프로파일러는 꺼 둔다
+        state = g.pop("_profile", None)
+        if state is not None:
+            state["prof"].disable()
+            _SQL_LOG.reset(state["sql_token"])
@@ -0,0 +1,97 @@
+# src/utils/sendfile.py
+"""
+파일 다운로드 응답 (Range/조건부 요청 + 프런트 서버 오프로드).
+
+.env 예시:
+  SENDFILE_MODE=accel       # "" (기본: 파이썬이 직접 전송) | accel (nginx X-Accel-Redirect) | sendfile (Apache/lighttpd X-Sendfile)
+  SENDFILE_ACCEL_MAP="/data/fits=/_protected/fits;/data/png=/_protected/png"
+                            # accel 모드: 실제 경로 접두사=nginx internal location 접두사 (; 구분)
+
+nginx 예:
+  location /_protected/fits/ { internal; alias /data/fits/; }
+
+파이썬 모드: werkzeug send_file(conditional=True)
+  - If-None-Match / If-Modified-Since → 304
+  - Range (+ If-Range) → 206 Partial Content, 범위 밖이면 416 → 끊긴 다운로드 이어받기 가능
+  - gunicorn 등에서는 wsgi.file_wrapper(sendfile)로 전송
+오프로드 모드: 헤더만 돌려주고 바이트/Range는 프런트 서버가 처리 (304 판단은 여기서도).
+accel 매핑에 없는 경로는 파이썬 모드로 보낸다.
+"""
+from __future__ import annotations
+import mimetypes
+import os
+import unicodedata
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+
+def _settings() -> Tuple[str, List[Tuple[str, str]]]:
+    mode = (os.getenv("SENDFILE_MODE") or "").strip().strip('\'"').lower()
+    raw = (os.getenv("SENDFILE_ACCEL_MAP") or "").strip().strip('\'"')
+    pairs = []
+    for part in raw.split(";"):
+        if "=" not in part:
+            continue
+        src, dst = part.split("=", 1)
+        pairs.append((os.path.abspath(os.path.expanduser(src.strip())), "/" + dst.strip().strip("/")))
+    pairs.sort(key=lambda p: len(p[0]), reverse=True)   # 가장 긴 접두사 우선
+    return mode, pairs
+
+
+def _accel_uri(path: str, pairs: List[Tuple[str, str]]) -> Optional[str]:
+    for src, dst in pairs:
+        if path.startswith(src.rstrip(os.sep) + os.sep):
+            rel = os.path.relpath(path, src).replace(os.sep, "/")
+            return f"{dst}/{quote(rel)}"
+    return None
+
+
+def disposition_params(name: str) -> dict:
+    # werkzeug send_file과 같은 규칙: 비ASCII 이름은 filename*(RFC 5987)로
+    try:
+        name.encode("ascii")
+        return {"filename": name}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+        return {"filename": simple, "filename*": f"UTF-8''{quote(name, safe='!#$&+-.^_`|~')}"}
+
+
+def serve_file(path: str, *, mimetype: Optional[str] = None, as_attachment: bool = False,
+               download_name: Optional[str] = None, etag: Optional[str] = None,
+               max_age: Optional[int] = None):
+    """
+    path의 파일을 응답으로. etag에 내용 해시(FileStorage.sha256_hash 등)를 주면 강한 ETag,
+    없으면 mtime/크기 기반. 파일이 없으면 404.
+    """
+    from flask import Response, abort, request, send_file
+
+    path = os.path.abspath(path)
+    if not os.path.isfile(path):
+        abort(404)
+
+    mode, pairs = _settings()
+    target, header = None, None
+    if mode == "accel":
+        target, header = _accel_uri(path, pairs), "X-Accel-Redirect"
+    elif mode == "sendfile":
+        target, header = path, "X-Sendfile"
+
+    if target is None:
+        return send_file(
+            path, mimetype=mimetype, as_attachment=as_attachment, download_name=download_name,
+            conditional=True, etag=etag or True, max_age=max_age,
+        )
+
+    st = os.stat(path)
+    resp = Response(mimetype=mimetype or mimetypes.guess_type(path)[0] or "application/octet-stream")
+    resp.headers[header] = target
+    if as_attachment or download_name:
+        resp.headers.set("Content-Disposition", "attachment" if as_attachment else "inline",
+                         **disposition_params(download_name or os.path.basename(path)))
+    resp.headers["Accept-Ranges"] = "bytes"
+    resp.last_modified = int(st.st_mtime)
+    resp.set_etag(etag or f"{st.st_mtime_ns:x}-{st.st_size:x}")
+    if max_age is not None:
+        resp.cache_control.public = True
+        resp.cache_control.max_age = max_age
+    return resp.make_conditional(request)
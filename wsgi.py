@@ -0,0 +1,27 @@
+# wsgi.py
+"""
+운영용 진입점 (run.py는 개발용 debug 서버).
+
+  gunicorn -w 4 -b 0.0.0.0:8086 wsgi:app
+
+여러 워커가 떠도 큐브는 공유 메모리에 한 번만 올라간다 (src/services/cube_store.py).
+워커 하나가 업로드/등록한 file_id로 다른 워커가 preview/slit/spectrum 요청을 받아도
+같은 데이터를 복사 없이 본다. 워커마다 최근 큐브 FITS_REGISTRY_SIZE(기본 4)개에 붙어 있고,
+어느 워커도 쓰지 않는 큐브는 CUBE_TTL_SEC(기본 30분) 뒤 공유 메모리에서 지워진다.
+
+nginx 뒤에 둘 때는 SENDFILE_MODE=accel + SENDFILE_ACCEL_MAP 을 설정하면 FITS/PNG 다운로드 바이트를
+nginx가 직접 보낸다 (src/utils/sendfile.py).
+"""
+import os
+
+os.environ.setdefault("CUBE_SHARED", "1")
+# 프리페치 결과/추적은 워커 프로세스마다 따로라 -w N에서는 다음 요청이 다른 워커로 가 헛수고가 된다
+# (src/services/prefetch.py). 워커 1개나 세션 고정 라우팅이면 PREFETCH_WORKERS로 다시 켤 수 있다.
+os.environ.setdefault("PREFETCH_WORKERS", "0")
+
+from src import create_app  # noqa: E402
+from src.services import cube_store  # noqa: E402
+
+cube_store.sweep()   # 이전 실행/비정상 종료한 워커가 남긴 큐브 중 CUBE_TTL_SEC 넘게 안 쓰인 것 정리
+
+app = create_app()